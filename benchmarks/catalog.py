@@ -0,0 +1,156 @@
+"""
+Synthetic catalog generator: properties, categories, cities, rentals and registrations.
+
+Everything is derived from a seeded ``random.Random`` so two runs at the same size produce
+the same catalog. Seeded records are named with BENCH_PREFIX, seeding tops the catalog up
+to the requested size so sizes can be grown within one database.
+"""
+import base64
+import datetime
+import io
+
+BENCH_PREFIX = 'BENCH'
+# Records created per ORM create while seeding
+SEED_BATCH_SIZE = 1000
+
+CATEGORIES = ('Residential Plot', 'Commercial Plot', 'Agricultural Land', 'Villa', 'Apartment', 'Farm House')
+# (city, latitude, longitude) of the cities the catalog is spread over
+CITIES = (
+    ('Visakhapatnam', 17.6868, 83.2185), ('Vijayawada', 16.5062, 80.6480), ('Hyderabad', 17.3850, 78.4867),
+    ('Bengaluru', 12.9716, 77.5946), ('Chennai', 13.0827, 80.2707), ('Guntur', 16.3067, 80.4365),
+    ('Tirupati', 13.6288, 79.4192), ('Warangal', 17.9689, 79.5941), ('Nellore', 14.4426, 79.9865),
+    ('Kakinada', 16.9891, 82.2475), ('Rajahmundry', 17.0005, 81.8040), ('Kurnool', 15.8281, 78.0373),
+    ('Mysuru', 12.2958, 76.6394), ('Coimbatore', 11.0168, 76.9558), ('Madurai', 9.9252, 78.1198),
+    ('Pune', 18.5204, 73.8567), ('Nagpur', 21.1458, 79.0882), ('Mumbai', 19.0760, 72.8777),
+)
+STREET_WORDS = ('Beach', 'Ring', 'Temple', 'Lake', 'Station', 'Market', 'Hill', 'Park', 'College', 'Highway')
+FACING = ('north', 'south', 'east', 'west', 'northeast', 'northwest', 'southeast', 'southwest')
+TITLES = ('clear', 'registered', 'rera', 'dtcp', 'hmda', 'patta', 'pending')
+# Distinct cover images, shared by the seeded properties like photos of a few layouts would be
+IMAGE_COLORS = ((5, 150, 105), (220, 38, 38), (124, 58, 237), (234, 88, 12), (37, 99, 235), (217, 119, 6))
+
+
+def _images(size=(1280, 960)):
+    """Base64 JPEG cover images, None when Pillow is not available."""
+    try:
+        from PIL import Image
+    except ImportError:
+        return None
+    images = []
+    for color in IMAGE_COLORS:
+        data = io.BytesIO()
+        Image.new('RGB', size, color).save(data, 'JPEG', quality=85)
+        images.append(base64.b64encode(data.getvalue()))
+    return images
+
+
+def _ensure_categories(env):
+    Category = env['property.category']
+    existing = {category.name: category.id for category in Category.search([('name', 'in', CATEGORIES)])}
+    missing = [name for name in CATEGORIES if name not in existing]
+    for category in Category.create([{'name': name} for name in missing]):
+        existing[category.name] = category.id
+    return [existing[name] for name in CATEGORIES]
+
+
+def _property_vals(rng, index, category_ids, images, image_ratio):
+    city, latitude, longitude = rng.choice(CITIES)
+    plot_area = rng.choice((1200, 1500, 1800, 2400, 3600, 4800, 6000, 10000)) * rng.uniform(0.8, 1.2)
+    vals = {
+        'name': f'{BENCH_PREFIX} {city} Plot {index}',
+        'short_description': f'{int(plot_area)} sq.ft plot near {rng.choice(STREET_WORDS)} Road, {city}',
+        'category_id': rng.choice(category_ids),
+        'price': round(plot_area * rng.uniform(1500, 12000), -3),
+        'plot_area': round(plot_area),
+        'facing_direction': rng.choice(FACING),
+        'title_status': rng.choice(TITLES),
+        'street': f'{rng.randint(1, 300)} {rng.choice(STREET_WORDS)} Road',
+        'city': city,
+        'zip_code': str(500000 + rng.randint(0, 99999)),
+        # Spread over ~20 km around the city center, already located so nothing is geocoded
+        'latitude': latitude + rng.uniform(-0.1, 0.1),
+        'longitude': longitude + rng.uniform(-0.1, 0.1),
+        'geocode_state': 'done',
+        'views': int(rng.paretovariate(1.5) * 10),
+        'is_featured': rng.random() < 0.05,
+        'is_published': rng.random() < 0.95,
+        'contact_name': 'Bench Agent',
+        'contact_phone': '+91 90000 00000',
+    }
+    if images and rng.random() < image_ratio:
+        vals['image'] = rng.choice(images)
+    return vals
+
+
+def _booking_periods(rng, product_ids, today=None):
+    """Up to 4 consecutive booking periods per rental over the next two years."""
+    today = today or datetime.date.today()
+    periods = []
+    for product_id in product_ids:
+        start = today + datetime.timedelta(days=rng.randint(-60, 60))
+        for _i in range(rng.randint(0, 4)):
+            end = start + datetime.timedelta(days=30 * rng.randint(1, 12))
+            periods.append({'product_tmpl_id': product_id, 'date_from': start, 'date_to': end,
+                            'kind': rng.choice(('booked', 'booked', 'blocked'))})
+            start = end + datetime.timedelta(days=rng.randint(0, 90))
+    return periods
+
+
+def seed_catalog(env, size, rng, image_ratio=0.2, rental_ratio=0.1, log=print):
+    """
+    Top the catalog up to ``size`` seeded properties and ``size * rental_ratio`` rentals,
+    ``image_ratio`` of the properties get a cover image. Returns the number of records created.
+    """
+    Property = env['property.property'].with_context(tracking_disable=True, mail_create_nolog=True)
+    category_ids = _ensure_categories(env)
+    images = _images() if image_ratio else None
+    existing = Property.search_count([('name', '=like', f'{BENCH_PREFIX} %')])
+    created = 0
+    for start in range(existing, size, SEED_BATCH_SIZE):
+        count = min(SEED_BATCH_SIZE, size - start)
+        Property.create([_property_vals(rng, start + i, category_ids, images, image_ratio) for i in range(count)])
+        created += count
+        env.cr.commit()
+        log(f'  properties: {start + count}/{size}')
+
+    if 'property.room.image' in env:
+        Product = env['product.template'].with_context(tracking_disable=True, mail_create_nolog=True)
+        rental_size = int(size * rental_ratio)
+        existing = Product.search_count([('name', '=like', f'{BENCH_PREFIX} %')])
+        for start in range(existing, rental_size, SEED_BATCH_SIZE):
+            count = min(SEED_BATCH_SIZE, rental_size - start)
+            vals_list = []
+            for i in range(count):
+                city = rng.choice(CITIES)[0]
+                square_feet = rng.choice((600, 900, 1200, 1500, 2000))
+                vals_list.append({
+                    'name': f'{BENCH_PREFIX} {city} Flat {start + i}',
+                    'property_type': rng.choice(('rent', 'rent', 'buy')),
+                    'location': city,
+                    'zip_code': str(500000 + rng.randint(0, 99999)),
+                    'bedrooms': rng.randint(1, 4),
+                    'bathrooms': rng.randint(1, 3),
+                    'square_feet': square_feet,
+                    'rental_price': round(square_feet * rng.uniform(10, 40), -2),
+                    'is_published': True,
+                })
+            products = Product.create(vals_list)
+            env['rental.availability'].create(_booking_periods(rng, products.ids))
+            created += count
+            env.cr.commit()
+            log(f'  rentals: {start + count}/{rental_size}')
+    return created
+
+
+def seed_registrations(env, count, rng):
+    """Create ``count`` submitted registrations to approve, in the current transaction."""
+    return env['property.registration'].with_context(tracking_disable=True, mail_create_nolog=True).create([{
+        'customer_name': f'{BENCH_PREFIX} Seller {i}',
+        'phone_number': '+91 90000 00000',
+        'category': rng.choice(('residential', 'commercial', 'agricultural')),
+        'sq_yards': rng.randint(100, 2000),
+        'price': round(rng.uniform(1e6, 5e7), -3),
+        'city': rng.choice(CITIES)[0],
+        'state': 'Andhra Pradesh',
+        'status': 'submitted',
+    } for i in range(count)])
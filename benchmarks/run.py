@@ -0,0 +1,357 @@
+"""
+Performance benchmark of the real estate addons against a synthetic catalog.
+
+Seeds the catalog at each requested size (see catalog.py), then drives the public routes
+through the WSGI application in process and the backend actions and crons in rolled back
+transactions, with the geocoder and the completions API replaced by local stand-ins
+(see stubs.py). For each scenario it records latency percentiles, SQL query counts and
+peak Python memory into a JSON report, which can be compared to a previous report::
+
+    python -m benchmarks.run -c odoo.conf -d bench --sizes 1000,10000 --output bench.json
+    python -m benchmarks.run -c odoo.conf -d bench --sizes 1000,10000 --baseline bench.json
+
+Run it from the addons directory, against a database with the addons installed. The
+database is modified: seeded records are committed and kept for later runs.
+"""
+import argparse
+import datetime
+import json
+import platform
+import random
+import re
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+
+from .catalog import BENCH_PREFIX, CITIES, seed_catalog, seed_registrations
+from .stubs import local_services
+
+# Properties whose detail page is requested, sampled once per size
+DETAIL_SAMPLE_SIZE = 50
+# Default allowed slowdown of a scenario's median latency before it counts as a regression
+REGRESSION_THRESHOLD = 0.2
+
+
+def _percentile(values, percent):
+    values = sorted(values)
+    index = min(len(values) - 1, max(0, round(percent / 100.0 * len(values) + 0.5) - 1))
+    return values[index]
+
+
+def _summarize(latencies, queries, peak_memory, statuses):
+    return {
+        'samples': len(latencies),
+        'p50_ms': round(_percentile(latencies, 50) * 1000, 2),
+        'p90_ms': round(_percentile(latencies, 90) * 1000, 2),
+        'p99_ms': round(_percentile(latencies, 99) * 1000, 2),
+        'mean_queries': round(statistics.mean(queries), 1),
+        'max_queries': max(queries),
+        'peak_memory_kb': round(peak_memory / 1024),
+        'statuses': {str(status): statuses.count(status) for status in sorted(set(statuses))},
+    }
+
+
+def _query_count():
+    return getattr(threading.current_thread(), 'query_count', 0)
+
+
+class Bench:
+    def __init__(self, registry, iterations, rng):
+        from werkzeug.test import Client
+        import odoo.http
+        self.registry = registry
+        self.iterations = iterations
+        self.rng = rng
+        self.client = Client(odoo.http.root)
+
+    def _clear_page_caches(self):
+        """Empty the per-worker page caches, so the next request renders from scratch."""
+        from odoo.addons.real_estate_listing.models import real_estate_cache_tag as store
+        with store._page_cache_lock:
+            store._page_cache.clear()
+            store._page_cache_size = 0
+
+    # -------------------- HTTP --------------------
+    def _request(self, path, headers=None):
+        """``(seconds, queries, status, etag)`` of a GET request through the WSGI application."""
+        start = time.perf_counter()
+        response = self.client.get(path, headers=headers or {})
+        response.get_data()
+        elapsed = time.perf_counter() - start
+        # Reset by the application at the start of each request
+        queries = _query_count()
+        response.close()
+        return elapsed, queries, response.status_code, response.headers.get('ETag')
+
+    def run_route(self, paths, mode):
+        """
+        Request each of ``paths`` round robin ``iterations`` times. ``mode`` is ``cold``
+        (page caches emptied before each request), ``warm`` or ``revalidate`` (conditional
+        requests with the ETag of a previous response).
+        """
+        etags = {}
+        if mode != 'cold':
+            for path in paths:
+                etags[path] = self._request(path)[3]
+        latencies, queries, statuses = [], [], []
+        for i in range(self.iterations):
+            path = paths[i % len(paths)]
+            if mode == 'cold':
+                self._clear_page_caches()
+            headers = {'If-None-Match': etags[path]} if mode == 'revalidate' and etags.get(path) else None
+            elapsed, count, status, _etag = self._request(path, headers)
+            latencies.append(elapsed)
+            queries.append(count)
+            statuses.append(status)
+
+        path = paths[0]
+        if mode == 'cold':
+            self._clear_page_caches()
+        headers = {'If-None-Match': etags[path]} if mode == 'revalidate' and etags.get(path) else None
+        tracemalloc.start()
+        try:
+            self._request(path, headers)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        return _summarize(latencies, queries, peak, statuses)
+
+    def route_scenarios(self, env):
+        Property = env['property.property']
+        detail_ids = Property.search([('name', '=like', f'{BENCH_PREFIX} %'), ('is_published', '=', True)]).ids
+        detail_ids = self.rng.sample(detail_ids, min(DETAIL_SAMPLE_SIZE, len(detail_ids)))
+        cities = [name for name, _latitude, _longitude in CITIES]
+        _city, latitude, longitude = self.rng.choice(CITIES)
+        bbox = f'{latitude - 0.1},{longitude - 0.1},{latitude + 0.1},{longitude + 0.1}'
+        scenarios = {
+            'map': ['/'],
+            'map_city': [f'/?city={city}' for city in cities[:5]],
+            'listing': ['/properties'],
+            'listing_sorted': ['/properties?sort=price_asc', '/properties?sort=newest'],
+            'listing_next_page': ['/properties/page?sort=price_asc'],
+            'search': [f'/properties/search?location={city}' for city in cities[:5]],
+            'detail': [f'/property/{pid}' for pid in detail_ids],
+            'map_data_country': ['/property/map/data?zoom=5'],
+            'map_data_city': [f'/property/map/data?zoom=13&bbox={bbox}'],
+            'nearby': [f'/property/nearby?lat={latitude}&lng={longitude}&radius=10'],
+            'autocomplete': [f'/property/autocomplete?term={city[:3]}' for city in cities[:5]],
+            'listings': ['/listings', '/listings?listing_type=rent&sort=price_asc', f'/listings?bbox={bbox}'],
+        }
+        if 'property.room.image' in self.registry:
+            rental_ids = env['product.template'].search(
+                [('name', '=like', f'{BENCH_PREFIX} %'), ('is_published', '=', True)], limit=DETAIL_SAMPLE_SIZE)
+            scenarios['rentals'] = ['/properties/rent', '/properties/buy']
+            move_in = datetime.date.today() + datetime.timedelta(days=30)
+            scenarios['rentals_available'] = [f'/properties/rent?move_in={move_in}&months={months}' for months in (6, 11)]
+            scenarios['rental_detail'] = [f'/property/{rental.property_type}/{rental.id}' for rental in rental_ids]
+        return {name: paths for name, paths in scenarios.items() if paths}
+
+    # -------------------- BACKEND --------------------
+    def backend_scenarios(self):
+        """``{name: (setup(env), action(env, records))}``, run in transactions that are rolled back."""
+        def published(env, count):
+            return env['property.property'].search(
+                [('name', '=like', f'{BENCH_PREFIX} %'), ('is_published', '=', True)], limit=count, order='id desc')
+
+        def pending_geocode(env):
+            properties = published(env, 100)
+            properties.write({'geocode_state': 'pending', 'geocode_next_attempt': False})
+            return properties
+
+        def pending_ai(env):
+            properties = published(env, 20)
+            properties.write({'ai_generation_state': 'pending', 'ai_generation_attempts': 0, 'ai_next_attempt': False})
+            return properties
+
+        def pending_insights(env):
+            Insight = env['property.city.insight']
+            insights = Insight.search([], limit=10)
+            if not insights:
+                insights = Insight.create([{'city': city} for city, _latitude, _longitude in CITIES[:10]])
+            insights.action_regenerate()
+            return insights
+
+        def stale_neighbors(env):
+            properties = published(env, 200)
+            properties.write({'neighbors_stale': True})
+            return properties
+
+        return {
+            'backend_list': (
+                lambda env: None,
+                lambda env, _records: env['property.property'].web_search_read(
+                    [], {field: {} for field in ('name', 'category_id', 'price', 'city', 'is_published', 'views')},
+                    limit=80, order='id desc'),
+            ),
+            'approve_registrations': (
+                lambda env: seed_registrations(env, 200, self.rng),
+                lambda env, registrations: registrations.action_approve(),
+            ),
+            'geocode_cron': (
+                pending_geocode,
+                lambda env, _records: env['property.property']._cron_geocode_pending(batch_size=100),
+            ),
+            'ai_content_cron': (
+                pending_ai,
+                lambda env, _records: env['property.property']._cron_generate_ai_content(batch_size=20),
+            ),
+            'city_insights_cron': (
+                pending_insights,
+                lambda env, _records: env['property.city.insight']._cron_generate_city_insights(batch_size=10),
+            ),
+            'neighbors_cron': (
+                stale_neighbors,
+                lambda env, _records: env['property.neighbor']._cron_refresh_neighbors(batch_size=200),
+            ),
+            'facets_rebuild': (
+                lambda env: None,
+                lambda env, _records: env['property.facet']._cron_rebuild_facets(),
+            ),
+        }
+
+    def run_backend(self, setup, action):
+        """Run ``action`` ``iterations`` times, each in a fresh transaction that is rolled back."""
+        from odoo import api, SUPERUSER_ID
+
+        def run_once():
+            with self.registry.cursor() as cr:
+                env = api.Environment(cr, SUPERUSER_ID, {})
+                try:
+                    records = setup(env)
+                    env.flush_all()
+                    before = _query_count()
+                    start = time.perf_counter()
+                    action(env, records)
+                    env.flush_all()
+                    return time.perf_counter() - start, _query_count() - before
+                finally:
+                    cr.rollback()
+
+        thread = threading.current_thread()
+        # Makes the crons keep their work in the transaction instead of committing it
+        thread.testing = True
+        try:
+            latencies, queries = [], []
+            for _i in range(self.iterations):
+                elapsed, count = run_once()
+                latencies.append(elapsed)
+                queries.append(count)
+            tracemalloc.start()
+            try:
+                run_once()
+                peak = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+        finally:
+            thread.testing = False
+        return _summarize(latencies, queries, peak, [])
+
+
+# -------------------- REPORT --------------------
+def _compare(report, baseline, threshold):
+    """Lines describing each scenario against ``baseline``, and whether any regressed."""
+    lines = []
+    regressed = False
+    for size, scenarios in report['results'].items():
+        for name, result in scenarios.items():
+            previous = baseline.get('results', {}).get(size, {}).get(name)
+            if not previous:
+                continue
+            ratio = result['p50_ms'] / previous['p50_ms'] if previous['p50_ms'] else 1.0
+            more_queries = result['mean_queries'] > previous['mean_queries']
+            slower = ratio > 1 + threshold
+            flag = 'REGRESSION' if slower or more_queries else ''
+            regressed |= bool(flag)
+            lines.append(f"{size:>7} {name:<24} p50 {previous['p50_ms']:>9.2f} -> {result['p50_ms']:>9.2f} ms"
+                         f" ({ratio - 1:+.0%})  queries {previous['mean_queries']:>6} -> {result['mean_queries']:>6}"
+                         f"  {flag}")
+    return lines, regressed
+
+
+def _git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0].strip())
+    parser.add_argument('-c', '--config', help="Odoo configuration file")
+    parser.add_argument('-d', '--database', required=True, help="database with the addons installed")
+    parser.add_argument('--sizes', default='1000,10000,100000', help="comma separated catalog sizes")
+    parser.add_argument('--iterations', type=int, default=30, help="samples per scenario")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--image-ratio', type=float, default=0.2, help="share of properties with a cover image")
+    parser.add_argument('--rental-ratio', type=float, default=0.1, help="rentals seeded per property")
+    parser.add_argument('--only', help="comma separated scenarios to run")
+    parser.add_argument('--output', help="write the JSON report to this file")
+    parser.add_argument('--baseline', help="JSON report to compare to, exits with 1 on regressions")
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD,
+                        help="allowed median slowdown before a scenario counts as regressed")
+    args = parser.parse_args(argv)
+
+    import odoo
+    from odoo import api, SUPERUSER_ID
+    from odoo.modules.registry import Registry
+    from odoo.tools import config
+
+    config.parse_config((['-c', args.config] if args.config else []) + ['-d', args.database])
+    # Route every request of the in-process client to the benchmarked database
+    config['dbfilter'] = f'^{re.escape(args.database)}$'
+    odoo.service.server.load_server_wide_modules()
+    registry = Registry(args.database)
+    only = set(args.only.split(',')) if args.only else None
+    sizes = sorted(int(size) for size in args.sizes.split(','))
+
+    report = {
+        'created': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        'revision': _git_revision(),
+        'odoo': odoo.release.version,
+        'python': platform.python_version(),
+        'iterations': args.iterations,
+        'seed': args.seed,
+        'results': {},
+    }
+    with registry.cursor() as cr:
+        env = api.Environment(cr, SUPERUSER_ID, {})
+        with local_services(env):
+            for size in sizes:
+                rng = random.Random(f'{args.seed}-{size}')
+                print(f"Seeding {size} properties")
+                seed_catalog(env, size, rng, image_ratio=args.image_ratio, rental_ratio=args.rental_ratio)
+                env.cr.commit()
+
+                bench = Bench(registry, args.iterations, rng)
+                results = report['results'][str(size)] = {}
+                for name, paths in bench.route_scenarios(env).items():
+                    for mode in ('cold', 'warm', 'revalidate'):
+                        scenario = f'{name}:{mode}'
+                        if only and name not in only and scenario not in only:
+                            continue
+                        results[scenario] = bench.run_route(paths, mode)
+                        print(f"  {scenario:<28} {json.dumps(results[scenario])}")
+                for name, (setup, action) in bench.backend_scenarios().items():
+                    if only and name not in only:
+                        continue
+                    results[name] = bench.run_backend(setup, action)
+                    print(f"  {name:<28} {json.dumps(results[name])}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.output}")
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        lines, regressed = _compare(report, baseline, args.threshold)
+        print('\n'.join(lines))
+        return 1 if regressed else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,62 @@
+"""
+Local stand-ins for the external services, so benchmarks never leave the machine.
+
+The geocoder is switched to the addon's ``local`` provider and the completions API to a
+small HTTP server answering every request with canned sections. Both are set through the
+system parameters the addon reads, and restored on exit.
+"""
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import threading
+
+SECTIONS = {
+    'key_highlights': ['Corner plot', 'East facing', '40 ft road'],
+    'investment_data': ['8% yearly appreciation', '3% rental yield', 'Clear title'],
+    'nearby_places': ['School 1.2 km', 'Hospital 2 km', 'Bus stop 300 m', 'Market 800 m'],
+    'unique_features': ['Gated layout', 'Underground drainage', 'Park facing'],
+    'lifestyle_benefits': ['Quiet street', 'Lake 1 km', 'Temple 500 m'],
+    'investment_reasons': 'Steady job growth and investor confidence.',
+    'growth_potential': 'New ring road and IT park announced.',
+    'infrastructure': 'Metro extension and airport link under way.',
+    'market_trends': 'Plot prices rose steadily over the last three years.',
+}
+
+
+class _CompletionsHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        body = json.dumps({'choices': [{'message': {'content': json.dumps(SECTIONS)}}]}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@contextmanager
+def local_services(env):
+    """Point the geocoder and the completions API of ``env``'s database to local stand-ins."""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _CompletionsHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    params = {
+        'real_estate_management.geocoder': 'local',
+        'real_estate_management.ai_completions_url': f'http://127.0.0.1:{server.server_port}/v1/chat/completions',
+        'openai.api_key': 'benchmark',
+    }
+    ConfigParameter = env['ir.config_parameter'].sudo()
+    previous = {key: ConfigParameter.get_param(key) for key in params}
+    try:
+        for key, value in params.items():
+            ConfigParameter.set_param(key, value)
+        env.cr.commit()
+        yield
+    finally:
+        for key, value in previous.items():
+            ConfigParameter.set_param(key, value or False)
+        env.cr.commit()
+        server.shutdown()
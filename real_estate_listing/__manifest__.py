@@ -0,0 +1,16 @@
+{
+    'name': 'Real Estate Listing Index',
+    'version': '1.0',
+    'category': 'Website',
+    'license': 'LGPL-3',
+    'summary': 'Denormalized index of the public property listings of every real estate module',
+    'description': 'One indexed read model of the published listings of the real estate, rental and '
+                   'land management modules, kept in sync by their models and queried by their public routes, '
+                   'and the page cache and image uploads those modules share.',
+    'depends': ['base', 'web', 'website'],
+    'data': [
+        'security/ir.model.access.csv',
+        'data/ir_cron_data.xml',
+    ],
+    'installable': True,
+}
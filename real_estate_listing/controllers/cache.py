@@ -0,0 +1,128 @@
+from odoo.http import request
+from datetime import timezone
+import contextlib
+import functools
+import hashlib
+import re
+
+# Stands for the visitor's CSRF token in cached page bodies
+PAGE_CACHE_CSRF_PLACEHOLDER = b'__real_estate_page_cache_csrf_token__'
+# Shape of the tokens returned by request.csrf_token(): an HMAC-SHA1 and its expiry
+CSRF_TOKEN_RE = re.compile(rb'\b[0-9a-f]{40}o[0-9]*\b')
+# Default Cache-Control of each cached route policy, overridden by the
+# ``<namespace>.cache_control.<policy>`` system parameters. Pages embed the
+# visitor's CSRF token so they must not be stored by shared caches
+ROUTE_CACHE_CONTROL = {
+    'page': 'private, no-cache',
+    'json': 'public, max-age=60',
+    'autocomplete': 'public, max-age=300',
+}
+
+
+def _is_shareable_request():
+    """Whether the response to the current request is the same for every anonymous visitor."""
+    return (request.httprequest.method in ('GET', 'HEAD') and request.env.user._is_public()
+            and not request.session.debug and not request.session.get('sale_order_id'))
+
+
+def _route_etag(namespace, generations):
+    """Weak ETag of the current request's response given the ``generations`` of its tags."""
+    # Pages embed the CSRF token of an existing session, a first visit has no session to bind to
+    session = request.session.sid if request.httprequest.cookies.get('session_id') else ''
+    key = (request.env.cr.dbname, namespace, request.website.id, request.lang.code, session,
+           request.httprequest.full_path, sorted(generations.items()))
+    return hashlib.sha1(repr(key).encode()).hexdigest()
+
+
+def _is_not_modified(etag, changed_on):
+    """Whether the client's validators match, If-None-Match taking precedence over If-Modified-Since."""
+    httprequest = request.httprequest
+    if httprequest.if_none_match:
+        return httprequest.if_none_match.contains_weak(etag)
+    if httprequest.if_modified_since and changed_on:
+        return changed_on.replace(microsecond=0, tzinfo=timezone.utc) <= httprequest.if_modified_since
+    return False
+
+
+@contextlib.contextmanager
+def _csrf_token_placeholder():
+    """Render every ``request.csrf_token()`` of the block as PAGE_CACHE_CSRF_PLACEHOLDER."""
+    # Tokens are salted with their expiry, one rendered earlier cannot be generated again to be swapped
+    current = request._get_current_object()
+    current.csrf_token = lambda time_limit=None: PAGE_CACHE_CSRF_PLACEHOLDER.decode()
+    try:
+        yield
+    finally:
+        del current.csrf_token
+
+
+def cached_route(tags, policy, namespace, store=True):
+    """
+    Serve the decorated route to anonymous visitors from cache.
+
+    ``tags`` is called with the route arguments and returns the cache tags of the response
+    (see real.estate.cache.tag). Their generations and change date are sent as ETag and
+    Last-Modified, a matching conditional request is answered 304 without running the route,
+    and the Cache-Control header is taken from the route ``policy``, which the module
+    ``namespace`` of the route can override with its ``<namespace>.cache_control.<policy>``
+    system parameter.
+
+    With ``store``, rendered pages are also kept in the per-worker page cache until one of
+    their tags is bumped. Pages are rendered with ``cache_generations``, to use in the
+    ``t-cache`` key of their fragments, and are not stored when they set ``no_page_cache``.
+    Stored pages are rendered with a placeholder instead of the CSRF token, which is put
+    back for each visitor, the one rendering the page included.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            CacheTag = request.env['real.estate.cache.tag'].sudo()
+            generations, changed_on = CacheTag._get_tags(tags(*args, **kwargs))
+            if not _is_shareable_request():
+                response = method(self, *args, **kwargs)
+                if getattr(response, 'is_qweb', False):
+                    response.qcontext['cache_generations'] = tuple(generations.items())
+                return response
+
+            etag = _route_etag(namespace, generations)
+
+            def set_validators(response):
+                response.set_etag(etag, weak=True)
+                if changed_on:
+                    response.last_modified = changed_on
+                response.headers['Cache-Control'] = request.env['ir.config_parameter'].sudo().get_param(
+                    f'{namespace}.cache_control.{policy}', ROUTE_CACHE_CONTROL[policy])
+                return response
+
+            if _is_not_modified(etag, changed_on):
+                return set_validators(request.make_response(b'', status=304))
+
+            key = None
+            if store:
+                key = (request.env.cr.dbname, namespace, request.website.id, request.lang.code,
+                       request.httprequest.path, tuple(sorted(request.httprequest.args.items(multi=True))))
+                body = CacheTag._cache_get(key, generations)
+                if body is not None:
+                    body = body.replace(PAGE_CACHE_CSRF_PLACEHOLDER, request.csrf_token().encode())
+                    return set_validators(request.make_response(body, headers=[
+                        ('Content-Type', 'text/html; charset=utf-8'),
+                        ('X-Page-Cache', 'hit'),
+                    ]))
+
+            response = method(self, *args, **kwargs)
+            if getattr(response, 'status_code', None) != 200:
+                return response
+            if getattr(response, 'is_qweb', False):
+                response.qcontext['cache_generations'] = tuple(generations.items())
+                if key and not response.qcontext.get('no_page_cache'):
+                    with _csrf_token_placeholder():
+                        response.flatten()
+                    body = response.get_data()
+                    # A token rendered some other way would be served to every visitor
+                    if not CSRF_TOKEN_RE.search(body):
+                        CacheTag._cache_set(key, generations, body)
+                        response.headers['X-Page-Cache'] = 'miss'
+                    response.set_data(body.replace(PAGE_CACHE_CSRF_PLACEHOLDER, request.csrf_token().encode()))
+            return set_validators(response)
+        return wrapper
+    return decorator
@@ -0,0 +1,21 @@
+from odoo import http
+from odoo.http import request
+
+
+class RealEstateListingController(http.Controller):
+
+    @http.route('/listings', type='http', auth='public', methods=['GET'])
+    def listings(self, sort=None, cursor=None, limit=None, **kwargs):
+        """
+        Published listings of every catalog matching the filters of ``_public_domain``, one
+        keyset page at a time, as JSON. With ``bbox``, only located listings are returned.
+        """
+        Listing = request.env['real.estate.listing'].sudo()
+        listings, next_cursor = Listing._listing_page(
+            Listing._public_domain(kwargs), sort=sort, cursor=cursor,
+            limit=int(limit) if limit and limit.isdigit() else None,
+        )
+        return request.make_json_response({
+            'listings': listings._serialize(),
+            'next_cursor': next_cursor,
+        }, headers=[('Cache-Control', 'public, max-age=60')])
@@ -0,0 +1,4 @@
+from . import ir_attachment
+from . import real_estate_cache_tag
+from . import real_estate_listing
+from . import real_estate_upload
@@ -0,0 +1,37 @@
+from odoo import models, api
+from odoo.tools import SQL
+
+
+class IrAttachment(models.Model):
+    _inherit = 'ir.attachment'
+
+    @api.model
+    def _checksum_fname(self, checksum):
+        """
+        Filestore file name of the content ``checksum``. Unlike ``_get_path`` it neither
+        needs the content nor checks the file, whose content is up to the caller to check.
+        """
+        return f'{checksum[:2]}/{checksum}'
+
+    def _link_files(self, files):
+        """
+        Point the attachments of self to existing filestore files, ``files`` being one
+        ``(store_fname, checksum, file_size)`` per attachment, in order. ``create`` and
+        ``write`` drop those fields, so the files are linked afterwards, in one query.
+        The files the attachments had before are left to the filestore garbage collector.
+        """
+        if not self:
+            return
+        self.flush_recordset(['store_fname'])
+        for fname in set(self.mapped('store_fname')) - {False} - {fname for fname, _checksum, _size in files}:
+            self._mark_for_gc(fname)
+        self.env.cr.execute(SQL("""
+            UPDATE ir_attachment a
+               SET store_fname = v.store_fname, checksum = v.checksum, file_size = v.file_size, db_datas = NULL
+              FROM (VALUES %s) AS v(id, store_fname, checksum, file_size)
+             WHERE a.id = v.id
+        """, SQL(", ").join(
+            SQL("(%s, %s, %s, %s)", attachment.id, fname, checksum, file_size)
+            for attachment, (fname, checksum, file_size) in zip(self, files, strict=True)
+        )))
+        self.invalidate_recordset(['store_fname', 'checksum', 'file_size', 'db_datas', 'raw', 'datas'])
@@ -0,0 +1,127 @@
+from odoo import models, fields, api
+from odoo.tools import SQL
+from collections import OrderedDict
+import threading
+import time
+
+# Per-worker store of rendered public pages, bounded by total body size
+PAGE_CACHE_MAX_BYTES = 64 * 1024 * 1024
+# Entries are dropped after this many seconds even if none of their tags changed,
+# this bounds the staleness of content updated outside the ORM (e.g. view counters)
+PAGE_CACHE_SECONDS = 600
+
+_page_cache = OrderedDict()
+_page_cache_size = 0
+_page_cache_lock = threading.Lock()
+
+
+class RealEstateCacheTag(models.Model):
+    """
+    Generation counter of a cache tag such as ``properties``, ``property:42`` or ``rental:42``,
+    shared by the public routes of the real estate modules (see ``controllers.cache``).
+
+    Cached pages and fragments record the generations of their tags when they are rendered
+    and are only served while those are unchanged, so bumping a tag in any worker invalidates
+    the matching entries of every worker. The generations and change dates of its tags are
+    also the HTTP validators (ETag, Last-Modified) of a page.
+    """
+    _name = 'real.estate.cache.tag'
+    _description = 'Public Page Cache Tag'
+    _log_access = False
+
+    name = fields.Char(string='Tag', required=True)
+    generation = fields.Integer(string='Generation')
+    # Transaction date of the last bump, i.e. the write_date of the records it was bumped for
+    changed_on = fields.Datetime(string='Changed On')
+
+    _sql_constraints = [
+        ('name_uniq', 'unique(name)', 'A cache tag is counted once.'),
+    ]
+
+    @api.model
+    def _bump(self, tags):
+        """
+        Invalidate the pages and fragments tagged with any of ``tags`` when the transaction
+        commits, so the tag rows are only locked for the duration of the commit.
+        """
+        if not tags:
+            return
+        pending = self.env.cr.precommit.data.setdefault('real.estate.cache.tag', set())
+        if not pending:
+            self.env.cr.precommit.add(self._flush_bumps)
+        pending.update(tags)
+
+    def _flush_bumps(self):
+        tags = sorted(self.env.cr.precommit.data.pop('real.estate.cache.tag', ()))
+        if not tags:
+            return
+        self.env.cr.execute(SQL("""
+            INSERT INTO real_estate_cache_tag (name, generation, changed_on)
+                 VALUES %s
+            ON CONFLICT (name) DO UPDATE SET generation = real_estate_cache_tag.generation + 1,
+                                             changed_on = EXCLUDED.changed_on
+        """, SQL(', ').join(SQL("(%s, 1, now() at time zone 'UTC')", tag) for tag in tags)))
+
+    @api.model
+    def _get_tags(self, tags):
+        """
+        ``({tag: generation}, last_changed_on)`` of ``tags`` in one query. Tags never bumped
+        are at generation 0, ``last_changed_on`` is None when none of them was bumped.
+        """
+        tags = sorted(set(tags))
+        self.env.cr.execute(SQL(
+            "SELECT name, generation, changed_on FROM real_estate_cache_tag WHERE name IN %s", tuple(tags),
+        ))
+        generations = dict.fromkeys(tags, 0)
+        changed_on = None
+        for name, generation, tag_changed_on in self.env.cr.fetchall():
+            generations[name] = generation
+            if tag_changed_on and (not changed_on or tag_changed_on > changed_on):
+                changed_on = tag_changed_on
+        return generations, changed_on
+
+    @api.model
+    def _cache_get(self, key, generations):
+        """
+        Cached value of ``key``, None when missing, expired or rendered with other
+        ``generations`` than the current ones of its tags.
+        """
+        with _page_cache_lock:
+            entry = _page_cache.get(key)
+            if entry:
+                _page_cache.move_to_end(key)
+        if not entry:
+            return None
+        expires, entry_generations, value = entry
+        if expires < time.monotonic() or entry_generations != generations:
+            self._cache_discard(key)
+            return None
+        return value
+
+    @api.model
+    def _cache_set(self, key, generations, value):
+        """
+        Store ``value`` (bytes) under ``key``. ``generations`` must have been read with
+        ``_get_tags`` before computing the value, so that a bump during the computation
+        makes the entry stale right away.
+        """
+        global _page_cache_size
+        if len(value) > PAGE_CACHE_MAX_BYTES // 16:
+            return
+        with _page_cache_lock:
+            previous = _page_cache.pop(key, None)
+            if previous:
+                _page_cache_size -= len(previous[2])
+            _page_cache[key] = (time.monotonic() + PAGE_CACHE_SECONDS, generations, value)
+            _page_cache_size += len(value)
+            while _page_cache_size > PAGE_CACHE_MAX_BYTES:
+                _key, (_expires, _generations, evicted) = _page_cache.popitem(last=False)
+                _page_cache_size -= len(evicted)
+
+    @api.model
+    def _cache_discard(self, key):
+        global _page_cache_size
+        with _page_cache_lock:
+            entry = _page_cache.pop(key, None)
+            if entry:
+                _page_cache_size -= len(entry[2])
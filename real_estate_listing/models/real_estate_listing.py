@@ -0,0 +1,299 @@
+from odoo import models, fields, api
+from odoo.tools import SQL, split_every
+from odoo.tools.sql import create_index
+from collections import defaultdict
+import base64
+import hashlib
+import json
+
+# Public listing sort options, ties are broken by id in the same direction
+LISTING_SORTS = {
+    'newest': ('id', 'desc'),
+    'price_asc': ('price', 'asc'),
+    'price_desc': ('price', 'desc'),
+    'price_per_sqft_asc': ('price_per_sqft', 'asc'),
+    'price_per_sqft_desc': ('price_per_sqft', 'desc'),
+}
+LISTING_PAGE_SIZE = 24
+LISTING_MAX_PAGE_SIZE = 60
+# Columns a listing card renders, fetched with the page instead of every stored column
+LISTING_CARD_FIELDS = [
+    'res_model', 'res_id', 'name', 'listing_type', 'price', 'area', 'bedrooms', 'city', 'zip_code', 'address',
+    'latitude', 'longitude', 'thumbnail_url', 'url',
+]
+# Columns copied from the source records by ``_listing_values``
+LISTING_SOURCE_COLUMNS = (
+    'name', 'listing_type', 'price', 'area', 'bedrooms', 'street', 'city', 'zip_code', 'address', 'latitude',
+    'longitude', 'thumbnail_url', 'url', 'is_published',
+)
+# Source records synced per upsert
+LISTING_SYNC_BATCH_SIZE = 1000
+
+
+def _encode_listing_cursor(sort, *position):
+    return base64.urlsafe_b64encode(json.dumps([sort, *position]).encode()).decode()
+
+
+def _decode_listing_cursor(cursor, sort, length=2):
+    """Position of ``length`` numbers stored in ``cursor``, None if missing, malformed or issued for another sort."""
+    if not cursor:
+        return None
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except ValueError:
+        return None
+    if not isinstance(data, list) or len(data) != length + 1 or data[0] != sort:
+        return None
+    position = data[1:]
+    if not all(isinstance(value, (int, float)) and not isinstance(value, bool) for value in position):
+        return None
+    return position
+
+
+class RealEstateListing(models.Model):
+    """
+    Denormalized copy of the public fields of every listed property, whichever module
+    holds it (see ``real.estate.listing.mixin``).
+
+    Rows are written in SQL by ``_flush_sync`` and never through the ORM, so that listing
+    and search pages of any catalog are one indexed query on a single narrow table.
+    """
+    _name = 'real.estate.listing'
+    _description = 'Real Estate Listing'
+    _order = 'id desc'
+    _log_access = False
+
+    res_model = fields.Char(string='Source Model', required=True)
+    res_id = fields.Many2oneReference(string='Source Record', model_field='res_model', required=True)
+    name = fields.Char(string='Title')
+    listing_type = fields.Selection([
+        ('buy', 'Buy'),
+        ('rent', 'Rent'),
+        ('sell', 'Sell'),
+    ], string='Type')
+    price = fields.Float(string='Price')
+    area = fields.Float(string='Area (sq ft)')
+    price_per_sqft = fields.Float(string='Price per Sq.Ft')
+    bedrooms = fields.Integer(string='Bedrooms')
+    street = fields.Char(string='Street', index='trigram')
+    city = fields.Char(string='City', index='trigram')
+    zip_code = fields.Char(string='Zip Code', index='trigram')
+    address = fields.Char(string='Address')
+    latitude = fields.Float(string='Latitude', digits=(10, 7))
+    longitude = fields.Float(string='Longitude', digits=(10, 7))
+    thumbnail_url = fields.Char(string='Thumbnail URL')
+    url = fields.Char(string='URL')
+    is_published = fields.Boolean(string='Published')
+
+    _sql_constraints = [
+        ('res_uniq', 'unique(res_model, res_id)', 'A record is listed once.'),
+    ]
+
+    def init(self):
+        super().init()
+        # Keyset pagination of the listings walks these in both directions, across catalogs
+        # or within the catalog of one module
+        for field in ('price', 'price_per_sqft'):
+            create_index(self.env.cr, f'real_estate_listing_{field}_id_index', self._table, [field, 'id'],
+                         where='is_published')
+            create_index(self.env.cr, f'real_estate_listing_res_model_{field}_id_index', self._table,
+                         ['res_model', field, 'id'], where='is_published')
+        create_index(self.env.cr, 'real_estate_listing_res_model_id_index', self._table, ['res_model', 'id'],
+                     where='is_published')
+        create_index(self.env.cr, 'real_estate_listing_latitude_longitude_index', self._table,
+                     ['latitude', 'longitude'], where='is_published')
+
+    # -------------------- SYNC --------------------
+    @api.model
+    def _queue_sync(self, records):
+        """
+        Resync the listings of ``records`` before the transaction commits, once however many
+        times they are written. Records that no longer exist by then are delisted.
+        """
+        if not records:
+            return
+        pending = self.env.cr.precommit.data.setdefault('real.estate.listing', defaultdict(set))
+        if not pending:
+            self.env.cr.precommit.add(self._flush_sync)
+        pending[records._name].update(records.ids)
+
+    def _flush_sync(self):
+        pending = self.env.cr.precommit.data.pop('real.estate.listing', {})
+        for res_model, ids in pending.items():
+            self._sync(res_model, ids)
+
+    @api.model
+    def _sync(self, res_model, ids):
+        """Upsert the listings of the ``ids`` of ``res_model`` and delete those of the missing ones."""
+        Source = self.env[res_model].sudo().with_context(active_test=False, bin_size=True)
+        sources = Source.browse(sorted(ids)).exists()
+        missing = set(ids) - set(sources.ids)
+        if missing:
+            self.env.cr.execute(SQL(
+                "DELETE FROM real_estate_listing WHERE res_model = %s AND res_id IN %s", res_model, tuple(missing),
+            ))
+        columns = LISTING_SOURCE_COLUMNS + ('price_per_sqft',)
+        for batch_ids in split_every(LISTING_SYNC_BATCH_SIZE, sources.ids):
+            rows = []
+            for res_id, vals in Source.browse(batch_ids)._listing_values().items():
+                vals['price_per_sqft'] = round(vals['price'] / vals['area'], 2) if vals.get('area') else 0
+                values = [res_model, res_id] + [vals.get(column) for column in columns]
+                rows.append(SQL('(%s)', SQL(', ').join(values)))
+            if not rows:
+                continue
+            self.env.cr.execute(SQL("""
+                INSERT INTO real_estate_listing (res_model, res_id, %s)
+                     VALUES %s
+                ON CONFLICT (res_model, res_id) DO UPDATE SET %s
+            """, SQL(', ').join(SQL.identifier(column) for column in columns),
+                SQL(', ').join(rows),
+                SQL(', ').join(SQL('%s = EXCLUDED.%s', SQL.identifier(column), SQL.identifier(column))
+                               for column in columns)))
+        self.invalidate_model()
+
+    @api.model
+    def _rebuild(self, res_model):
+        """Relist every record of ``res_model`` from scratch."""
+        self.env.cr.execute(SQL("DELETE FROM real_estate_listing WHERE res_model = %s", res_model))
+        self.env[res_model].flush_model()
+        self.env.cr.execute(SQL("SELECT id FROM %s", SQL.identifier(self.env[res_model]._table)))
+        self._sync(res_model, {row[0] for row in self.env.cr.fetchall()})
+
+    # -------------------- QUERIES --------------------
+    @api.model
+    def _public_domain(self, params, res_model=None):
+        """
+        Domain of the published listings matching the public filters in ``params``:
+        ``listing_type``, ``city``, ``zip_code``, ``location`` (street, city or zip),
+        ``min_price``, ``max_price``, ``bedrooms`` (at least) and ``bbox`` (south,west,north,east).
+        """
+        domain = [('is_published', '=', True)]
+        if res_model:
+            domain.append(('res_model', '=', res_model))
+        if params.get('listing_type') in dict(self._fields['listing_type'].selection):
+            domain.append(('listing_type', '=', params['listing_type']))
+        for param in ('city', 'zip_code'):
+            if params.get(param):
+                domain.append((param, 'ilike', params[param]))
+        if params.get('location'):
+            location = params['location']
+            domain += ['|', '|', ('city', 'ilike', location), ('zip_code', 'ilike', location),
+                       ('street', 'ilike', location)]
+        for param, field, operator in (('min_price', 'price', '>='), ('max_price', 'price', '<='),
+                                       ('bedrooms', 'bedrooms', '>=')):
+            try:
+                domain.append((field, operator, float(params[param])))
+            except (KeyError, TypeError, ValueError):
+                pass
+        try:
+            south, west, north, east = (float(v) for v in params['bbox'].split(','))
+        except (KeyError, AttributeError, ValueError):
+            pass
+        else:
+            domain += [('latitude', '>=', south), ('latitude', '<=', north)]
+            if west <= east:
+                domain += [('longitude', '>=', west), ('longitude', '<=', east)]
+            else:
+                # Viewport crosses the antimeridian
+                domain += ['|', ('longitude', '>=', west), ('longitude', '<=', east)]
+        return domain
+
+    @api.model
+    def _listing_page(self, domain, sort=None, cursor=None, limit=None, where=None):
+        """
+        One page of the listings of ``domain``, as ``(listings, next_cursor)``. ``where`` is an
+        optional SQL condition on ``real_estate_listing``, for filters on tables the domain
+        cannot reach.
+
+        Pages are keyset-paginated: the opaque ``cursor`` carries the sort value and id of
+        the last listing of the previous page, so any page is a range scan of the sort index
+        instead of an OFFSET over every previous row. ``next_cursor`` is None on the last page.
+        """
+        limit = max(1, min(limit or LISTING_PAGE_SIZE, LISTING_MAX_PAGE_SIZE))
+        if sort not in LISTING_SORTS:
+            sort = 'newest'
+        field, direction = LISTING_SORTS[sort]
+        position = _decode_listing_cursor(cursor, sort)
+        if position:
+            value, last_id = position
+            operator = '<' if direction == 'desc' else '>'
+            domain = domain + ['|', (field, operator, value), '&', (field, '=', value), ('id', operator, last_id)]
+        query = self._search(domain, order=f'{field} {direction}, id {direction}', limit=limit + 1)
+        if where:
+            query.add_where(where)
+        if query.is_empty():
+            return self.browse(), None
+        listings = self._fetch_query(query, self._determine_fields_to_fetch(LISTING_CARD_FIELDS + [field]))
+        if len(listings) <= limit:
+            return listings, None
+        listings = listings[:limit]
+        return listings, _encode_listing_cursor(sort, listings[-1][field], listings[-1].id)
+
+    def _serialize(self):
+        return [{
+            'id': listing.id,
+            'model': listing.res_model,
+            'res_id': listing.res_id,
+            'name': listing.name,
+            'type': listing.listing_type,
+            'price': listing.price,
+            'area': listing.area,
+            'bedrooms': listing.bedrooms,
+            'city': listing.city or '',
+            'zip_code': listing.zip_code or '',
+            'address': listing.address or '',
+            'latitude': listing.latitude or None,
+            'longitude': listing.longitude or None,
+            'thumbnail_url': listing.thumbnail_url or '',
+            'url': listing.url,
+        } for listing in self]
+
+
+class RealEstateListingMixin(models.AbstractModel):
+    """
+    Keeps the ``real.estate.listing`` rows of a model's records in sync.
+
+    Models implement ``_listing_values`` and list the fields it reads in ``_listing_depends``,
+    writes to other fields leave the listings alone. The listings of a model are rebuilt when
+    its module is installed or updated and none exist yet.
+    """
+    _name = 'real.estate.listing.mixin'
+    _description = 'Listed Property'
+    _listing_depends = ()
+
+    def init(self):
+        super().init()
+        if self._abstract:
+            return
+        self.env.cr.execute(SQL("SELECT 1 FROM real_estate_listing WHERE res_model = %s LIMIT 1", self._name))
+        if not self.env.cr.rowcount:
+            self.env['real.estate.listing']._rebuild(self._name)
+
+    def _listing_values(self):
+        """
+        ``{record id: values}`` of the listings of self, with a value for each of
+        LISTING_SOURCE_COLUMNS. Records that must not be shown are returned unpublished.
+        """
+        raise NotImplementedError()
+
+    def _listing_image_url(self, field_name):
+        """URL of the image in ``field_name``, changing with the record like ``website.image_url``."""
+        self.ensure_one()
+        unique = hashlib.sha512(str(self.write_date).encode()).hexdigest()[:7]
+        return f'/web/image/{self._name}/{self.id}/{field_name}?unique={unique}'
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        self.env['real.estate.listing']._queue_sync(records)
+        return records
+
+    def write(self, vals):
+        res = super().write(vals)
+        if not self._listing_depends or any(field in vals for field in self._listing_depends):
+            self.env['real.estate.listing']._queue_sync(self)
+        return res
+
+    def unlink(self):
+        self.env['real.estate.listing']._queue_sync(self)
+        return super().unlink()
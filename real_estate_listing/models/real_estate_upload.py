@@ -0,0 +1,254 @@
+from odoo import models, fields, api, _
+from odoo.exceptions import UserError
+from odoo.tools import image_process
+from datetime import timedelta
+import base64
+import filecmp
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+
+_logger = logging.getLogger(__name__)
+
+# Uploads are copied to the filestore by chunks of this size, whatever the file size
+UPLOAD_CHUNK_BYTES = 64 * 1024
+# Defaults of the real_estate_listing.upload_max_file_mb / upload_max_request_mb parameters
+UPLOAD_MAX_FILE_MB = 25
+UPLOAD_MAX_REQUEST_MB = 100
+# Images are resized to fit this box by the processing cron
+UPLOAD_MAX_RESOLUTION = 1920
+# Delay before the first retry of a failed resize, doubled on each attempt
+UPLOAD_RETRY_MINUTES = 5
+# Uploads still queued after this many days are dropped by the garbage collector
+UPLOAD_KEEP_DAYS = 7
+# Accepted image types by leading bytes, the client's content type is not trusted
+UPLOAD_SIGNATURES = (
+    (b'\xff\xd8\xff', 'image/jpeg'),
+    (b'\x89PNG\r\n\x1a\n', 'image/png'),
+    (b'GIF87a', 'image/gif'),
+    (b'GIF89a', 'image/gif'),
+)
+
+
+def _sniff_image(head):
+    """Mimetype of the image starting with ``head``, None when it is not an accepted image type."""
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return 'image/webp'
+    return next((mimetype for signature, mimetype in UPLOAD_SIGNATURES if head.startswith(signature)), None)
+
+
+class RealEstateUpload(models.Model):
+    """
+    Raw image uploaded from the website forms of the real estate modules, waiting to be
+    resized into its target.
+
+    Forms only stream the bytes to the filestore (see ``_spool``) and queue them here, the
+    processing cron then resizes each image to UPLOAD_MAX_RESOLUTION and stores it in the
+    ``field_name`` image field of the target record, or as an image attachment of the record
+    when ``field_name`` is empty.
+    """
+    _name = 'real.estate.upload'
+    _description = 'Website Image Upload'
+    _order = 'id'
+
+    attachment_id = fields.Many2one('ir.attachment', string='Raw File', required=True, ondelete='cascade')
+    res_model = fields.Char(string='Target Model', required=True)
+    res_id = fields.Many2oneReference(string='Target Record', model_field='res_model', required=True)
+    field_name = fields.Char(string='Target Field')
+    state = fields.Selection([
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ], string='Status', default='pending', required=True, index=True)
+    attempts = fields.Integer(string='Attempts')
+    next_attempt = fields.Datetime(string='Next Attempt')
+
+    # -------------------- SPOOLING --------------------
+    @api.model
+    def _upload_limits(self):
+        """``(max_file_bytes, max_request_bytes)`` from the system parameters."""
+        get_param = self.env['ir.config_parameter'].sudo().get_param
+        return (int(get_param('real_estate_listing.upload_max_file_mb', UPLOAD_MAX_FILE_MB)) * 1024 * 1024,
+                int(get_param('real_estate_listing.upload_max_request_mb', UPLOAD_MAX_REQUEST_MB)) * 1024 * 1024)
+
+    @api.model
+    def _spool(self, files, content_length=None):
+        """
+        Copy uploaded ``files`` (werkzeug FileStorage) to raw attachments without ever holding
+        a whole file in memory, and return the attachments in the order of the files, file inputs
+        left empty being skipped. ``content_length`` of the request, when known, is checked
+        before reading anything, and the size limit of the request applies to all ``files``.
+
+        Raises a UserError when a file is not a supported image or exceeds the size limits,
+        files already written are then collected by the filestore garbage collector.
+        """
+        Attachment = self.env['ir.attachment']
+        max_file_bytes, max_request_bytes = self._upload_limits()
+        if content_length and content_length > max_request_bytes:
+            raise UserError(_("The uploaded files exceed %s MB in total.", max_request_bytes // (1024 * 1024)))
+
+        attachments = Attachment
+        total = 0
+        for file in files:
+            if not file:
+                # File input left empty
+                continue
+            head = file.stream.read(UPLOAD_CHUNK_BYTES)
+            if not head:
+                raise UserError(_("%s is empty.", file.filename))
+            mimetype = _sniff_image(head)
+            if not mimetype:
+                raise UserError(_("%s is not a JPEG, PNG, GIF or WebP image.", file.filename))
+            checksum, size, fname = self._spool_file(file.stream, head, max_file_bytes, file.filename)
+            total += size
+            if total > max_request_bytes:
+                raise UserError(_("The uploaded files exceed %s MB in total.", max_request_bytes // (1024 * 1024)))
+            vals = {
+                'name': file.filename or 'image',
+                'type': 'binary',
+                'mimetype': mimetype,
+                'res_model': self._name,
+            }
+            if not fname:
+                # Database storage: the spooled file was only used to check the limits
+                file.stream.seek(0)
+                vals['raw'] = file.stream.read()
+            attachment = Attachment.create(vals)
+            if fname:
+                attachment._link_files([(fname, checksum, size)])
+            attachments |= attachment
+        return attachments
+
+    @api.model
+    def _spool_file(self, stream, head, max_file_bytes, filename):
+        """
+        Copy ``head`` and the rest of ``stream`` to the filestore by chunks, hashing on the fly.
+
+        Returns ``(checksum, size, store_fname)``; ``store_fname`` is None when attachments
+        are not stored in the filestore.
+        """
+        Attachment = self.env['ir.attachment']
+        in_filestore = Attachment._storage() == 'file'
+        directory = Attachment._filestore() if in_filestore else None
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        sha = hashlib.sha1()
+        size = 0
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.upload')
+        try:
+            with os.fdopen(fd, 'wb') as out:
+                chunk = head
+                while chunk:
+                    size += len(chunk)
+                    if size > max_file_bytes:
+                        raise UserError(_("%(file)s is larger than %(size)s MB.",
+                                          file=filename, size=max_file_bytes // (1024 * 1024)))
+                    sha.update(chunk)
+                    out.write(chunk)
+                    chunk = stream.read(UPLOAD_CHUNK_BYTES)
+            checksum = sha.hexdigest()
+            if not in_filestore:
+                return checksum, size, None
+            fname = Attachment._checksum_fname(checksum)
+            full_path = Attachment._full_path(fname)
+            if not os.path.exists(full_path):
+                os.makedirs(os.path.dirname(full_path), exist_ok=True)
+                os.replace(tmp_path, full_path)
+            elif not filecmp.cmp(tmp_path, full_path, shallow=False):
+                raise UserError(_("The file for checksum %s is corrupted, %s could not be stored.",
+                                  checksum, filename))
+            # Collected if the transaction creating the attachment rolls back
+            Attachment._mark_for_gc(fname)
+            return checksum, size, fname
+        finally:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+
+    @api.model
+    def _queue(self, attachments, record, field_name=False):
+        """Queue raw ``attachments`` to be resized into ``field_name`` of ``record`` (or attached to it)."""
+        uploads = self.create([{
+            'attachment_id': attachment.id,
+            'res_model': record._name,
+            'res_id': record.id,
+            'field_name': field_name,
+        } for attachment in attachments])
+        for upload in uploads:
+            upload.attachment_id.res_id = upload.id
+        if uploads:
+            self.env.ref('real_estate_listing.ir_cron_process_uploads')._trigger()
+        return uploads
+
+    # -------------------- PROCESSING --------------------
+    def _process(self):
+        """Resize the raw image and store it into its target, raises on failure."""
+        self.ensure_one()
+        record = self.env[self.res_model].browse(self.res_id).exists()
+        if not record:
+            return
+        image = image_process(self.attachment_id.raw, size=(UPLOAD_MAX_RESOLUTION, UPLOAD_MAX_RESOLUTION))
+        if self.field_name:
+            record.write({self.field_name: base64.b64encode(image)})
+        else:
+            self.attachment_id.write({'raw': image, 'res_model': record._name, 'res_id': record.id})
+
+    @api.model
+    def _cron_process_uploads(self, batch_size=20):
+        """Resize queued uploads, with exponential backoff on errors."""
+        max_attempts = int(self.env['ir.config_parameter'].sudo().get_param(
+            'real_estate_listing.upload_max_attempts', 3))
+        now = fields.Datetime.now()
+        uploads = self.search([
+            ('state', 'in', ('pending', 'running', 'failed')),
+            ('attempts', '<', max_attempts),
+            '|', ('next_attempt', '=', False), ('next_attempt', '<=', now),
+        ], limit=batch_size, order='next_attempt asc nulls first, id')
+        commit = not getattr(threading.current_thread(), 'testing', False)
+
+        for upload in uploads:
+            # A run that did not report back within the lease is retried by a later cron run
+            upload.write({'state': 'running', 'next_attempt': now + timedelta(hours=1)})
+            if commit:
+                self.env.cr.commit()
+            try:
+                upload._process()
+            except Exception as e:
+                if commit:
+                    self.env.cr.rollback()
+                attempts = upload.attempts + 1
+                _logger.warning(f"Processing upload {upload.id} failed (attempt {attempts}): {e}")
+                upload.write({
+                    'state': 'failed',
+                    'attempts': attempts,
+                    'next_attempt': fields.Datetime.now() + timedelta(minutes=UPLOAD_RETRY_MINUTES * 2 ** (attempts - 1)),
+                })
+            else:
+                upload.write({'state': 'done', 'next_attempt': False})
+            if commit:
+                self.env.cr.commit()
+
+        if len(uploads) == batch_size:
+            self.env.ref('real_estate_listing.ir_cron_process_uploads')._trigger()
+
+    @api.autovacuum
+    def _gc_done_uploads(self):
+        """
+        Drop the uploads that will not be processed anymore, with the raw files that were not
+        moved to their target: processed ones, those which failed ``upload_max_attempts`` times
+        and those queued for more than UPLOAD_KEEP_DAYS, e.g. targeting a removed model.
+        """
+        max_attempts = int(self.env['ir.config_parameter'].sudo().get_param(
+            'real_estate_listing.upload_max_attempts', 3))
+        uploads = self.search([
+            '|', '|', ('state', '=', 'done'),
+            '&', ('state', '=', 'failed'), ('attempts', '>=', max_attempts),
+            ('create_date', '<', fields.Datetime.now() - timedelta(days=UPLOAD_KEEP_DAYS)),
+        ])
+        failed = uploads.filtered(lambda upload: upload.state != 'done')
+        if failed:
+            _logger.info(f"Dropping {len(failed)} upload(s) that could not be processed")
+        uploads.attachment_id.filtered(lambda attachment: attachment.res_model == self._name).unlink()
+        uploads.exists().unlink()
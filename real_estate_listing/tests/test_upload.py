@@ -0,0 +1,82 @@
+import base64
+import io
+
+from PIL import Image
+from werkzeug.datastructures import FileStorage
+
+from odoo.exceptions import UserError
+from odoo.tests import TransactionCase, tagged
+
+
+def _png(size=(64, 32), color='red'):
+    buffer = io.BytesIO()
+    Image.new('RGB', size, color).save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+def _file(data, filename='image.png'):
+    return FileStorage(stream=io.BytesIO(data), filename=filename)
+
+
+@tagged('post_install', '-at_install')
+class TestUpload(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.Upload = cls.env['real.estate.upload']
+        cls.partner = cls.env['res.partner'].create({'name': 'Upload Target'})
+
+    def test_spool_keeps_content(self):
+        data = _png()
+        attachment = self.Upload._spool([_file(data)])
+        self.assertEqual(attachment.raw, data)
+        self.assertEqual(attachment.file_size, len(data))
+        self.assertEqual(attachment.mimetype, 'image/png')
+        if attachment._storage() == 'file':
+            self.assertEqual(attachment.store_fname, attachment._checksum_fname(attachment.checksum))
+
+    def test_spool_same_content_twice(self):
+        data = _png(color='blue')
+        first = self.Upload._spool([_file(data)])
+        second = self.Upload._spool([_file(data, 'copy.png')])
+        self.assertEqual(first.store_fname, second.store_fname)
+        self.assertEqual(second.raw, data)
+
+    def test_spool_skips_empty_inputs(self):
+        attachments = self.Upload._spool([_file(b'', ''), _file(_png())])
+        self.assertEqual(len(attachments), 1)
+
+    def test_spool_rejects_invalid_files(self):
+        with self.assertRaises(UserError):
+            self.Upload._spool([_file(b'', 'empty.png')])
+        with self.assertRaises(UserError):
+            self.Upload._spool([_file(b'not an image', 'image.png')])
+        with self.assertRaises(UserError):
+            self.Upload._spool([_file(_png())], content_length=10 ** 12)
+
+    def test_process_into_field(self):
+        attachment = self.Upload._spool([_file(_png(size=(3000, 1500)))])
+        upload = self.Upload._queue(attachment, self.partner, 'image_1920')
+        self.Upload._cron_process_uploads()
+        self.assertEqual(upload.state, 'done')
+        image = Image.open(io.BytesIO(base64.b64decode(self.partner.image_1920)))
+        self.assertEqual(image.size, (1920, 960))
+
+    def test_process_as_attachment(self):
+        data = _png()
+        attachment = self.Upload._spool([_file(data)])
+        upload = self.Upload._queue(attachment, self.partner)
+        self.Upload._cron_process_uploads()
+        self.assertEqual(upload.state, 'done')
+        self.assertEqual((attachment.res_model, attachment.res_id), ('res.partner', self.partner.id))
+        self.assertTrue(attachment.raw)
+
+    def test_gc_drops_abandoned_uploads(self):
+        attachments = self.Upload._spool([_file(_png()), _file(_png(color='green')), _file(_png(color='white'))])
+        failed, pending, done = self.Upload._queue(attachments, self.partner)
+        failed.write({'state': 'failed', 'attempts': 3})
+        done.write({'state': 'done'})
+        self.Upload._gc_done_uploads()
+        self.assertEqual((failed | pending | done).exists(), pending)
+        self.assertEqual(attachments.exists(), pending.attachment_id)
@@ -1,2 +1,7 @@
 from . import models
 from . import controllers
+
+
+def _post_init_hook(env):
+    # property_property only exists once every model of the module is set up
+    env['property.facet']._rebuild()
@@ -1,23 +1,28 @@
 {
     'name': 'Real Estate Management',
-    'version': '1.0',
+    'version': '1.2',
     'license': 'LGPL-3',
     'category': 'Website',
     'summary': 'Module for managing real estate properties and website integration',
     'description': 'Manage real estate properties with interactive map, listings, and contact forms.',
-    'depends': ['base', 'base_geolocalize', 'web', 'website_sale', 'mail', 'base_setup'],
+    'depends': ['base', 'base_geolocalize', 'web', 'website_sale', 'mail', 'base_setup', 'real_estate_listing'],
     'data': [
         # Security
         'security/ir.model.access.csv',
 
         # data
         'data/mail_property_rejection.xml',
+        'data/ir_cron_data.xml',
 
         # Views
         'views/property_views.xml',
         'views/property_category_views.xml',
         'views/menu.xml',
         'views/property_registration_views.xml',
+        'views/property_geocode_cache_views.xml',
+        'views/property_city_insight_views.xml',
+        'views/property_import_views.xml',
+        'views/property_market_stat_views.xml',
 
         # Qweb Templates
         'views/qweb_templates/property_map_template.xml',
@@ -32,6 +37,7 @@
             # 'real_estate_management/staticatic/css/property_map.css'
         ],
     },
+    'post_init_hook': '_post_init_hook',
     'installable': True,
     'application': True,
 }
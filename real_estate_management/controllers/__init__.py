@@ -1 +1,2 @@
 from . import property_controller
+from . import metrics_controller
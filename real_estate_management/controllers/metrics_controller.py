@@ -0,0 +1,53 @@
+import hmac
+import ipaddress
+
+from odoo import http
+from odoo.http import request
+
+from ..models.ir_http import METRICS_ROUTE, _exposition
+
+
+def _is_allowed_address(address, allowed):
+    """Whether ``address`` is one of the comma separated addresses or networks of ``allowed``."""
+    try:
+        address = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    for network in allowed.split(','):
+        try:
+            if address in ipaddress.ip_network(network.strip(), strict=False):
+                return True
+        except ValueError:
+            continue
+    return False
+
+
+class MetricsController(http.Controller):
+
+    @http.route(METRICS_ROUTE, type='http', auth='public', methods=['GET'], sitemap=False, save_session=False)
+    def metrics(self):
+        """
+        Route latency, SQL and render metrics of every worker, in the Prometheus text format.
+
+        Nothing is exposed until a scraper is configured, with either of the system parameters:
+
+        * ``real_estate_management.metrics_allowed_ips``: comma separated addresses or networks
+          (e.g. ``10.0.0.0/8``), loopback included, allowed to scrape.
+        * ``real_estate_management.metrics_token``: bearer token the scraper sends in its
+          ``Authorization`` header, from any address.
+
+        Behind a reverse proxy every request comes from the proxy's address, so the server must
+        run with ``--proxy-mode`` for the address of the scraper to be taken from the proxy's
+        X-Forwarded-For header, otherwise allowing the proxy's address allows everyone.
+        """
+        ICP = request.env['ir.config_parameter'].sudo()
+        allowed = ICP.get_param('real_estate_management.metrics_allowed_ips', '')
+        token = ICP.get_param('real_estate_management.metrics_token', '')
+        authorization = request.httprequest.headers.get('Authorization', '')
+        if not ((token and hmac.compare_digest(authorization.encode(), f'Bearer {token}'.encode()))
+                or (allowed and _is_allowed_address(request.httprequest.remote_addr, allowed))):
+            return request.not_found()
+        return request.make_response(_exposition(), headers=[
+            ('Content-Type', 'text/plain; version=0.0.4; charset=utf-8'),
+            ('Cache-Control', 'no-store'),
+        ])
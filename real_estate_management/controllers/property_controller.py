@@ -2,166 +2,284 @@ from odoo import http, fields
 from odoo.http import request
 import json
 from odoo.tools.json import scriptsafe as json_scriptsafe
-import base64
 from odoo.exceptions import UserError
+from odoo.tools import escape_psql, lazy
+from odoo.addons.real_estate_listing.controllers.cache import cached_route
+import functools
 import logging
 
 _logger = logging.getLogger(__name__)
 
+# Zoom level from which the map endpoint stops clustering and returns every marker
+MAP_CLUSTER_MAX_ZOOM = 15
+# Maximum number of individual markers returned for one viewport
+MAP_MARKER_LIMIT = 300
+# Search box suggestions: shortest input answered, longest input considered, suggestions per kind
+AUTOCOMPLETE_MIN_LENGTH = 2
+AUTOCOMPLETE_MAX_LENGTH = 64
+AUTOCOMPLETE_LIMIT = 6
+# Public routes of this module read their Cache-Control overrides from its system parameters
+cached_route = functools.partial(cached_route, namespace='real_estate_management')
+
 
 class RealEstateController(http.Controller):
 
     @http.route('/', type='http', auth='public', website=True)
+    @cached_route(lambda **kwargs: ['properties', 'categories', 'city_insights', 'market_stats'], 'page')
     def property_map(self, **kwargs):
 
         # Fetch published properties from database
         Property = request.env['property.property'].sudo()
         # Get the selected city from URL parameters (if any)
         selected_city = kwargs.get('city', '')
-        all_properties = Property.search([('is_published', '=', True)])
-        city_list = sorted(list(set([p.city for p in all_properties if p.city])))
-        # Build the search domain with city filter if selected
-        search_domain = [
-            ('is_published', '=', True),
-            ('latitude', '!=', False),
-            ('longitude', '!=', False)
-        ]
-        # Add city filter if a city is selected
-        if selected_city:
-            search_domain.append(('city', '=', selected_city))
+        facets = request.env['property.facet'].sudo()._get_facets()
 
-        # Fetch properties based on the search domain
-        properties = Property.search(search_domain)
+        # Markers are loaded per viewport from /property/map/data, the page only needs
+        # the count and the area to center the map on
+        search_domain = self._map_domain(kwargs)
+        property_count = Property.search_count(search_domain)
+        map_bounds = Property._get_map_bounds(search_domain)
 
         # Fetch featured properties for selected city, limit to 5
         featured_domain = [('is_published', '=', True), ('is_featured', '=', True)]
         if selected_city:
             featured_domain.append(('city', '=', selected_city))
-        featured_properties = Property.search(featured_domain)
+        # Only searched when the cached carousel fragment is missing
+        featured_properties = lazy(lambda: Property.search(featured_domain)._fetch_payload('card'))
 
         # Get city investment info
         city_investment_info = None
         if selected_city:
             city_investment_info = Property.get_city_investment_info(selected_city)
 
-        # Define a reusable color palette
-        palette = ["#059669", "#dc2626", "#7c3aed", "#ea580c", "#2563eb", "#d97706", "#0891b2", "#9333ea"]
-        category_colors = {}
-        idx = 0
-
-        # Build comprehensive data
-        property_data = []
-        for prop in properties:
-            if prop.latitude and prop.longitude:
-                cat = prop.category_id.name if prop.category_id else 'Property'
-                if cat not in category_colors:
-                    category_colors[cat] = palette[idx % len(palette)]
-                    idx += 1
-
-                image_url = None
-                if prop.image:
-                    # Create base64 data URL for the image
-                    image_url = f"data:image/png;base64,{prop.image.decode('utf-8')}"
-                elif prop.gallery_image_ids:
-                    # Use first image from gallery if main image not available
-                    first_image = prop.gallery_image_ids[0]
-                    if first_image.datas:
-                        image_url = f"data:image/png;base64,{first_image.datas.decode('utf-8')}"
-
-                full_address = ", ".join(filter(None, [prop.street, prop.city, prop.zip_code]))
-
-                # Build property data
-                property_data.append({
-                    'id': prop.id,
-                    'name': prop.name or '',
-                    'latitude': float(prop.latitude),
-                    'longitude': float(prop.longitude),
-                    'street': prop.street or '',
-                    'city': prop.city or '',
-                    'zip_code': prop.zip_code or '',
-                    'price': float(prop.price) if prop.price else 0,
-                    'contact_phone': prop.contact_phone or '',
-                    'contact_email': prop.contact_email or '',
-                    'contact_name': prop.contact_name or '',
-                    'short_description': prop.short_description or '',
-                    'image_url': image_url,
-                    'property_type': cat,
-                    'nearby_landmarks': prop.nearby_landmarks or '',
-                    'views': prop.views or 0,
-                    'seo_title': prop.seo_title or '',
-                    'marker_color': category_colors[cat],
-                    'full_address': full_address,
-                })
-
         return request.render('real_estate_management.property_map_template', {
-            'property_count': len(property_data),
-            'properties_json': json_scriptsafe.dumps(property_data) if property_data else '[]',
-            'category_colors': json_scriptsafe.dumps(category_colors),
-            'city_list': city_list,
+            'property_count': property_count,
+            'map_bounds': json_scriptsafe.dumps(map_bounds) if map_bounds else '',
+            'category_colors': json_scriptsafe.dumps(self._category_colors()),
+            'city_list': facets['city'],
             'selected_city': selected_city,
             'featured_properties': featured_properties,
             'city_investment_info': city_investment_info,
+            # Only read when the cached snapshot fragment is missing
+            'market_snapshot': lazy(lambda: request.env['property.market.stat'].sudo()._market_snapshot(selected_city)),
+            # Keep serving the page without the insight placeholder once the cron generated it
+            'no_page_cache': bool(city_investment_info) and not city_investment_info['ai_content_generated'],
+        })
+
+    @http.route('/property/map/data', type='http', auth='public', website=True, methods=['GET'])
+    @cached_route(lambda **kwargs: ['properties', 'categories'], 'json', store=False)
+    def property_map_data(self, **kwargs):
+        """
+        Markers for the current map viewport.
+
+        Accepts ``bbox`` (south,west,north,east), ``zoom`` and the same filters as the map
+        page (city, category_id, min_price, max_price). Below ``MAP_CLUSTER_MAX_ZOOM`` and
+        above ``MAP_MARKER_LIMIT`` matches, markers are aggregated into grid clusters.
+        """
+        Property = request.env['property.property'].sudo()
+        domain = self._map_domain(kwargs)
+        bbox = self._parse_bbox(kwargs.get('bbox'))
+        if bbox:
+            south, west, north, east = bbox
+            domain += [('latitude', '>=', south), ('latitude', '<=', north)]
+            if west <= east:
+                domain += [('longitude', '>=', west), ('longitude', '<=', east)]
+            else:
+                # Viewport crosses the antimeridian
+                domain += ['|', ('longitude', '>=', west), ('longitude', '<=', east)]
+        try:
+            zoom = min(max(int(kwargs.get('zoom', MAP_CLUSTER_MAX_ZOOM)), 0), 19)
+        except ValueError:
+            zoom = MAP_CLUSTER_MAX_ZOOM
+
+        count = Property.search_count(domain)
+        if zoom >= MAP_CLUSTER_MAX_ZOOM or count <= MAP_MARKER_LIMIT:
+            clusters, markers = [], Property.search(domain, limit=MAP_MARKER_LIMIT)
+        else:
+            clusters, markers = Property._get_map_clusters(domain, zoom)
+
+        return request.make_json_response({
+            'count': count,
+            'clusters': clusters,
+            'markers': markers._fetch_payload('marker')._serialize_markers(request.website, self._category_colors()),
+        })
+
+    @http.route('/property/nearby', type='http', auth='public', website=True, methods=['GET'], sitemap=False)
+    @cached_route(lambda **kwargs: ['properties', 'categories'], 'json', store=False)
+    def property_nearby(self, **kwargs):
+        """
+        Properties nearest to ``lat``/``lng`` first, with their distance, as JSON markers.
 
+        Accepts an optional ``radius`` in km (otherwise the nearest ones whatever the distance,
+        within the model's maximum radius), ``limit`` and the ``cursor`` of the previous page,
+        plus the filters of the map.
+        """
+        near = self._parse_near(kwargs)
+        if not near:
+            return request.make_json_response({'error': 'lat and lng are required'}, status=400)
+        limit = kwargs.get('limit', '')
+        properties, next_cursor = request.env['property.property'].sudo()._listing_page(
+            self._map_domain(dict(kwargs, radius='')), sort='distance', cursor=kwargs.get('cursor'),
+            limit=int(limit) if limit.isdigit() else None, near=near,
+        )
+        return request.make_json_response({
+            'markers': properties._fetch_payload('marker')._serialize_markers(
+                request.website, self._category_colors(), origin=near),
+            'next_cursor': next_cursor,
         })
 
+    def _map_domain(self, kwargs):
+        """Domain of the geocoded, published properties matching the map filters."""
+        domain = [
+            ('is_published', '=', True),
+            ('latitude', '!=', False),
+            ('longitude', '!=', False)
+        ]
+        if kwargs.get('city'):
+            domain.append(('city', '=', kwargs['city']))
+        if kwargs.get('category_id', '').isdigit():
+            domain.append(('category_id', '=', int(kwargs['category_id'])))
+        for param, operator in (('min_price', '>='), ('max_price', '<=')):
+            try:
+                domain.append(('price', operator, float(kwargs[param])))
+            except (KeyError, ValueError):
+                pass
+        near = self._parse_near(kwargs)
+        if near and near[2]:
+            domain += request.env['property.property'].sudo()._geo_domain(*near)
+        return domain
+
+    def _parse_near(self, kwargs):
+        """``(latitude, longitude, radius_km)`` from the ``lat``, ``lng`` and ``radius`` parameters, radius may be None."""
+        try:
+            latitude, longitude = float(kwargs['lat']), float(kwargs['lng'])
+        except (KeyError, ValueError):
+            return None
+        if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+            return None
+        try:
+            radius = float(kwargs['radius'])
+        except (KeyError, ValueError):
+            radius = None
+        return latitude, longitude, radius if radius and radius > 0 else None
+
+    def _parse_bbox(self, bbox):
+        """Parse a ``south,west,north,east`` string, returns None when missing or invalid."""
+        try:
+            south, west, north, east = (float(v) for v in (bbox or '').split(','))
+        except ValueError:
+            return None
+        if not (-90 <= south <= north <= 90 and -180 <= west <= 180 and -180 <= east <= 180):
+            return None
+        return south, west, north, east
+
+    def _category_colors(self):
+        """Stable category name -> marker color mapping, shared by the markers and the legend."""
+        palette = ["#059669", "#dc2626", "#7c3aed", "#ea580c", "#2563eb", "#d97706", "#0891b2", "#9333ea"]
+        categories = request.env['property.category'].sudo().search([], order='id')
+        category_colors = {cat.name: palette[idx % len(palette)] for idx, cat in enumerate(categories)}
+        category_colors.setdefault('Property', palette[len(categories) % len(palette)])
+        return category_colors
+
     @http.route('/property/<int:property_id>', type='http', auth='public', website=True)
     def property_detail(self, property_id, **kwargs):
         """Individual property detail page"""
+        response = self._property_detail_page(property_id)
+        # Cached hits and revalidations count as views too, not found is returned as an exception
+        if getattr(response, 'status_code', None) in (200, 304):
+            request.env['property.view.event'].sudo()._log_view(property_id)
+        return response
+
+    @cached_route(lambda property_id: [f'property:{property_id}', 'categories'], 'page')
+    def _property_detail_page(self, property_id):
         prop = request.env['property.property'].sudo().browse(property_id)
         if not prop.exists() or not prop.is_published:
             return request.not_found()
-        if not prop.ai_content_generated:
-            try:
-                prop.generate_ai_content()
-            except Exception as e:
-                _logger.error(f"Failed to generate AI content for property {prop.id}: {e}")
-        try:
-            prop.write({'views': prop.views + 1})
-        except Exception as e:
-            _logger.error(f"Failed to update views for property {prop.id}: {e}")
         return request.render('real_estate_management.property_detail_page', {
             'property': prop,
-
+            # Only read when the cached recommendations fragment is missing
+            'recommendations': lazy(prop._get_recommendations),
         })
 
     @http.route('/properties', type='http', auth='public', website=True)
+    @cached_route(lambda **kwargs: ['properties', 'categories'], 'page')
     def property_listing(self, **kwargs):
-        search = kwargs.get('search', '')
-        city = kwargs.get('city', '')
-        zip_code = kwargs.get('zip_code', '')
+        properties, next_cursor = self._listing_page(kwargs)
+        return request.render('real_estate_management.property_listing_template', {
+            'properties': properties,
+            'next_cursor': next_cursor,
+            'facets': request.env['property.facet'].sudo()._get_facets(),
+            'search': kwargs.get('search', ''),
+            'city': kwargs.get('city', ''),
+            'zip_code': kwargs.get('zip_code', ''),
+            'category_id': kwargs.get('category_id', ''),
+            'price_band': kwargs.get('price_band', ''),
+            'area_band': kwargs.get('area_band', ''),
+            'lat': kwargs.get('lat', ''),
+            'lng': kwargs.get('lng', ''),
+            'radius': kwargs.get('radius', ''),
+            'sort': kwargs.get('sort', ''),
+        })
+
+    @http.route('/properties/page', type='http', auth='public', website=True, methods=['GET'], sitemap=False)
+    @cached_route(lambda **kwargs: ['properties', 'categories'], 'json', store=False)
+    def property_listing_page(self, **kwargs):
+        """Next listing page for infinite scroll: card data, rendered cards and the following cursor, as JSON"""
+        properties, next_cursor = self._listing_page(kwargs)
+        html = request.env['ir.qweb']._render('real_estate_management.property_listing_cards', {
+            'properties': properties,
+        })
+        return request.make_json_response({
+            'properties': properties,
+            'html': html,
+            'next_cursor': next_cursor,
+        })
 
+    def _listing_page(self, kwargs):
+        """Card data of the listing page requested by ``kwargs`` and the cursor of the next one"""
         domain = [('is_published', '=', True)]
-        if search:
-            domain += ['|', '|',
-                       ('name', 'ilike', search),
-                       ('city', 'ilike', search),
-                       ('zip_code', 'ilike', search)]
-        if city:
-            domain.append(('city', 'ilike', city))
-        if zip_code:
-            domain.append(('zip_code', 'ilike', zip_code))
-
-        properties = request.env['property.property'].sudo().search(domain)
-
-        property_card_data = []
-        for prop in properties:
-            property_card_data.append({
+        if kwargs.get('city'):
+            domain.append(('city', 'ilike', kwargs['city']))
+        if kwargs.get('zip_code'):
+            domain.append(('zip_code', 'ilike', kwargs['zip_code']))
+        if kwargs.get('category_id', '').isdigit():
+            domain.append(('category_id', '=', int(kwargs['category_id'])))
+        for band in ('price_band', 'area_band'):
+            if kwargs.get(band):
+                domain += request.env['property.facet']._band_domain(band, kwargs[band])
+        limit = kwargs.get('limit', '')
+        limit = int(limit) if limit.isdigit() else None
+        near = self._parse_near(kwargs)
+
+        properties, next_cursor = request.env['property.property'].sudo()._listing_page(
+            domain, sort=kwargs.get('sort'), cursor=kwargs.get('cursor'), limit=limit, text=kwargs.get('search'),
+            near=near,
+        )
+        return properties._fetch_payload('card')._serialize_cards(request.website, origin=near), next_cursor
+
+    @http.route('/property/autocomplete', type='http', auth='public', website=True, methods=['GET'], sitemap=False)
+    @cached_route(lambda **kwargs: ['properties'], 'autocomplete', store=False)
+    def property_autocomplete(self, term='', **kwargs):
+        """Cities and properties matching the beginning of a search box input, as JSON"""
+        term = term.strip()[:AUTOCOMPLETE_MAX_LENGTH]
+        if len(term) < AUTOCOMPLETE_MIN_LENGTH:
+            return request.make_json_response({'cities': [], 'properties': []})
+
+        Property = request.env['property.property'].sudo()
+        published = [('is_published', '=', True)]
+        city_groups = Property._read_group(
+            published + [('city', '=ilike', escape_psql(term) + '%')],
+            ['city'], ['__count'], order='__count desc', limit=AUTOCOMPLETE_LIMIT,
+        )
+        properties = Property._search_ranked(term, published, limit=AUTOCOMPLETE_LIMIT)
+        return request.make_json_response({
+            'cities': [{'city': city, 'count': count} for city, count in city_groups],
+            'properties': [{
                 'id': prop.id,
                 'name': prop.name,
-                'image_url': f"data:image/png;base64,{prop.image.decode('utf-8')}" if prop.image else '',
-                'category': prop.category_id.name or '',
-                'price': prop.price,
-                'plot_area': prop.plot_area,
-                'price_per_sqft': prop.price_per_sqft,
-                'city': prop.city,
-                'zip_code': prop.zip_code,
-            })
-
-        return request.render('real_estate_management.property_listing_template', {
-            'properties': property_card_data,
-            'search': search,
-            'city': city,
-            'zip_code': zip_code,
+                'city': prop.city or '',
+                'url': f'/property/{prop.id}',
+            } for prop in properties],
         })
 
     @http.route('/property/register', type='http', auth='public', website=True)
@@ -186,23 +304,17 @@ class RealEstateController(http.Controller):
                 'status': 'submitted',
             }
 
-            # Create property record
-            property_rec = request.env['property.registration'].sudo().create(property_vals)
-
-            # Save uploaded images (main + gallery)
-            for idx, file in enumerate(upload_files):
-                content = base64.b64encode(file.read())
-                if idx == 0:
-                    property_rec.image = content  # First image as main
-                else:
-                    request.env['ir.attachment'].sudo().create({
-                        'name': file.filename,
-                        'res_model': 'property.registration',
-                        'res_id': property_rec.id,
-                        'type': 'binary',
-                        'datas': content,
-                        'mimetype': file.content_type,
-                    })
+            # Nothing of a rejected submission is kept, e.g. when an image is over the size limit
+            with request.env.cr.savepoint():
+                # Stream the images to the filestore, they are resized into the registration
+                # (first one as main image, the others as gallery) by the upload cron
+                Upload = request.env['real.estate.upload'].sudo()
+                attachments = Upload._spool(upload_files, request.httprequest.content_length)
+
+                # Create property record
+                property_rec = request.env['property.registration'].sudo().create(property_vals)
+                Upload._queue(attachments[:1], property_rec, 'image')
+                Upload._queue(attachments[1:], property_rec)
 
             return request.render('real_estate_management.property_submission_success')
 
@@ -0,0 +1,35 @@
+from odoo import api, SUPERUSER_ID
+
+
+def migrate(cr, version):
+    """Move city insights out of the dummy 'City Data - X' properties into property.city.insight."""
+    if not version:
+        return
+    cr.execute("""
+        SELECT column_name FROM information_schema.columns
+         WHERE table_name = 'property_property' AND column_name = 'last_city_processed'
+    """)
+    if not cr.fetchone():
+        return
+
+    cr.execute("""
+        INSERT INTO property_city_insight (city, city_key, investment_reasons, growth_potential, infrastructure,
+                                           market_trends, state, generation_date, attempts,
+                                           create_uid, create_date, write_uid, write_date)
+        SELECT DISTINCT ON (lower(trim(last_city_processed)))
+               trim(last_city_processed), lower(trim(last_city_processed)), city_investment_reasons,
+               city_growth_potential, city_infrastructure, city_market_trends, 'done',
+               COALESCE(city_investment_date, now() at time zone 'UTC'), 0,
+               %s, now() at time zone 'UTC', %s, now() at time zone 'UTC'
+          FROM property_property
+         WHERE city_investment_generated AND last_city_processed IS NOT NULL
+         ORDER BY lower(trim(last_city_processed)), city_investment_date DESC NULLS LAST
+        ON CONFLICT (city_key) DO NOTHING
+    """, (SUPERUSER_ID, SUPERUSER_ID))
+
+    env = api.Environment(cr, SUPERUSER_ID, {})
+    cr.execute("""
+        SELECT id FROM property_property
+         WHERE last_city_processed IS NOT NULL AND name = 'City Data - ' || last_city_processed
+    """)
+    env['property.property'].browse([row[0] for row in cr.fetchall()]).unlink()
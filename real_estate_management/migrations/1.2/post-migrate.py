@@ -0,0 +1,9 @@
+from odoo import api, SUPERUSER_ID
+
+
+def migrate(cr, version):
+    """Count the facets of the properties published before property.facet existed."""
+    if not version:
+        return
+    env = api.Environment(cr, SUPERUSER_ID, {})
+    env['property.facet']._rebuild()
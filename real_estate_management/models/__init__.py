@@ -1,3 +1,14 @@
+from . import property_facet
 from . import property
 from . import property_category
 from  . import property_registration
+from . import property_geocode_cache
+from . import property_city_insight
+from . import property_view
+from . import property_neighbor
+from . import property_market_stat
+from . import mail_mail
+from . import ir_attachment
+from . import property_import
+from . import ir_http
+from . import ir_qweb
@@ -0,0 +1,103 @@
+from odoo import models, api
+from odoo.tools import SQL
+import hashlib
+import logging
+import os
+
+from odoo.addons.real_estate_listing.models.real_estate_upload import UPLOAD_CHUNK_BYTES
+
+_logger = logging.getLogger(__name__)
+
+# Checksums whose attachments are collapsed per cron run
+DEDUP_BATCH_SIZE = 500
+
+
+class IrAttachment(models.Model):
+    """
+    Files of the filestore are named after the SHA-1 of their content, so attachments with the
+    same content can share one file: this is how approved registrations hand their images to
+    their property (see property.registration ``_link_gallery`` and ``_link_cover``). Sharing is
+    safe since the filestore garbage collector only deletes a file once no attachment refers to
+    it anymore, the attachments referring to a file being its reference count.
+    """
+    _inherit = 'ir.attachment'
+
+    @api.model
+    def _cron_collapse_duplicates(self, batch_size=DEDUP_BATCH_SIZE):
+        """
+        Point the attachments having the same content to a single filestore file: those stored
+        under another file name (e.g. copied from another filestore or written by an older
+        version) or in the database, as long as another attachment has the content as a file.
+        The files left without attachment are removed by the filestore garbage collector.
+
+        Checksums are walked in order, ``batch_size`` at a time, from the one saved by the
+        previous run in the real_estate_management.dedup_checksum_cursor parameter, so
+        checksums without a usable file do not hold back the following ones.
+        """
+        if self._storage() != 'file':
+            return
+        ICP = self.env['ir.config_parameter'].sudo()
+        cursor = ICP.get_param('real_estate_management.dedup_checksum_cursor', '')
+        self.flush_model()
+        self.env.cr.execute(SQL("""
+            SELECT checksum, array_agg(DISTINCT store_fname) FILTER (WHERE store_fname IS NOT NULL)
+              FROM ir_attachment
+             WHERE type = 'binary' AND checksum > %s
+               AND (store_fname IS NOT NULL OR db_datas IS NOT NULL)
+          GROUP BY checksum
+            HAVING count(DISTINCT store_fname) > 1
+                OR (count(DISTINCT store_fname) = 1 AND bool_or(store_fname IS NULL))
+          ORDER BY checksum
+             LIMIT %s
+        """, cursor, batch_size))
+        groups = self.env.cr.fetchall()
+        collapsed = 0
+        for checksum, fnames in groups:
+            target = self._dedup_target(checksum, fnames)
+            if not target:
+                continue
+            self.env.cr.execute(SQL("""
+                UPDATE ir_attachment
+                   SET store_fname = %(target)s, db_datas = NULL
+                 WHERE checksum = %(checksum)s AND type = 'binary'
+                   AND (store_fname IS NOT NULL OR db_datas IS NOT NULL)
+                   AND store_fname IS DISTINCT FROM %(target)s
+            """, target=target, checksum=checksum))
+            collapsed += self.env.cr.rowcount
+            for fname in fnames:
+                if fname != target:
+                    self._mark_for_gc(fname)
+        self.invalidate_model(['store_fname', 'db_datas'])
+        if collapsed:
+            _logger.info(f"Pointed {collapsed} duplicate attachment(s) of {len(groups)} file(s) to a shared file")
+        if len(groups) == batch_size:
+            ICP.set_param('real_estate_management.dedup_checksum_cursor', groups[-1][0])
+            self.env.ref('real_estate_management.ir_cron_collapse_duplicate_attachments')._trigger()
+        else:
+            # Pass complete, the next run starts over
+            ICP.set_param('real_estate_management.dedup_checksum_cursor', False)
+
+    @api.model
+    def _dedup_target(self, checksum, fnames):
+        """
+        File name the attachments of content ``checksum`` should share: the content-addressed
+        one if it exists, else one of ``fnames``, or None if none of the files holds that content.
+        """
+        canonical = self._checksum_fname(checksum)
+        for fname in [canonical] + [fname for fname in fnames if fname != canonical]:
+            full_path = self._full_path(fname)
+            if not os.path.isfile(full_path):
+                continue
+            # Files are hashed, even the content-addressed one may have been altered
+            if self._file_checksum(full_path) == checksum:
+                return fname
+        _logger.warning(f"No file of the attachments of checksum {checksum} holds their content, left as is")
+        return None
+
+    @api.model
+    def _file_checksum(self, full_path):
+        sha = hashlib.sha1()
+        with open(full_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(UPLOAD_CHUNK_BYTES), b''):
+                sha.update(chunk)
+        return sha.hexdigest()
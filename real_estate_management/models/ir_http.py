@@ -0,0 +1,225 @@
+from odoo import models
+from odoo.tools import config
+from contextlib import contextmanager
+import bisect
+import json
+import logging
+import os
+import threading
+import time
+
+_logger = logging.getLogger(__name__)
+
+# Controllers of these modules are measured, whichever of them are installed
+METRICS_MODULES = ('real_estate_management', 'real_estate_website', 'rental_estate', 'real_estate_listing')
+METRICS_ROUTE = '/real_estate/metrics'
+# Upper bounds of the histogram buckets
+METRICS_SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+METRICS_QUERIES_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+# Each worker copies its figures to the metrics directory at most this often, so that the
+# endpoint reports the sum over every worker whichever one serves the scrape
+METRICS_SNAPSHOT_SECONDS = 10
+# name: (help, buckets), metrics without buckets are counters
+METRICS = {
+    'real_estate_route_requests_total': ("Requests served by the route, by status and page cache result.", None),
+    'real_estate_route_duration_seconds': ("Wall time of the route, rendering included.", METRICS_SECONDS_BUCKETS),
+    'real_estate_route_sql_queries': ("SQL queries run by the route.", METRICS_QUERIES_BUCKETS),
+    'real_estate_route_sql_duration_seconds': ("Time spent in SQL queries by the route.", METRICS_SECONDS_BUCKETS),
+    'real_estate_route_render_duration_seconds': ("Time spent rendering QWeb templates by the route.",
+                                                  METRICS_SECONDS_BUCKETS),
+    'real_estate_outbound_duration_seconds': ("Duration of outbound HTTP calls by service, and by route when they "
+                                              "are made while serving one.", METRICS_SECONDS_BUCKETS),
+}
+
+# (name, labels): [count of each bucket..., count above the last bucket, sum], or [count] for counters
+_metrics = {}
+_metrics_lock = threading.Lock()
+_metrics_snapshot_at = 0.0
+# Route being served by the current thread and the time it spent rendering so far
+_current = threading.local()
+
+
+def _metrics_dir():
+    return os.path.join(config['data_dir'], 'real_estate_metrics')
+
+
+def _observe(name, labels, value=1):
+    """Add ``value`` to histogram ``name``, or to counter ``name`` when it has no buckets."""
+    buckets = METRICS[name][1]
+    key = (name, tuple(sorted(labels.items())))
+    with _metrics_lock:
+        entry = _metrics.get(key)
+        if entry is None:
+            entry = _metrics[key] = [0] * (len(buckets) + 2) if buckets else [0]
+        if buckets:
+            entry[bisect.bisect_left(buckets, value)] += 1
+            entry[-1] += value
+        else:
+            entry[0] += value
+    _snapshot()
+
+
+def _snapshot():
+    """Copy the figures of this worker to its file of the metrics directory, if not done recently."""
+    global _metrics_snapshot_at
+    now = time.monotonic()
+    if now - _metrics_snapshot_at < METRICS_SNAPSHOT_SECONDS:
+        return
+    _metrics_snapshot_at = now
+    with _metrics_lock:
+        data = [[name, labels, entry] for (name, labels), entry in _metrics.items()]
+    directory = _metrics_dir()
+    path = os.path.join(directory, f'{os.getpid()}.json')
+    try:
+        os.makedirs(directory, exist_ok=True)
+        with open(f'{path}.tmp', 'w') as f:
+            json.dump(data, f)
+        os.replace(f'{path}.tmp', path)
+    except OSError as e:
+        _logger.warning(f"Could not write the route metrics to {path}: {e}")
+
+
+def _collect():
+    """
+    ``{(name, labels): entry}`` summed over the live workers, this one's figures taken live.
+    The files of workers that exited are dropped, which scrapers see as a counter reset.
+    """
+    totals = {}
+
+    def add(name, labels, entry):
+        key = (name, tuple(tuple(label) for label in labels))
+        total = totals.setdefault(key, [0] * len(entry))
+        for index, value in enumerate(entry):
+            total[index] += value
+
+    directory = _metrics_dir()
+    for file_name in os.listdir(directory) if os.path.isdir(directory) else ():
+        pid = file_name[:-len('.json')]
+        if not file_name.endswith('.json') or not pid.isdigit() or int(pid) == os.getpid():
+            continue
+        path = os.path.join(directory, file_name)
+        try:
+            os.kill(int(pid), 0)
+        except ProcessLookupError:
+            os.unlink(path)
+            continue
+        except PermissionError:
+            pass
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            continue
+        for name, labels, entry in data:
+            if name in METRICS:
+                add(name, labels, entry)
+
+    with _metrics_lock:
+        for (name, labels), entry in _metrics.items():
+            add(name, labels, entry)
+    return totals
+
+
+def _escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _exposition():
+    """Metrics of every worker in the Prometheus text format."""
+    totals = _collect()
+    lines = []
+    for name, (description, buckets) in METRICS.items():
+        lines += [f'# HELP {name} {description}', f"# TYPE {name} {'histogram' if buckets else 'counter'}"]
+        for (metric, labels), entry in sorted(totals.items()):
+            if metric != name:
+                continue
+            label_text = ','.join(f'{key}="{_escape_label(value)}"' for key, value in labels)
+            if not buckets:
+                lines.append(f'{name}{{{label_text}}} {entry[0]}')
+                continue
+            count = 0
+            for bound, bucket_count in zip(buckets + ('+Inf',), entry[:-1]):
+                count += bucket_count
+                lines.append(f'{name}_bucket{{{label_text},le="{bound}"}} {count}')
+            lines.append(f'{name}_sum{{{label_text}}} {entry[-1]}')
+            lines.append(f'{name}_count{{{label_text}}} {count}')
+    return '\n'.join(lines) + '\n'
+
+
+def _metrics_route(endpoint):
+    """Label of ``endpoint`` (its first URL pattern) when it is a measured route, else None."""
+    module = getattr(getattr(endpoint, 'original_endpoint', endpoint), '__module__', None) or ''
+    parts = module.split('.')
+    if len(parts) < 3 or parts[:2] != ['odoo', 'addons'] or parts[2] not in METRICS_MODULES:
+        return None
+    routes = getattr(endpoint, 'routing', {}).get('routes') or [getattr(endpoint, '__name__', module)]
+    return routes[0] if routes[0] != METRICS_ROUTE else None
+
+
+@contextmanager
+def _track_render():
+    """Count the enclosed rendering in the current route's render time, nested renders once."""
+    if not getattr(_current, 'route', None) or getattr(_current, 'rendering', False):
+        yield
+        return
+    _current.rendering = True
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _current.render += time.perf_counter() - start
+        _current.rendering = False
+
+
+@contextmanager
+def _track_outbound(service):
+    """Record the duration of the enclosed outbound HTTP call to ``service``."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _observe('real_estate_outbound_duration_seconds', {
+            'service': service,
+            'route': getattr(_current, 'route', None) or 'background',
+        }, time.perf_counter() - start)
+
+
+class IrHttp(models.AbstractModel):
+    """
+    Measures the routes of METRICS_MODULES: wall time, SQL queries and their time, QWeb
+    rendering time, and outbound HTTP calls made while serving them (see ``_track_outbound``).
+    The figures are exposed on METRICS_ROUTE in the Prometheus format.
+    """
+    _inherit = 'ir.http'
+
+    @classmethod
+    def _dispatch(cls, endpoint):
+        route = _metrics_route(endpoint)
+        if not route:
+            return super()._dispatch(endpoint)
+
+        thread = threading.current_thread()
+        queries = getattr(thread, 'query_count', 0)
+        query_time = getattr(thread, 'query_time', 0.0)
+        _current.route = route
+        _current.render = 0.0
+        start = time.perf_counter()
+        status = 500
+        page_cache = 'none'
+        try:
+            # Qweb responses are rendered by the dispatch, so rendering is included
+            response = super()._dispatch(endpoint)
+            status = getattr(response, 'status_code', None) or getattr(response, 'code', 200)
+            page_cache = getattr(response, 'headers', {}).get('X-Page-Cache', page_cache)
+            return response
+        except Exception as e:
+            status = getattr(e, 'code', None) or 500
+            raise
+        finally:
+            labels = {'route': route}
+            _observe('real_estate_route_duration_seconds', labels, time.perf_counter() - start)
+            _observe('real_estate_route_sql_queries', labels, getattr(thread, 'query_count', 0) - queries)
+            _observe('real_estate_route_sql_duration_seconds', labels, getattr(thread, 'query_time', 0.0) - query_time)
+            _observe('real_estate_route_render_duration_seconds', labels, _current.render)
+            _observe('real_estate_route_requests_total', dict(labels, status=str(status), page_cache=page_cache))
+            _current.route = None
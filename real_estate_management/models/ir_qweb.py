@@ -0,0 +1,12 @@
+from odoo import models
+
+from .ir_http import _track_render
+
+
+class IrQweb(models.AbstractModel):
+    _inherit = 'ir.qweb'
+
+    def _render(self, template, values=None, **options):
+        # Render time of the measured routes, see ir.http
+        with _track_render():
+            return super()._render(template, values=values, **options)
@@ -0,0 +1,39 @@
+from odoo import models, fields, api
+from datetime import timedelta
+
+# Delay before the first resend of a registration mail that failed on the SMTP side,
+# doubled on each attempt
+REGISTRATION_MAIL_RETRY_MINUTES = 5
+
+
+class MailMail(models.Model):
+    _inherit = 'mail.mail'
+
+    registration_retry_count = fields.Integer(string='Registration Mail Retries', readonly=True, copy=False)
+
+    @api.model
+    def _cron_retry_registration_mails(self):
+        """
+        Queue again the property registration mails that failed because of the mail server,
+        with exponential backoff, up to ``real_estate_management.mail_max_attempts`` sends.
+        """
+        max_attempts = int(self.env['ir.config_parameter'].sudo().get_param(
+            'real_estate_management.mail_max_attempts', 5))
+        now = fields.Datetime.now()
+        mails = self.search([
+            ('state', '=', 'exception'),
+            ('failure_type', 'in', ('mail_smtp', 'unknown')),
+            ('model', '=', 'property.registration'),
+            ('registration_retry_count', '<', max_attempts - 1),
+        ])
+        due = mails.filtered(lambda mail: mail.write_date <= now - timedelta(
+            minutes=REGISTRATION_MAIL_RETRY_MINUTES * 2 ** mail.registration_retry_count))
+        for mail in due:
+            mail.write({
+                'state': 'outgoing',
+                'failure_type': False,
+                'failure_reason': False,
+                'registration_retry_count': mail.registration_retry_count + 1,
+            })
+        if due:
+            self.env.ref('mail.ir_cron_mail_scheduler_action')._trigger()
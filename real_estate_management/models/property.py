@@ -1,15 +1,126 @@
 from odoo import models, fields, api, _
+from odoo.exceptions import UserError
+from odoo.tools import SQL, html2plaintext
+from odoo.tools.sql import create_index
+from odoo.addons.real_estate_listing.models.real_estate_listing import (
+    LISTING_MAX_PAGE_SIZE, LISTING_PAGE_SIZE, LISTING_SORTS as SHARED_LISTING_SORTS,
+    _decode_listing_cursor, _encode_listing_cursor,
+)
+from collections import Counter
+from datetime import timedelta
+import hashlib
 import logging
+import re
 import requests
 import json
+import math
+import threading
+import time
+
+from .ir_http import _track_outbound
+from .property_facet import FACET_FIELDS
+from .property_neighbor import _haversine_km_sql
+
+# Changing any of these on a property changes its similar properties
+SIMILARITY_FIELDS = ('is_published', 'price', 'plot_area', 'category_id', 'city', 'latitude', 'longitude')
+# Similar properties shown on the detail page
+RECOMMENDATION_LIMIT = 7
+# Changing any of these on a property changes the market statistics of its month
+MARKET_FIELDS = ('is_published', 'price', 'plot_area', 'registration_charges', 'category_id', 'city', 'title_status')
+
+GEO_EARTH_RADIUS_KM = 6371.0
+GEO_KM_PER_DEGREE = 111.32
+# Nearest-neighbour searches without a radius start at the first and widen up to the second
+GEO_START_RADIUS_KM = 5.0
+GEO_MAX_RADIUS_KM = 200.0
 
 _logger = logging.getLogger(__name__)
 
+# Grid cells per map tile when clustering markers server-side
+MAP_CLUSTER_CELLS_PER_TILE = 4
+
+# Changing any of these queues the property for geocoding
+GEOCODE_FIELDS = ('street', 'street2', 'city', 'zip_code', 'state_id', 'country_id')
+# Delay before the first retry of a failed geocoder call, doubled on each attempt
+GEOCODE_RETRY_MINUTES = 5
+
+# Changing any of these on a property regenerates its AI content
+AI_CONTENT_FIELDS = ('name', 'street', 'city', 'zip_code', 'state_id', 'price', 'plot_area', 'category_id')
+# Delay before the first retry of a failed AI generation, doubled on each attempt
+AI_RETRY_MINUTES = 10
+# Default of the real_estate_management.ai_completions_url parameter, which points
+# benchmarks and tests to a local stand-in
+AI_COMPLETIONS_URL = 'https://api.openai.com/v1/chat/completions'
+
+# Bookkeeping fields of the background jobs, writing only these leaves the public pages as they are
+PAGE_CACHE_IGNORED_FIELDS = {
+    'geocode_state', 'geocode_attempts', 'geocode_next_attempt',
+    'ai_generation_state', 'ai_generation_attempts', 'ai_next_attempt', 'neighbors_stale',
+    'market_stale',
+}
+
+# Words of a search query beyond this are ignored
+SEARCH_MAX_TERMS = 8
+
+# Public listing sort options: the shared ones and the view count only this model keeps
+LISTING_SORTS = dict(SHARED_LISTING_SORTS, most_viewed=('views', 'desc'))
+
+# Fields each public payload is built from: _fetch_payload() loads exactly these and the
+# matching serializer reads nothing else. write_date is the cache key of image URLs
+PAYLOAD_FIELDS = {
+    'card': ['name', 'category_id', 'price', 'plot_area', 'price_per_sqft', 'city', 'zip_code', 'image',
+             'latitude', 'longitude', 'write_date'],
+    'recommendation': ['name', 'category_id', 'price', 'plot_area', 'street', 'city', 'facing_direction',
+                       'contact_phone', 'image', 'write_date'],
+    'marker': ['name', 'category_id', 'latitude', 'longitude', 'street', 'city', 'zip_code', 'price',
+               'contact_phone', 'contact_email', 'contact_name', 'short_description', 'nearby_landmarks',
+               'views', 'seo_title', 'image', 'gallery_image_ids', 'write_date'],
+}
+
+_geocoder_lock = threading.Lock()
+_geocoder_last_call = 0.0
+
+
+def _completions_url(env):
+    return env['ir.config_parameter'].sudo().get_param('real_estate_management.ai_completions_url', AI_COMPLETIONS_URL)
+
+
+def _list_to_html(lst):
+    """Render a list returned by the completions API as an HTML bullet list."""
+    if not isinstance(lst, list) or not lst:
+        return str(lst) if lst else ''
+    return '<ul>' + ''.join(f'<li>{item}</li>' for item in lst) + '</ul>'
+
+
+def _throttle_geocoder(env):
+    """Space out geocoder calls of this worker to ``real_estate_management.geocode_rate_limit`` per second."""
+    global _geocoder_last_call
+    rate = float(env['ir.config_parameter'].sudo().get_param('real_estate_management.geocode_rate_limit', 1.0))
+    if rate <= 0:
+        return
+    with _geocoder_lock:
+        wait = _geocoder_last_call + 1.0 / rate - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+        _geocoder_last_call = time.monotonic()
+
+
+def _haversine_km(lat1, lng1, lat2, lng2):
+    """Great-circle distance in kilometers, the Python twin of _haversine_km_sql."""
+    a = (math.sin(math.radians(lat2 - lat1) / 2) ** 2
+         + math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * math.sin(math.radians(lng2 - lng1) / 2) ** 2)
+    return 2 * GEO_EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
 
 class Property(models.Model):
     _name = 'property.property'
-    _inherit = ['mail.thread', 'mail.activity.mixin']
+    _inherit = ['mail.thread', 'mail.activity.mixin', 'real.estate.listing.mixin']
     _description = 'Real Estate Property'
+    # Fields read by _listing_values
+    _listing_depends = (
+        'name', 'price', 'plot_area', 'street', 'city', 'state_id', 'zip_code', 'latitude', 'longitude', 'image',
+        'is_published',
+    )
 
     # Core details
     name = fields.Char(string='Property Name', required=True, tracking=True)
@@ -38,13 +149,18 @@ class Property(models.Model):
     ], string='Title Status')
 
     property_website_url = fields.Char(string='Property Website')
-    image = fields.Image(string='Cover Image')
+    image = fields.Image(string='Cover Image', max_width=1920, max_height=1920)
+    # Resized variants, generated once when the cover image is uploaded and served
+    # through /web/image so browsers and proxies can cache them
+    image_1024 = fields.Image(string='Cover Image 1024', related='image', max_width=1024, max_height=1024, store=True)
+    image_512 = fields.Image(string='Cover Image 512', related='image', max_width=512, max_height=512, store=True)
+    image_256 = fields.Image(string='Cover Image 256', related='image', max_width=256, max_height=256, store=True)
 
     # Address
     street = fields.Char(string='Street')
     street2 = fields.Char(string='Street 2')
-    city = fields.Char(string='City', required=True)
-    zip_code = fields.Char(string='ZIP')
+    city = fields.Char(string='City', required=True, index='trigram')
+    zip_code = fields.Char(string='ZIP', index='trigram')
     state_id = fields.Many2one(
         'res.country.state', string='State',
         domain="[('country_id','=', country_id)]"
@@ -65,13 +181,18 @@ class Property(models.Model):
     drainage_facility = fields.Boolean(string='Drainage Facility', default=True)
     gated_community = fields.Boolean(string='Gated Community')
 
-    # Geolocation
-    latitude = fields.Float(string='Latitude', digits=(16, 5),
-                            compute='_compute_geolocation', store=True)
-    longitude = fields.Float(string='Longitude', digits=(16, 5),
-                             compute='_compute_geolocation', store=True)
-    date_localization = fields.Date(string='Geolocation Date',
-                                    compute='_compute_geolocation', store=True)
+    # Geolocation, resolved asynchronously by the geocoding cron
+    latitude = fields.Float(string='Latitude', digits=(16, 5), readonly=True)
+    longitude = fields.Float(string='Longitude', digits=(16, 5), readonly=True)
+    date_localization = fields.Date(string='Geolocation Date', readonly=True)
+    geocode_state = fields.Selection([
+        ('none', 'Not Geocoded'),
+        ('pending', 'Pending Geocode'),
+        ('done', 'Geocoded'),
+        ('failed', 'Geocode Failed'),
+    ], string='Geocode Status', default='none', readonly=True, index=True, copy=False)
+    geocode_attempts = fields.Integer(string='Geocode Attempts', readonly=True, copy=False)
+    geocode_next_attempt = fields.Datetime(string='Next Geocode Attempt', readonly=True, copy=False)
 
     # Contact Info
     contact_name = fields.Char(string='Contact Person')
@@ -95,6 +216,12 @@ class Property(models.Model):
     views = fields.Integer(string='Views', default=0)
     last_viewed = fields.Datetime(string='Last Viewed')
     nearby_landmarks = fields.Text(string='Nearby Landmarks')
+    # Set when the similar properties need to be recomputed by the neighbours cron
+    neighbors_stale = fields.Boolean(string='Similar Properties Outdated', readonly=True, copy=False, index=True)
+    # Set when the market statistics of the property's month need to be recomputed by the market cron
+    market_stale = fields.Boolean(string='Market Statistics Outdated', readonly=True, copy=False, index=True)
+    # Lowercased text searched by the website, also feeds the search_tsv column created in init()
+    search_text = fields.Text(string='Search Text', compute='_compute_search_text', store=True, index='trigram')
 
     # AI Content Fields
     ai_key_highlights = fields.Html(readonly=True)
@@ -104,15 +231,15 @@ class Property(models.Model):
     ai_lifestyle_benefits = fields.Html(readonly=True)
     ai_content_generated = fields.Boolean(default=False)
     ai_generation_date = fields.Datetime()
-
-    # ==================== CITY INVESTMENT FIELDS ====================
-    city_investment_reasons = fields.Html(string='City Investment Reasons', readonly=True)
-    city_growth_potential = fields.Html(string='City Growth Potential', readonly=True)
-    city_infrastructure = fields.Html(string='City Infrastructure', readonly=True)
-    city_market_trends = fields.Html(string='City Market Trends', readonly=True)
-    city_investment_generated = fields.Boolean(default=False)
-    city_investment_date = fields.Datetime()
-    last_city_processed = fields.Char(string='Last City Processed')
+    ai_generation_state = fields.Selection([
+        ('none', 'Not Requested'),
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ], string='AI Generation Status', default='none', readonly=True, index=True, copy=False)
+    ai_generation_attempts = fields.Integer(string='AI Generation Attempts', readonly=True, copy=False)
+    ai_next_attempt = fields.Datetime(string='Next AI Generation Attempt', readonly=True, copy=False)
 
     # -------------------- COMPUTE METHODS --------------------
     @api.depends('price', 'plot_area')
@@ -130,61 +257,641 @@ class Property(models.Model):
         for rec in self:
             rec.image_count = len(rec.gallery_image_ids)
 
-    @api.depends('street', 'street2', 'city', 'zip_code', 'state_id', 'country_id')
-    def _compute_geolocation(self):
+    @api.depends('name', 'short_description', 'detailed_description', 'street', 'street2', 'city', 'zip_code',
+                 'nearby_landmarks', 'category_id.name')
+    def _compute_search_text(self):
+        for rec in self:
+            rec.search_text = ' '.join(filter(None, [
+                rec.name, rec.short_description,
+                rec.detailed_description and html2plaintext(rec.detailed_description),
+                rec.street, rec.street2, rec.city, rec.zip_code, rec.nearby_landmarks, rec.category_id.name,
+            ])).lower()
+
+    def init(self):
+        super().init()
+        # Weighted full-text vector kept up to date by PostgreSQL itself: name first,
+        # then the address, then everything else
+        self.env.cr.execute(SQL("""
+            ALTER TABLE property_property ADD COLUMN IF NOT EXISTS search_tsv tsvector
+                GENERATED ALWAYS AS (
+                    setweight(to_tsvector('simple', coalesce(name, '')), 'A') ||
+                    setweight(to_tsvector('simple', coalesce(city, '') || ' ' || coalesce(zip_code, '') || ' ' || coalesce(street, '')), 'B') ||
+                    setweight(to_tsvector('simple', coalesce(search_text, '')), 'C')
+                ) STORED
+        """))
+        create_index(self.env.cr, 'property_property_search_tsv_index', 'property_property', ['search_tsv'], method='gin')
+        # Keyset pagination of the public listings walks these in both directions, see _listing_keyset
+        for field in ('price', 'price_per_sqft', 'views'):
+            create_index(self.env.cr, f'property_property_published_{field}_id_index', 'property_property',
+                         [f'COALESCE({field}, 0)', 'id'], where='is_published')
+        # Bounding-box prefilter of the geo searches and of the nearby similar properties
+        create_index(self.env.cr, 'property_property_published_latitude_longitude_index', 'property_property',
+                     ['latitude', 'longitude'], where='is_published')
+        # Other candidates of the similar properties, see property.neighbor _candidates_sql
+        create_index(self.env.cr, 'property_property_published_category_id_price_id_index', 'property_property',
+                     ['category_id', 'price', 'id'], where='is_published')
+        create_index(self.env.cr, 'property_property_published_lower_city_id_index', 'property_property',
+                     ['lower(city)', 'id'], where='is_published')
+
+    # -------------------- CRUD --------------------
+    @api.model_create_multi
+    def create(self, vals_list):
+        for vals in vals_list:
+            vals.setdefault('geocode_state', 'pending')
+            vals.setdefault('market_stale', True)
+        records = super().create(vals_list)
+        self.env['property.facet']._apply_delta(Counter(), records._facet_keys())
+        records._mark_neighbors_stale()
+        records._bump_page_cache()
+        if any(rec.geocode_state == 'pending' for rec in records):
+            records._trigger_geocode_cron()
+        records.filtered('is_published')._queue_ai_content()
+        return records
+
+    def write(self, vals):
+        queue_geocode = any(field in vals for field in GEOCODE_FIELDS)
+        if queue_geocode:
+            vals = dict(vals, geocode_state='pending', geocode_attempts=0, geocode_next_attempt=False)
+        if any(field in vals for field in MARKET_FIELDS):
+            vals = dict(vals, market_stale=True)
+        if any(field in vals for field in AI_CONTENT_FIELDS):
+            queue_ai = self
+        elif vals.get('is_published'):
+            queue_ai = self.filtered(lambda rec: rec.ai_generation_state == 'none')
+        else:
+            queue_ai = self.browse()
+        facets_before = self._facet_keys() if any(field in vals for field in FACET_FIELDS) else None
+        res = super().write(vals)
+        if facets_before is not None:
+            self.env['property.facet']._apply_delta(facets_before, self._facet_keys())
+        if any(field in vals for field in SIMILARITY_FIELDS):
+            self._mark_neighbors_stale()
+        if not PAGE_CACHE_IGNORED_FIELDS.issuperset(vals):
+            self._bump_page_cache()
+        if queue_geocode:
+            self._trigger_geocode_cron()
+        queue_ai._queue_ai_content()
+        return res
+
+    def unlink(self):
+        self.env['property.facet']._apply_delta(self._facet_keys(), Counter())
+        self._mark_neighbors_stale()
+        self.env['property.market.stat']._mark_months_stale(self)
+        self._bump_page_cache()
+        return super().unlink()
+
+    def _bump_page_cache(self):
+        """Invalidate the cached listings, the pages of self and the pages recommending self."""
+        if not self:
+            return
+        self.env.cr.execute(SQL(
+            "SELECT DISTINCT property_id FROM property_neighbor WHERE neighbor_id IN %s", tuple(self.ids),
+        ))
+        property_ids = set(self.ids).union(row[0] for row in self.env.cr.fetchall())
+        self.env['real.estate.cache.tag']._bump(['properties'] + [f'property:{pid}' for pid in property_ids])
+
+    def _listing_values(self):
+        return {rec.id: {
+            'name': rec.name,
+            'listing_type': 'buy',
+            'price': rec.price,
+            'area': rec.plot_area,
+            'bedrooms': 0,
+            'street': rec.street,
+            'city': rec.city,
+            'zip_code': rec.zip_code,
+            'address': ', '.join(filter(None, [rec.street, rec.city, rec.state_id.name, rec.zip_code])),
+            'latitude': rec.latitude or None,
+            'longitude': rec.longitude or None,
+            'thumbnail_url': rec._listing_image_url('image_512') if rec.image else False,
+            'url': f'/property/{rec.id}',
+            'is_published': rec.is_published,
+        } for rec in self}
+
+    def _facet_keys(self):
+        """Counter of the ``(facet, value)`` pairs of the published properties of self."""
+        Facet = self.env['property.facet']
+        keys = Counter()
+        for rec in self.filtered('is_published'):
+            for facet, value in (
+                ('city', rec.city),
+                ('category', rec.category_id.id),
+                ('title_status', rec.title_status),
+                ('facing_direction', rec.facing_direction),
+                ('price_band', Facet._band_key('price_band', rec.price)),
+                ('area_band', Facet._band_key('area_band', rec.plot_area)),
+            ):
+                if value:
+                    keys[facet, str(value)] += 1
+        return keys
+
+    # -------------------- GEOLOCATION --------------------
+    def _trigger_geocode_cron(self):
+        cron = self.env.ref('real_estate_management.ir_cron_geocode_properties', raise_if_not_found=False)
+        if cron:
+            cron._trigger()
+
+    def action_geocode(self):
+        """Queue the selected properties for geocoding again."""
+        self.write({'geocode_state': 'pending', 'geocode_attempts': 0, 'geocode_next_attempt': False})
+        self._trigger_geocode_cron()
+
+    def _get_geocode_address(self):
+        self.ensure_one()
+        return {
+            'street': ' '.join(filter(None, [self.street, self.street2])),
+            'zip': self.zip_code or '',
+            'city': self.city or '',
+            'state': self.state_id.name or '',
+            'country': self.country_id.name or '',
+        }
+
+    @api.model
+    def _geocode_address(self, address):
+        """
+        Resolve an address dict (street, zip, city, state, country) to ``(latitude, longitude)``.
+
+        The provider is selected by the ``real_estate_management.geocoder`` system parameter
+        and dispatched to ``_geocode_with_<provider>``: ``base`` (default) uses the
+        base_geolocalize service, ``local`` is an offline stand-in for tests and benchmarks.
+        Results are kept per provider in ``property.geocode.cache``, which is consulted first.
+        Returns None when the address cannot be resolved, raises on transport errors.
+        """
+        Cache = self.env['property.geocode.cache'].sudo()
+        provider = self._geocode_provider()
+        coords = Cache._lookup(address, provider)
+        if coords:
+            return coords
+        coords = getattr(self, f'_geocode_with_{provider}')(address)
+        if coords:
+            Cache._store(address, coords, provider)
+        return coords
+
+    @api.model
+    def _geocode_provider(self):
+        """The provider set in ``real_estate_management.geocoder``, raises if there is no such provider."""
+        provider = self.env['ir.config_parameter'].sudo().get_param('real_estate_management.geocoder', 'base')
+        if not callable(getattr(self, f'_geocode_with_{provider}', None)):
+            raise UserError(_("Unknown geocoder %(provider)r set in the real_estate_management.geocoder "
+                              "system parameter.", provider=provider))
+        return provider
+
+    @api.model
+    def _geocode_with_base(self, address):
         geo = self.env['base.geocoder']
+        _throttle_geocoder(self.env)
+        # Query geocoder with structured parameters
+        query = geo.geo_query_address(**address)
+        with _track_outbound('geocoder'):
+            coords = geo.geo_find(query, force_country=address['country'])
+
+        # Fallback: try single string query if structured fails
+        if not coords or len(coords) != 2:
+            address_str = ', '.join(
+                filter(None, [address['street'], address['city'], address['state'], address['country']]))
+            _logger.info(f"Structured geocode failed, trying fallback with address string: {address_str}")
+            _throttle_geocoder(self.env)
+            with _track_outbound('geocoder'):
+                coords = geo.geo_find(address_str)
+
+        return tuple(coords) if coords and len(coords) == 2 else None
+
+    @api.model
+    def _geocode_with_local(self, address):
+        """Deterministic coordinates derived from the address, no network access."""
+        digest = hashlib.sha1(json.dumps(address, sort_keys=True).encode()).digest()
+        # Spread addresses over a ~40 km square around Visakhapatnam
+        return (
+            17.5 + int.from_bytes(digest[:4], 'big') / 2 ** 32 * 0.4,
+            83.0 + int.from_bytes(digest[4:8], 'big') / 2 ** 32 * 0.4,
+        )
+
+    def _group_by_geocode_address(self):
+        """Group properties sharing the same normalized address: ``{fingerprint: (address, properties)}``."""
+        Cache = self.env['property.geocode.cache']
+        groups = {}
         for rec in self:
-            # Construct full address
-            street = ' '.join(filter(None, [rec.street, rec.street2]))
-            address_components = {
-                'street': street,
-                'zip': rec.zip_code or '',
-                'city': rec.city or '',
-                'state': rec.state_id.name or '',
-                'country': rec.country_id.name or '',
-            }
-            if not (address_components['street'] or address_components['zip'] or address_components['city']):
-                rec.latitude = rec.longitude = False
-                rec.date_localization = False
-                _logger.info(f"Skipping geocode for {rec.name}: insufficient address info {address_components}")
-                continue
+            address = rec._get_geocode_address()
+            groups.setdefault(Cache._fingerprint(address), (address, []))[1].append(rec.id)
+        return {fingerprint: (address, self.browse(ids)) for fingerprint, (address, ids) in groups.items()}
 
-            try:
-                # Log the query
-                _logger.info(f"Geocoding property {rec.name} with params: {address_components}")
-
-                # Query geocoder with structured parameters
-                query = geo.geo_query_address(**address_components)
-                coords = geo.geo_find(query, force_country=address_components['country'])
-
-                # Fallback: try single string query if structured fails
-                if not coords or len(coords) != 2:
-                    address_str = ', '.join(
-                        filter(None, [rec.street, rec.street2, rec.city, rec.state_id.name, rec.country_id.name]))
-                    _logger.info(
-                        f"Structured geocode failed for {rec.name}, trying fallback with address string: {address_str}")
-                    coords = geo.geo_find(address_str)
-
-                if coords and len(coords) == 2:
-                    rec.latitude, rec.longitude = coords
-                    rec.date_localization = fields.Date.context_today(rec)
-                    _logger.info(f"Geocoded {rec.name}: latitude={rec.latitude}, longitude={rec.longitude}")
+    @api.model
+    def _cron_geocode_pending(self, batch_size=100):
+        """
+        Geocode queued properties, with rate limiting and exponential backoff on errors.
+
+        Properties sharing an address are resolved with a single cache lookup or provider call.
+        """
+        ICP = self.env['ir.config_parameter'].sudo()
+        max_attempts = int(ICP.get_param('real_estate_management.geocode_max_attempts', 5))
+        now = fields.Datetime.now()
+        properties = self.search([
+            ('geocode_state', '=', 'pending'),
+            '|', ('geocode_next_attempt', '=', False), ('geocode_next_attempt', '<=', now),
+        ], limit=batch_size, order='geocode_next_attempt asc nulls first, id')
+        if not properties:
+            return
+        # A misconfigured provider fails the run instead of counting as an attempt of every property
+        self._geocode_provider()
+
+        for address, group in properties._group_by_geocode_address().values():
+            vals = {'geocode_next_attempt': False}
+            if not (address['street'] or address['zip'] or address['city']):
+                _logger.info(f"Skipping geocode for {group.mapped('name')}: insufficient address info {address}")
+                vals.update(geocode_state='failed', latitude=False, longitude=False, date_localization=False)
+            else:
+                _logger.info(f"Geocoding {len(group)} properties with params: {address}")
+                try:
+                    coords = self._geocode_address(address)
+                except Exception as e:
+                    attempts = max(group.mapped('geocode_attempts')) + 1
+                    _logger.warning(f"Geocode error for {address} (attempt {attempts}): {e}")
+                    vals['geocode_attempts'] = attempts
+                    if attempts >= max_attempts:
+                        vals['geocode_state'] = 'failed'
+                    else:
+                        vals['geocode_next_attempt'] = now + timedelta(minutes=GEOCODE_RETRY_MINUTES * 2 ** (attempts - 1))
                 else:
-                    rec.latitude = rec.longitude = False
-                    rec.date_localization = False
-                    _logger.error(f"Geocode failed for {rec.name}: {address_components}")
+                    if coords:
+                        vals.update(geocode_state='done', latitude=coords[0], longitude=coords[1],
+                                    date_localization=fields.Date.context_today(self))
+                        _logger.info(f"Geocoded {address}: latitude={coords[0]}, longitude={coords[1]}")
+                    else:
+                        vals.update(geocode_state='failed', latitude=False, longitude=False, date_localization=False)
+                        _logger.error(f"Geocode failed for {address}")
+            group.write(vals)
+            if not getattr(threading.current_thread(), 'testing', False):
+                self.env.cr.commit()
+
+        if len(properties) == batch_size:
+            self._trigger_geocode_cron()
 
-            except Exception as e:
-                rec.latitude = rec.longitude = False
-                rec.date_localization = False
-                _logger.error(f"Geocode error for {rec.name}: {e}")
+    @api.model
+    def action_backfill_geolocation(self):
+        """
+        Resolve every property without coordinates, one lookup per distinct address.
+
+        Addresses found in the geocode cache are applied right away, the others are queued
+        for the geocoding cron, which will then serve their duplicates from the cache.
+        """
+        properties = self.search([
+            ('geocode_state', '!=', 'pending'),
+            '|', ('latitude', '=', False), ('longitude', '=', False),
+        ])
+        Cache = self.env['property.geocode.cache'].sudo()
+        provider = self._geocode_provider()
+        resolved = queued = self.browse()
+        for address, group in properties._group_by_geocode_address().values():
+            coords = Cache._lookup(address, provider)
+            if coords:
+                group.write({
+                    'geocode_state': 'done',
+                    'latitude': coords[0],
+                    'longitude': coords[1],
+                    'date_localization': fields.Date.context_today(self),
+                })
+                resolved |= group
+            else:
+                queued |= group
+        if queued:
+            queued.action_geocode()
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': _('Geolocation Backfill'),
+                'message': _('%(resolved)s properties resolved from the cache, %(queued)s queued for geocoding.',
+                             resolved=len(resolved), queued=len(queued)),
+                'type': 'success',
+                'sticky': False,
+            },
+        }
+
+    # -------------------- MAP --------------------
+    @api.model
+    def _get_map_bounds(self, domain):
+        """Return (south, west, north, east) enclosing the properties matching ``domain``, or None."""
+        [(south, west, north, east)] = self._read_group(
+            domain, aggregates=['latitude:min', 'longitude:min', 'latitude:max', 'longitude:max'])
+        if south is None or west is None:
+            return None
+        return south, west, north, east
+
+    @api.model
+    def _get_map_clusters(self, domain, zoom):
+        """
+        Aggregate the properties matching ``domain`` into a lat/lng grid sized for ``zoom``.
+
+        Returns ``(clusters, singles)``: a list of dicts for the cells holding several
+        properties (count, centroid and bounds) and the recordset of properties that are
+        alone in their cell, so they can still be drawn as regular markers.
+        """
+        cell = 360.0 / (2 ** zoom) / MAP_CLUSTER_CELLS_PER_TILE
+        query = self._search(domain)
+        self.env.cr.execute(SQL("""
+            SELECT count(*), avg(latitude), avg(longitude),
+                   min(latitude), min(longitude), max(latitude), max(longitude), min(id)
+              FROM property_property
+             WHERE id IN %s
+          GROUP BY floor(latitude / %s), floor(longitude / %s)
+        """, query.subselect(), cell, cell))
+
+        clusters = []
+        single_ids = []
+        for count, lat, lng, south, west, north, east, min_id in self.env.cr.fetchall():
+            if count == 1:
+                single_ids.append(min_id)
+                continue
+            clusters.append({
+                'count': count,
+                'latitude': float(lat),
+                'longitude': float(lng),
+                'bounds': [float(south), float(west), float(north), float(east)],
+            })
+        return clusters, self.browse(single_ids)
+
+    # -------------------- SEARCH --------------------
+    @api.model
+    def _search_text_sql(self, text):
+        """
+        ``(match, rank)`` SQL conditions of ``text`` on property_property, None if it has no word.
+
+        Every word is matched as a prefix against the full-text vector, and when pg_trgm
+        is available the whole query is also matched by word similarity so that typos
+        still find results. Both conditions are served by GIN indexes.
+        """
+        terms = re.findall(r'\w+', (text or '').lower())[:SEARCH_MAX_TERMS]
+        if not terms:
+            return None
+        tsquery = SQL("to_tsquery('simple', %s)", ' & '.join(f'{term}:*' for term in terms))
+        phrase = ' '.join(terms)
+        match = SQL("search_tsv @@ %s", tsquery)
+        rank = SQL("ts_rank(search_tsv, %s)", tsquery)
+        if self.pool.has_trigram:
+            # %%%% is reduced to %% by SQL, which psycopg2 then turns into the % of the <% operator
+            match = SQL("(%s OR %s <%%%% search_text)", match, phrase)
+            rank = SQL("%s + word_similarity(%s, search_text)", rank, phrase)
+        return match, rank
+
+    @api.model
+    def _search_ranked(self, text, domain=None, limit=None, offset=0):
+        """Properties of ``domain`` matching ``text``, best matches first."""
+        text_sql = self._search_text_sql(text)
+        if not text_sql:
+            return self.search(domain or [], limit=limit, offset=offset)
+        match, rank = text_sql
+        self.env.cr.execute(SQL("""
+            SELECT id FROM property_property
+             WHERE id IN %s AND %s
+          ORDER BY %s DESC, id DESC
+             LIMIT %s OFFSET %s
+        """, self._search(domain or []).subselect(), match, rank, limit, offset))
+        return self.browse([row[0] for row in self.env.cr.fetchall()])
+
+    @api.model
+    def _listing_keyset(self, query, field, direction, position):
+        """Order ``query`` by ``field`` then id in ``direction``, starting after ``position`` if given."""
+        column = SQL.identifier(self._table, field)
+        if field != 'id':
+            # NULLs sort after every value and never compare, page them as the 0 they read as
+            column = SQL("COALESCE(%s, 0)", column)
+        id_column = SQL.identifier(self._table, 'id')
+        if position:
+            operator = SQL('<' if direction == 'desc' else '>')
+            query.add_where(SQL("(%s, %s) %s (%s, %s)", column, id_column, operator, *position))
+        query.order = SQL("%s %s, %s %s", column, SQL(direction), id_column, SQL(direction))
+
+    @api.model
+    def _listing_page(self, domain, sort=None, cursor=None, limit=None, text=None, near=None):
+        """
+        One page of the properties of ``domain`` matching ``text``, as ``(records, next_cursor)``.
+
+        Pages are keyset-paginated: the opaque ``cursor`` carries the sort value and id of
+        the last record of the previous page, so any page is a range scan of the sort index
+        instead of an OFFSET over every previous row. ``next_cursor`` is None on the last page.
+        Relevance, the default sort of text searches, is not indexable and pages by offset.
+
+        ``near`` is a ``(latitude, longitude, radius_km)`` point, the radius may be None.
+        It enables the 'distance' sort, the default then, and restricts other sorts to the radius.
+        """
+        limit = max(1, min(limit or LISTING_PAGE_SIZE, LISTING_MAX_PAGE_SIZE))
+        text_sql = self._search_text_sql(text)
+        if sort not in LISTING_SORTS and not (sort == 'relevance' and text_sql) and not (sort == 'distance' and near):
+            sort = 'distance' if near else 'relevance' if text_sql else 'newest'
+        position = _decode_listing_cursor(cursor, sort, 1 if sort == 'relevance' else 2)
+
+        if near and sort != 'distance':
+            domain = domain + self._geo_domain(near[0], near[1], near[2] or GEO_MAX_RADIUS_KM)
+        if sort == 'distance':
+            if text_sql:
+                text_query = self._search(domain)
+                text_query.add_where(text_sql[0])
+                domain = [('id', 'in', text_query)]
+            rows = self._search_nearby(*near, domain=domain, limit=limit + 1, after=position)
+            records = self.browse([record.id for record, _distance in rows])
+            if len(records) <= limit:
+                return records, None
+            return records[:limit], _encode_listing_cursor(sort, rows[limit - 1][1], rows[limit - 1][0].id)
+        if sort == 'relevance':
+            offset = max(0, int(position[0])) if position else 0
+            records = self._search_ranked(text, domain, limit=limit + 1, offset=offset)
+            if len(records) <= limit:
+                return records, None
+            return records[:limit], _encode_listing_cursor(sort, offset + limit)
+
+        query = self._search(domain, limit=limit + 1)
+        if text_sql:
+            query.add_where(text_sql[0])
+        field, direction = LISTING_SORTS[sort]
+        self._listing_keyset(query, field, direction, position)
+        # Only the sort key is fetched here, callers load their payload with _fetch_payload()
+        records = self._fetch_query(query, self._determine_fields_to_fetch([field]))
+        if len(records) <= limit:
+            return records, None
+        records = records[:limit]
+        return records, _encode_listing_cursor(sort, records[-1][field], records[-1].id)
+
+    # -------------------- GEO SEARCH --------------------
+    @api.model
+    def _geo_bbox_domain(self, latitude, longitude, radius_km):
+        """
+        Domain of the geocoded properties in the bounding box of a circle, served by the
+        (latitude, longitude) index. Near the poles or the antimeridian only latitude is bounded.
+        """
+        lat_delta = radius_km / GEO_KM_PER_DEGREE
+        domain = [
+            ('latitude', '!=', False),
+            ('longitude', '!=', False),
+            ('latitude', '>=', latitude - lat_delta),
+            ('latitude', '<=', latitude + lat_delta),
+        ]
+        cos_lat = math.cos(math.radians(latitude))
+        if cos_lat > 0.01:
+            lng_delta = lat_delta / cos_lat
+            if -180 <= longitude - lng_delta and longitude + lng_delta <= 180:
+                domain += [('longitude', '>=', longitude - lng_delta), ('longitude', '<=', longitude + lng_delta)]
+        return domain
+
+    @api.model
+    def _geo_domain(self, latitude, longitude, radius_km):
+        """Domain of the properties at most ``radius_km`` away from the point."""
+        radius_km = min(radius_km, GEO_MAX_RADIUS_KM)
+        query = self._search(self._geo_bbox_domain(latitude, longitude, radius_km))
+        query.add_where(SQL("%s <= %s", _haversine_km_sql(latitude, longitude, SQL("latitude"), SQL("longitude")),
+                            radius_km))
+        return [('id', 'in', query)]
+
+    @api.model
+    def _search_nearby(self, latitude, longitude, radius_km=None, domain=None, limit=20, after=None):
+        """
+        ``[(property, distance_km)]`` of ``domain`` nearest to the point first, ties by id.
+
+        Candidates are prefiltered on the bounding box of ``radius_km`` and the exact haversine
+        distance is only computed for them. Without a radius, this is a nearest-neighbour search:
+        the radius starts at GEO_START_RADIUS_KM and widens until ``limit`` properties are found
+        or GEO_MAX_RADIUS_KM is reached. ``after`` is the ``(distance_km, id)`` of the last
+        property of the previous page.
+        """
+        radius_km = radius_km and min(radius_km, GEO_MAX_RADIUS_KM)
+        radius = radius_km or GEO_START_RADIUS_KM
+        distance = _haversine_km_sql(latitude, longitude, SQL("latitude"), SQL("longitude"))
+        while True:
+            query = self._search((domain or []) + self._geo_bbox_domain(latitude, longitude, radius))
+            conditions = [SQL("distance <= %s", radius)]
+            if after:
+                conditions.append(SQL("(distance, id) > (%s, %s)", after[0], after[1]))
+            self.env.cr.execute(SQL("""
+                SELECT id, distance
+                  FROM (SELECT id, %s AS distance FROM property_property WHERE id IN %s) AS candidates
+                 WHERE %s
+              ORDER BY distance, id
+                 LIMIT %s
+            """, distance, query.subselect(), SQL(" AND ").join(conditions), limit))
+            rows = self.env.cr.fetchall()
+            if radius_km or len(rows) >= limit or radius >= GEO_MAX_RADIUS_KM:
+                return [(self.browse(property_id), property_distance) for property_id, property_distance in rows]
+            radius = min(radius * 4, GEO_MAX_RADIUS_KM)
+
+    # -------------------- RECOMMENDATIONS --------------------
+    def _mark_neighbors_stale(self):
+        """
+        Queue the similar properties of self for recomputation, along with the lists self appears
+        in. Refreshing self also enters it in the other lists it now belongs to (see
+        property.neighbor ``_refresh``), so no other list needs recomputing.
+        """
+        if not self:
+            return
+        self.flush_model(['neighbors_stale'])
+        self.env.cr.execute(SQL("""
+            UPDATE property_property
+               SET neighbors_stale = true
+             WHERE NOT COALESCE(neighbors_stale, false)
+               AND (id IN %s OR id IN (SELECT property_id FROM property_neighbor WHERE neighbor_id IN %s))
+        """, tuple(self.ids), tuple(self.ids)))
+        self.invalidate_model(['neighbors_stale'])
+        cron = self.env.ref('real_estate_management.ir_cron_refresh_property_neighbors', raise_if_not_found=False)
+        if cron:
+            cron._trigger()
+
+    def _get_recommendations(self, limit=RECOMMENDATION_LIMIT):
+        """``[(property, kind)]`` of the precomputed similar properties, most similar first."""
+        self.ensure_one()
+        neighbors = self.env['property.neighbor'].search_fetch(
+            [('property_id', '=', self.id), ('neighbor_id.is_published', '=', True)],
+            ['neighbor_id', 'kind'], limit=limit,
+        )
+        properties = neighbors.neighbor_id._fetch_payload('recommendation')
+        return [(properties.browse(neighbor.neighbor_id.id), neighbor.kind) for neighbor in neighbors]
+
+    # -------------------- PAYLOADS --------------------
+    def _fetch_payload(self, payload):
+        """
+        Load the fields of ``payload`` for the whole recordset and return it, in the context
+        the serializers must read it with.
+
+        One query for the property columns and one per relation, instead of the ORM prefetching
+        every stored column (descriptions, AI content...) as soon as any field is read.
+        """
+        records = self.with_context(bin_size=True)
+        records.fetch(PAYLOAD_FIELDS[payload])
+        records.category_id.fetch(['name'])
+        if 'gallery_image_ids' in PAYLOAD_FIELDS[payload]:
+            records.filtered(lambda rec: not rec.image).gallery_image_ids.fetch(['write_date'])
+        return records
+
+    def _serialize_cards(self, website, origin=None):
+        """Listing card dicts, reads only PAYLOAD_FIELDS['card']. With an ``origin`` point, cards get their distance to it."""
+        return [{
+            'id': prop.id,
+            'name': prop.name,
+            'image_url': website.image_url(prop, 'image_512') if prop.image else '',
+            'image_url_2x': website.image_url(prop, 'image_1024') if prop.image else '',
+            'category': prop.category_id.name or '',
+            'price': prop.price,
+            'plot_area': prop.plot_area,
+            'price_per_sqft': prop.price_per_sqft,
+            'city': prop.city,
+            'zip_code': prop.zip_code,
+            'distance_km': round(_haversine_km(origin[0], origin[1], prop.latitude, prop.longitude), 1)
+            if origin and (prop.latitude or prop.longitude) else None,
+        } for prop in self]
+
+    def _serialize_markers(self, website, category_colors, origin=None):
+        """Map marker dicts, reads only PAYLOAD_FIELDS['marker']. With an ``origin`` point, markers get their distance to it."""
+        markers = []
+        for prop in self:
+            cat = prop.category_id.name or 'Property'
+            image_url = None
+            if prop.image:
+                image_url = website.image_url(prop, 'image_256')
+            elif prop.gallery_image_ids:
+                # Use first image from gallery if main image not available
+                image_url = website.image_url(prop.gallery_image_ids[0], 'datas', '256x256')
+            markers.append({
+                'id': prop.id,
+                'name': prop.name or '',
+                'latitude': float(prop.latitude),
+                'longitude': float(prop.longitude),
+                'street': prop.street or '',
+                'city': prop.city or '',
+                'zip_code': prop.zip_code or '',
+                'price': float(prop.price) if prop.price else 0,
+                'contact_phone': prop.contact_phone or '',
+                'contact_email': prop.contact_email or '',
+                'contact_name': prop.contact_name or '',
+                'short_description': prop.short_description or '',
+                'image_url': image_url,
+                'property_type': cat,
+                'nearby_landmarks': prop.nearby_landmarks or '',
+                'views': prop.views or 0,
+                'seo_title': prop.seo_title or '',
+                'marker_color': category_colors.get(cat, '#4f46e5'),
+                'full_address': ", ".join(filter(None, [prop.street, prop.city, prop.zip_code])),
+                'distance_km': round(_haversine_km(origin[0], origin[1], prop.latitude, prop.longitude), 1)
+                if origin else None,
+            })
+        return markers
+
+    # -------------------- AI CONTENT --------------------
+    def _queue_ai_content(self):
+        """Flag the properties for the AI content cron, it only picks up published ones."""
+        if not self:
+            return
+        self.write({
+            'ai_generation_state': 'pending',
+            'ai_generation_attempts': 0,
+            'ai_next_attempt': False,
+        })
+        cron = self.env.ref('real_estate_management.ir_cron_generate_ai_content', raise_if_not_found=False)
+        if cron:
+            cron._trigger()
 
     def generate_ai_content(self):
+        """Call the completions API and store the generated sections, raises on failure."""
         self.ensure_one()
         api_key = self.env['ir.config_parameter'].sudo().get_param('openai.api_key')
         if not api_key:
-            _logger.error("OpenAI API key not configured")
-            return
+            raise UserError(_("OpenAI API key not configured"))
 
         _logger.info(f"Generating AI content for property: {self.name}")
 
@@ -212,177 +919,88 @@ class Property(models.Model):
             'temperature': 0.3
         }
 
-        try:
+        with _track_outbound('completions'):
             res = requests.post(
-                'https://api.openai.com/v1/chat/completions',
+                _completions_url(self.env),
                 headers=headers,
                 json=payload,
                 timeout=30
             )
-            res.raise_for_status()
-            response_data = res.json()
-            response_text = response_data['choices'][0]['message']['content']
-            print(response_text)
-            if response_text.startswith("```json"):
-                response_text = response_text.replace("```json", "").replace("```", "")
+        res.raise_for_status()
+        response_data = res.json()
+        response_text = response_data['choices'][0]['message']['content']
+        if response_text.startswith("```json"):
+            response_text = response_text.replace("```json", "").replace("```", "")
 
-            try:
-                js = json.loads(response_text)
-                print(js)
-
-                # Convert lists to HTML <ul> format
-                def list_to_html(lst):
-                    if not isinstance(lst, list) or not lst:
-                        return str(lst) if lst else ''
-                    return '<ul>' + ''.join(f'<li>{item}</li>' for item in lst) + '</ul>'
-
-            except Exception as e:
-                print(f"JSON parse error: {e}")
-                js = {'key_highlights': response_text}
-
-            self.write({
-                'ai_key_highlights': list_to_html(js.get('key_highlights', '')),
-                'ai_investment_data': list_to_html(js.get('investment_data', '')),
-                'ai_nearby_places': list_to_html(js.get('nearby_places', '')),
-                'ai_unique_features': list_to_html(js.get('unique_features', '')),
-                'ai_content_generated': True,
-                'ai_generation_date': fields.Datetime.now(),
-            })
-            print(f"AI content generated for {self.name}")
-
-        except Exception as e:
-            print(f"AI generation failed for {self.name}: {e}")
+        try:
+            js = json.loads(response_text)
+        except ValueError as e:
+            _logger.warning(f"JSON parse error for property {self.id}: {e}")
+            js = {'key_highlights': response_text}
+
+        self.write({
+            'ai_key_highlights': _list_to_html(js.get('key_highlights', '')),
+            'ai_investment_data': _list_to_html(js.get('investment_data', '')),
+            'ai_nearby_places': _list_to_html(js.get('nearby_places', '')),
+            'ai_unique_features': _list_to_html(js.get('unique_features', '')),
+            'ai_content_generated': True,
+            'ai_generation_date': fields.Datetime.now(),
+        })
+        _logger.info(f"AI content generated for {self.name}")
 
     def action_regenerate_ai_content(self):
-        for rec in self:
-            rec.generate_ai_content()
+        self._queue_ai_content()
 
     @api.model
-    def get_city_investment_info(self, city_name):
-        """
-        Get or generate AI investment information for a city
+    def _cron_generate_ai_content(self, batch_size=20):
         """
-        if not city_name:
-            return None
-
-        # Search if we already have this city's investment data in any property
-        existing = self.search([
-            ('last_city_processed', '=', city_name),
-            ('city_investment_generated', '=', True)
-        ], limit=1)
-
-        if existing:
-            return {
-                'city': city_name,
-                'ai_investment_reasons': existing.city_investment_reasons,
-                'ai_growth_potential': existing.city_growth_potential,
-                'ai_infrastructure': existing.city_infrastructure,
-                'ai_market_trends': existing.city_market_trends,
-                'ai_content_generated': True,
-            }
-
-        # Get API key
-        api_key = self.env['ir.config_parameter'].sudo().get_param('openai.api_key')
-        if not api_key:
-            _logger.error("OpenAI API key not configured")
-            return None
-
-        print(f"Generating AI investment content for city: {city_name}")
-
-        prompt = (
-            f"Create a concise, premium, and trustworthy real estate investment summary for {city_name}, India. "
-            "Return a JSON object with exactly four keys, each containing a short paragraph (2–3 sentences max): "
-            "'investment_reasons' — Explain why this city is a reliable and smart choice for real estate investment. Focus on safety, job growth, lifestyle, and investor confidence. "
-            "'growth_potential' — Highlight upcoming developments, government initiatives, and economic growth that boost long-term value. "
-            "'infrastructure' — Summarize key transport links, urban projects, and quality-of-life improvements. "
-            "'market_trends' — Describe current property and rental trends that indicate steady demand and appreciation. "
-            "Use warm, confident language that builds trust with first-time investors — make it sound like expert advice backed by real urban and economic growth data. "
-            "Avoid lists — write naturally in full sentences with a realistic tone suitable for a luxury real estate website."
-        )
-
-
-
-        headers = {'Authorization': f'Bearer {api_key}', 'Content-Type': 'application/json'}
-        payload = {
-            'model': 'gpt-4o-mini',
-            'messages': [
-                {'role': 'system',
-                 'content': 'You are a real estate investment analyst. Provide factual data about cities in India with focus on real estate investment potential.'},
-                {'role': 'user', 'content': prompt}
-            ],
-            'max_tokens': 600,
-            'temperature': 0.3
-        }
-
-        try:
-            res = requests.post(
-                'https://api.openai.com/v1/chat/completions',
-                headers=headers,
-                json=payload,
-                timeout=30
-            )
-            res.raise_for_status()
-            response_data = res.json()
-            response_text = response_data['choices'][0]['message']['content']
-
-            if response_text.startswith:
-                response_text = response_text.replace("```json", "").replace("```", "")
+        Generate AI content for queued published properties.
 
+        A property is leased as 'running' while its request is in flight; failures are
+        retried with exponential backoff up to ``real_estate_management.ai_max_attempts``.
+        """
+        max_attempts = int(self.env['ir.config_parameter'].sudo().get_param(
+            'real_estate_management.ai_max_attempts', 5))
+        now = fields.Datetime.now()
+        properties = self.search([
+            ('is_published', '=', True),
+            '|', ('ai_generation_state', 'in', ('pending', 'running', 'failed')),
+            '&', ('ai_generation_state', '=', 'none'), ('ai_content_generated', '=', False),
+            ('ai_generation_attempts', '<', max_attempts),
+            '|', ('ai_next_attempt', '=', False), ('ai_next_attempt', '<=', now),
+        ], limit=batch_size, order='ai_next_attempt asc nulls first, id')
+        commit = not getattr(threading.current_thread(), 'testing', False)
+
+        for rec in properties:
+            # A run that did not report back within the lease is retried by a later cron run
+            rec.write({'ai_generation_state': 'running', 'ai_next_attempt': now + timedelta(hours=1)})
+            if commit:
+                self.env.cr.commit()
             try:
-                js = json.loads(response_text)
-
-                def list_to_html(lst):
-                    if not isinstance(lst, list) or not lst:
-                        return str(lst) if lst else ''
-                    return '<ul>' + ''.join(f'<li>{item}</li>' for item in lst) + '</ul>'
-
-                investment_reasons = list_to_html(js.get('investment_reasons', ''))
-                growth_potential = list_to_html(js.get('growth_potential', ''))
-                infrastructure = list_to_html(js.get('infrastructure', ''))
-                market_trends = list_to_html(js.get('market_trends', ''))
-
-                # Store in a dummy property record to cache the data
-                city_cache = self.search([('last_city_processed', '=', city_name)], limit=1)
-                if not city_cache:
-                    # Create a dummy record just to store city data
-                    city_cache = self.create({
-                        'name': f'City Data - {city_name}',
-                        'city': city_name,
-                        'city_investment_reasons': investment_reasons,
-                        'city_growth_potential': growth_potential,
-                        'city_infrastructure': infrastructure,
-                        'city_market_trends': market_trends,
-                        'city_investment_generated': True,
-                        'city_investment_date': fields.Datetime.now(),
-                        'last_city_processed': city_name,
-                        'is_published': False,
-                    })
-                else:
-                    city_cache.write({
-                        'city_investment_reasons': investment_reasons,
-                        'city_growth_potential': growth_potential,
-                        'city_infrastructure': infrastructure,
-                        'city_market_trends': market_trends,
-                        'city_investment_generated': True,
-                        'city_investment_date': fields.Datetime.now(),
-                        'last_city_processed': city_name,
-                    })
-
-                print(f"AI city investment content generated and stored for {city_name}")
-
-                return {
-                    'city': city_name,
-                    'ai_investment_reasons': investment_reasons,
-                    'ai_growth_potential': growth_potential,
-                    'ai_infrastructure': infrastructure,
-                    'ai_market_trends': market_trends,
-                    'ai_content_generated': True,
-                }
-
+                rec.generate_ai_content()
             except Exception as e:
-                print(f"JSON parse error for city: {e}")
-                return None
+                if commit:
+                    self.env.cr.rollback()
+                attempts = rec.ai_generation_attempts + 1
+                _logger.warning(f"AI generation failed for {rec.name} (attempt {attempts}): {e}")
+                rec.write({
+                    'ai_generation_state': 'failed',
+                    'ai_generation_attempts': attempts,
+                    'ai_next_attempt': fields.Datetime.now() + timedelta(minutes=AI_RETRY_MINUTES * 2 ** (attempts - 1)),
+                })
+            else:
+                rec.write({'ai_generation_state': 'done', 'ai_next_attempt': False})
+            if commit:
+                self.env.cr.commit()
+
+        if len(properties) == batch_size:
+            self.env.ref('real_estate_management.ir_cron_generate_ai_content')._trigger()
 
-        except Exception as e:
-            print(f"AI generation failed for city {city_name}: {e}")
+    @api.model
+    def get_city_investment_info(self, city_name):
+        """
+        Get AI investment information for a city, see ``property.city.insight._get_insight``
+        """
+        if not city_name:
             return None
+        return self.env['property.city.insight'].sudo()._get_insight(city_name)
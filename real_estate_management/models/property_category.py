@@ -1,4 +1,4 @@
-from odoo import models, fields
+from odoo import models, fields, api
 
 
 class PropertyCategory(models.Model):
@@ -14,3 +14,16 @@ class PropertyCategory(models.Model):
     seo_description = fields.Text('SEO Description')
 
     property_ids = fields.One2many('property.property', 'category_id', string='Properties')
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        self.env['real.estate.cache.tag']._bump(['categories'])
+        return super().create(vals_list)
+
+    def write(self, vals):
+        self.env['real.estate.cache.tag']._bump(['categories'])
+        return super().write(vals)
+
+    def unlink(self):
+        self.env['real.estate.cache.tag']._bump(['categories'])
+        return super().unlink()
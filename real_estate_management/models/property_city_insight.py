@@ -0,0 +1,241 @@
+from odoo import models, fields, api, _
+from odoo.exceptions import UserError
+from odoo.tools import SQL, escape_psql
+from collections import OrderedDict
+from datetime import timedelta
+import json
+import logging
+import requests
+import threading
+import time
+
+from .ir_http import _track_outbound
+from .property import AI_RETRY_MINUTES, _completions_url, _list_to_html
+
+_logger = logging.getLogger(__name__)
+
+# Per-worker LRU in front of the city insight table
+CITY_INSIGHT_LRU_SIZE = 256
+# Seconds a generated insight, or a placeholder for one being generated, stays in the LRU
+CITY_INSIGHT_LRU_SECONDS = 300
+CITY_INSIGHT_PLACEHOLDER_SECONDS = 30
+
+_insight_lru = OrderedDict()
+_insight_lru_lock = threading.Lock()
+
+
+class PropertyCityInsight(models.Model):
+    _name = 'property.city.insight'
+    _description = 'City Investment Insight'
+    _order = 'city'
+    _rec_name = 'city'
+
+    city = fields.Char(string='City', required=True)
+    city_key = fields.Char(string='City Key', compute='_compute_city_key', store=True, required=True, index=True)
+    investment_reasons = fields.Html(string='Investment Reasons', readonly=True)
+    growth_potential = fields.Html(string='Growth Potential', readonly=True)
+    infrastructure = fields.Html(string='Infrastructure', readonly=True)
+    market_trends = fields.Html(string='Market Trends', readonly=True)
+    state = fields.Selection([
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ], string='Status', default='pending', required=True, readonly=True, index=True)
+    generation_date = fields.Datetime(string='Generated On', readonly=True)
+    attempts = fields.Integer(string='Attempts', readonly=True)
+    next_attempt = fields.Datetime(string='Next Attempt', readonly=True)
+
+    _sql_constraints = [
+        ('city_key_uniq', 'unique(city_key)', 'Insights already exist for this city.'),
+    ]
+
+    @api.model
+    def _city_key(self, city_name):
+        return ' '.join(city_name.lower().split())
+
+    @api.depends('city')
+    def _compute_city_key(self):
+        for rec in self:
+            rec.city_key = self._city_key(rec.city or '')
+
+    @api.model
+    def _get_insight(self, city_name):
+        """
+        Investment insight of ``city_name`` as a dict, served from the worker LRU when possible.
+
+        Never calls the completions API: a missing city is inserted as 'pending' (at most
+        once, whatever the number of concurrent requests) for the generation cron, and
+        stale content is served while it is being refreshed. Until content exists the
+        dict has ``ai_content_generated`` set to False so pages can show a placeholder.
+        Returns None for a city without published properties, which is never queued.
+        """
+        city_key = self._city_key(city_name)
+        lru_key = (self.env.cr.dbname, city_key)
+        now = time.monotonic()
+        with _insight_lru_lock:
+            cached = _insight_lru.get(lru_key)
+            if cached and cached[0] > now:
+                _insight_lru.move_to_end(lru_key)
+                return cached[1]
+
+        insight = self._get_or_queue(city_name, city_key)
+        if not insight:
+            return None
+        info = {
+            'city': city_name,
+            'ai_investment_reasons': insight.investment_reasons,
+            'ai_growth_potential': insight.growth_potential,
+            'ai_infrastructure': insight.infrastructure,
+            'ai_market_trends': insight.market_trends,
+            'ai_content_generated': bool(insight.generation_date),
+        }
+        ttl = CITY_INSIGHT_LRU_SECONDS if insight.generation_date else CITY_INSIGHT_PLACEHOLDER_SECONDS
+        with _insight_lru_lock:
+            _insight_lru[lru_key] = (now + ttl, info)
+            _insight_lru.move_to_end(lru_key)
+            while len(_insight_lru) > CITY_INSIGHT_LRU_SIZE:
+                _insight_lru.popitem(last=False)
+        return info
+
+    @api.model
+    def _get_or_queue(self, city_name, city_key):
+        """
+        Return the insight row of ``city_key``, creating or flagging it for (re)generation.
+        Cities without published properties are not created, the city comes from the URL.
+        """
+        queued = False
+        insight = self.search([('city_key', '=', city_key)], limit=1)
+        if not insight:
+            if not self._is_listed_city(city_name):
+                return self.browse()
+            # ON CONFLICT makes concurrent first requests for a city share a single row
+            self.env.cr.execute(SQL("""
+                INSERT INTO property_city_insight (city, city_key, state, attempts, create_uid, create_date, write_uid, write_date)
+                     VALUES (%s, %s, 'pending', 0, %s, now() at time zone 'UTC', %s, now() at time zone 'UTC')
+                ON CONFLICT (city_key) DO NOTHING
+                  RETURNING id
+            """, city_name, city_key, self.env.uid, self.env.uid))
+            queued = bool(self.env.cr.fetchone())
+            insight = self.search([('city_key', '=', city_key)], limit=1)
+
+        ttl_days = int(self.env['ir.config_parameter'].sudo().get_param(
+            'real_estate_management.city_insight_ttl_days', 30))
+        if (insight.state == 'done' and ttl_days
+                and insight.generation_date < fields.Datetime.now() - timedelta(days=ttl_days)):
+            # Keep serving the stale content, the guarded update queues one refresh only
+            self.env.cr.execute(SQL("""
+                UPDATE property_city_insight
+                   SET state = 'pending', attempts = 0, next_attempt = NULL
+                 WHERE id = %s AND state = 'done'
+            """, insight.id))
+            queued = bool(self.env.cr.rowcount)
+            insight.invalidate_recordset(['state', 'attempts', 'next_attempt'])
+        if queued:
+            self.env.ref('real_estate_management.ir_cron_generate_city_insights')._trigger()
+        return insight
+
+    @api.model
+    def _is_listed_city(self, city_name):
+        """Whether published properties are located in ``city_name``, from the city facet counts."""
+        return bool(self.env['property.facet'].sudo().search_count(
+            [('facet', '=', 'city'), ('value', '=ilike', escape_psql(city_name.strip())), ('count', '>', 0)], limit=1,
+        ))
+
+    def _generate(self):
+        """Call the completions API and store the four sections, raises on failure."""
+        self.ensure_one()
+        city_name = self.city
+        api_key = self.env['ir.config_parameter'].sudo().get_param('openai.api_key')
+        if not api_key:
+            raise UserError(_("OpenAI API key not configured"))
+
+        _logger.info(f"Generating AI investment content for city: {city_name}")
+
+        prompt = (
+            f"Create a concise, premium, and trustworthy real estate investment summary for {city_name}, India. "
+            "Return a JSON object with exactly four keys, each containing a short paragraph (2–3 sentences max): "
+            "'investment_reasons' — Explain why this city is a reliable and smart choice for real estate investment. Focus on safety, job growth, lifestyle, and investor confidence. "
+            "'growth_potential' — Highlight upcoming developments, government initiatives, and economic growth that boost long-term value. "
+            "'infrastructure' — Summarize key transport links, urban projects, and quality-of-life improvements. "
+            "'market_trends' — Describe current property and rental trends that indicate steady demand and appreciation. "
+            "Use warm, confident language that builds trust with first-time investors — make it sound like expert advice backed by real urban and economic growth data. "
+            "Avoid lists — write naturally in full sentences with a realistic tone suitable for a luxury real estate website."
+        )
+
+        headers = {'Authorization': f'Bearer {api_key}', 'Content-Type': 'application/json'}
+        payload = {
+            'model': 'gpt-4o-mini',
+            'messages': [
+                {'role': 'system',
+                 'content': 'You are a real estate investment analyst. Provide factual data about cities in India with focus on real estate investment potential.'},
+                {'role': 'user', 'content': prompt}
+            ],
+            'max_tokens': 600,
+            'temperature': 0.3
+        }
+
+        with _track_outbound('completions'):
+            res = requests.post(
+                _completions_url(self.env),
+                headers=headers,
+                json=payload,
+                timeout=30
+            )
+        res.raise_for_status()
+        response_data = res.json()
+        response_text = response_data['choices'][0]['message']['content']
+        response_text = response_text.replace("```json", "").replace("```", "")
+        js = json.loads(response_text)
+
+        self.write({
+            'investment_reasons': _list_to_html(js.get('investment_reasons', '')),
+            'growth_potential': _list_to_html(js.get('growth_potential', '')),
+            'infrastructure': _list_to_html(js.get('infrastructure', '')),
+            'market_trends': _list_to_html(js.get('market_trends', '')),
+            'generation_date': fields.Datetime.now(),
+        })
+        self.env['real.estate.cache.tag']._bump(['city_insights'])
+        _logger.info(f"AI city investment content generated and stored for {city_name}")
+
+    def action_regenerate(self):
+        self.write({'state': 'pending', 'attempts': 0, 'next_attempt': False})
+        self.env.ref('real_estate_management.ir_cron_generate_city_insights')._trigger()
+
+    @api.model
+    def _cron_generate_city_insights(self, batch_size=10):
+        """Generate queued city insights, one run per city, with exponential backoff on errors."""
+        max_attempts = int(self.env['ir.config_parameter'].sudo().get_param(
+            'real_estate_management.ai_max_attempts', 5))
+        now = fields.Datetime.now()
+        insights = self.search([
+            ('state', 'in', ('pending', 'running', 'failed')),
+            ('attempts', '<', max_attempts),
+            '|', ('next_attempt', '=', False), ('next_attempt', '<=', now),
+        ], limit=batch_size, order='next_attempt asc nulls first, id')
+        commit = not getattr(threading.current_thread(), 'testing', False)
+
+        for insight in insights:
+            # A run that did not report back within the lease is retried by a later cron run
+            insight.write({'state': 'running', 'next_attempt': now + timedelta(hours=1)})
+            if commit:
+                self.env.cr.commit()
+            try:
+                insight._generate()
+            except Exception as e:
+                if commit:
+                    self.env.cr.rollback()
+                attempts = insight.attempts + 1
+                _logger.warning(f"AI generation failed for city {insight.city} (attempt {attempts}): {e}")
+                insight.write({
+                    'state': 'failed',
+                    'attempts': attempts,
+                    'next_attempt': fields.Datetime.now() + timedelta(minutes=AI_RETRY_MINUTES * 2 ** (attempts - 1)),
+                })
+            else:
+                insight.write({'state': 'done', 'attempts': 0, 'next_attempt': False})
+            if commit:
+                self.env.cr.commit()
+
+        if len(insights) == batch_size:
+            self.env.ref('real_estate_management.ir_cron_generate_city_insights')._trigger()
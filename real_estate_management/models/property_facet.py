@@ -0,0 +1,163 @@
+from odoo import models, fields, api
+from odoo.tools import SQL
+from collections import Counter
+
+# Facet -> (property field, lower bounds of its bands)
+FACET_BANDS = {
+    'price_band': ('price', [0, 2500000, 5000000, 10000000, 20000000, 50000000]),
+    'area_band': ('plot_area', [0, 1000, 2000, 5000, 10000]),
+}
+# Changing any of these on a property moves it between facet values
+FACET_FIELDS = ('is_published', 'city', 'category_id', 'title_status', 'facing_direction', 'price', 'plot_area')
+
+
+def _format_band_bound(facet, amount):
+    if facet == 'area_band':
+        return f'{amount:,} sq.ft'
+    if amount >= 10000000:
+        return f'₹{amount / 10000000:g} Cr'
+    return f'₹{amount / 100000:g} L'
+
+
+class PropertyFacet(models.Model):
+    _name = 'property.facet'
+    _description = 'Property Facet Count'
+    _order = 'facet, value'
+    _log_access = False
+
+    facet = fields.Selection([
+        ('city', 'City'),
+        ('category', 'Category'),
+        ('title_status', 'Title Status'),
+        ('facing_direction', 'Facing Direction'),
+        ('price_band', 'Price Band'),
+        ('area_band', 'Area Band'),
+    ], string='Facet', required=True)
+    value = fields.Char(string='Value', required=True)
+    count = fields.Integer(string='Published Properties')
+
+    _sql_constraints = [
+        ('facet_value_uniq', 'unique(facet, value)', 'A facet value is counted once.'),
+    ]
+
+    # -------------------- BANDS --------------------
+    @api.model
+    def _band_key(self, facet, amount):
+        """Key of the band of ``facet`` containing ``amount``, e.g. ``'2500000-5000000'``."""
+        bounds = FACET_BANDS[facet][1]
+        index = max(i for i, bound in enumerate(bounds) if bound <= max(amount or 0, 0))
+        upper = bounds[index + 1] if index + 1 < len(bounds) else ''
+        return f'{bounds[index]}-{upper}'
+
+    @api.model
+    def _band_domain(self, facet, key):
+        """Property domain of a band key, empty when the key is malformed."""
+        field = FACET_BANDS[facet][0]
+        try:
+            lower, upper = key.split('-')
+            domain = [(field, '>=', float(lower))]
+            if upper:
+                domain.append((field, '<', float(upper)))
+        except (AttributeError, ValueError):
+            return []
+        return domain
+
+    @api.model
+    def _band_label(self, facet, key):
+        lower, upper = (int(bound) if bound else None for bound in key.split('-'))
+        if not lower:
+            return f'Under {_format_band_bound(facet, upper)}'
+        if upper is None:
+            return f'{_format_band_bound(facet, lower)}+'
+        return f'{_format_band_bound(facet, lower)} – {_format_band_bound(facet, upper)}'
+
+    # -------------------- COUNTS --------------------
+    @api.model
+    def _apply_delta(self, before, after):
+        """
+        Move the counts from the ``before`` to the ``after`` facet keys of a set of properties.
+
+        Both are Counters of ``(facet, value)`` as returned by ``property.property._facet_keys``.
+        Rows are upserted in a fixed order so concurrent writers lock them in the same order.
+        """
+        delta = Counter(after)
+        delta.subtract(before)
+        rows = sorted((facet, value, count) for (facet, value), count in delta.items() if count)
+        if not rows:
+            return
+        self.env.cr.execute(SQL("""
+            INSERT INTO property_facet (facet, value, count)
+                 VALUES %s
+            ON CONFLICT (facet, value) DO UPDATE SET count = property_facet.count + EXCLUDED.count
+        """, SQL(', ').join(SQL("(%s, %s, %s)", *row) for row in rows)))
+        self.invalidate_model(['count'])
+
+    @api.model
+    def _rebuild(self):
+        """
+        Recount every facet from the published properties.
+
+        Writes keep the counts up to date, this corrects changes made outside the ORM
+        (e.g. a deleted category clearing category_id in SQL).
+        """
+        Property = self.env['property.property']
+        published = [('is_published', '=', True)]
+        counts = Counter()
+        for facet, field in (('city', 'city'), ('category', 'category_id'),
+                             ('title_status', 'title_status'), ('facing_direction', 'facing_direction')):
+            for value, count in Property._read_group(published + [(field, '!=', False)], [field], ['__count']):
+                counts[facet, str(value.id if field == 'category_id' else value)] = count
+        for facet, (field, bounds) in FACET_BANDS.items():
+            self.env.cr.execute(SQL("""
+                SELECT width_bucket(GREATEST(COALESCE(%s, 0), 0)::float8, %s::float8[]), count(*)
+                  FROM property_property
+                 WHERE id IN %s
+              GROUP BY 1
+            """, SQL.identifier(field), [float(bound) for bound in bounds], Property._search(published).subselect()))
+            for bucket, count in self.env.cr.fetchall():
+                counts[facet, self._band_key(facet, bounds[bucket - 1])] = count
+
+        self.env.cr.execute(SQL("DELETE FROM property_facet"))
+        self._apply_delta(Counter(), counts)
+        self.env['real.estate.cache.tag']._bump(['properties'])
+
+    @api.model
+    def _get_facets(self):
+        """
+        ``{facet: [{'value', 'label', 'count'}]}`` of the published properties, from one small
+        query on the counts table. Bands are ordered by bound, other values by label.
+        """
+        Property = self.env['property.property']
+        selections = {
+            facet: dict(Property._fields[facet]._description_selection(self.env))
+            for facet in ('title_status', 'facing_direction')
+        }
+        facets = {facet: [] for facet, _label in self._fields['facet'].selection}
+        rows = self.search_fetch([('count', '>', 0)], ['facet', 'value', 'count'])
+        categories = self.env['property.category'].browse(
+            [int(row.value) for row in rows if row.facet == 'category']
+        ).exists()
+        category_names = {str(category.id): category.name for category in categories}
+
+        for row in rows:
+            if row.facet == 'city':
+                label = row.value
+            elif row.facet == 'category':
+                label = category_names.get(row.value)
+            elif row.facet in FACET_BANDS:
+                label = self._band_label(row.facet, row.value)
+            else:
+                label = selections[row.facet].get(row.value)
+            if label:
+                facets[row.facet].append({'value': row.value, 'label': label, 'count': row.count})
+
+        for facet, values in facets.items():
+            if facet in FACET_BANDS:
+                values.sort(key=lambda item: int(item['value'].split('-')[0]))
+            else:
+                values.sort(key=lambda item: item['label'].lower())
+        return facets
+
+    @api.model
+    def _cron_rebuild_facets(self):
+        self._rebuild()
@@ -0,0 +1,73 @@
+from odoo import models, fields, api
+from datetime import timedelta
+import hashlib
+import re
+
+# Address components in fingerprint order
+GEOCODE_ADDRESS_KEYS = ('street', 'zip', 'city', 'state', 'country')
+
+
+class PropertyGeocodeCache(models.Model):
+    _name = 'property.geocode.cache'
+    _description = 'Property Geocode Cache'
+    _order = 'geocoded_on desc'
+    _rec_name = 'address'
+
+    fingerprint = fields.Char(string='Fingerprint', required=True, index=True, readonly=True)
+    address = fields.Char(string='Normalized Address', readonly=True)
+    latitude = fields.Float(string='Latitude', digits=(16, 5), readonly=True)
+    longitude = fields.Float(string='Longitude', digits=(16, 5), readonly=True)
+    provider = fields.Char(string='Provider', required=True, readonly=True)
+    geocoded_on = fields.Datetime(string='Geocoded On', readonly=True)
+
+    _sql_constraints = [
+        # Coordinates differ between providers, switching provider must not serve the other one's
+        ('fingerprint_provider_uniq', 'unique(fingerprint, provider)', 'An address can only be cached once per provider.'),
+    ]
+
+    @api.model
+    def _normalize_address(self, address):
+        """Lowercase, strip punctuation and collapse whitespace so trivially different spellings share an entry."""
+        return '|'.join(
+            ' '.join(re.sub(r'[^\w\s]', ' ', (address.get(key) or '').lower()).split())
+            for key in GEOCODE_ADDRESS_KEYS
+        )
+
+    @api.model
+    def _fingerprint(self, address):
+        return hashlib.sha1(self._normalize_address(address).encode()).hexdigest()
+
+    @api.model
+    def _lookup(self, address, provider):
+        """Return the ``(latitude, longitude)`` of ``address`` cached for ``provider``, or None if missing or expired."""
+        entry = self.search([('fingerprint', '=', self._fingerprint(address)), ('provider', '=', provider)], limit=1)
+        if not entry:
+            return None
+        ttl_days = int(self.env['ir.config_parameter'].sudo().get_param(
+            'real_estate_management.geocode_cache_ttl_days', 180))
+        if ttl_days and entry.geocoded_on < fields.Datetime.now() - timedelta(days=ttl_days):
+            return None
+        return entry.latitude, entry.longitude
+
+    @api.model
+    def _store(self, address, coords, provider):
+        fingerprint = self._fingerprint(address)
+        vals = {
+            'address': self._normalize_address(address),
+            'latitude': coords[0],
+            'longitude': coords[1],
+            'provider': provider,
+            'geocoded_on': fields.Datetime.now(),
+        }
+        entry = self.search([('fingerprint', '=', fingerprint), ('provider', '=', provider)], limit=1)
+        if entry:
+            entry.write(vals)
+        else:
+            self.create(dict(vals, fingerprint=fingerprint))
+
+    @api.autovacuum
+    def _gc_expired(self):
+        ttl_days = int(self.env['ir.config_parameter'].sudo().get_param(
+            'real_estate_management.geocode_cache_ttl_days', 180))
+        if ttl_days:
+            self.search([('geocoded_on', '<', fields.Datetime.now() - timedelta(days=ttl_days))]).unlink()
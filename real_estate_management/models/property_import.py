@@ -0,0 +1,296 @@
+from odoo import models, fields, api, _
+from odoo.exceptions import UserError
+from werkzeug.datastructures import FileStorage
+import csv
+import io
+import itertools
+import json
+import logging
+import threading
+import zipfile
+
+_logger = logging.getLogger(__name__)
+
+# Rows created per property create, the unit of commit and progress
+IMPORT_BATCH_SIZE = 500
+# Rows handled per cron run before it triggers itself again
+IMPORT_ROWS_PER_RUN = 5000
+# Property fields accepted as columns, values are converted according to the field type
+IMPORT_COLUMNS = (
+    'name', 'short_description', 'is_featured', 'price', 'plot_area', 'facing_direction', 'road_width',
+    'title_status', 'street', 'street2', 'city', 'zip_code', 'latitude', 'longitude', 'contact_name',
+    'contact_phone', 'contact_email', 'seo_title', 'seo_description', 'nearby_landmarks', 'is_published',
+)
+IMPORT_TRUE = ('1', 'true', 'yes', 'y')
+IMPORT_FALSE = ('', '0', 'false', 'no', 'n')
+
+
+def _parse_json_line(line):
+    """Object of a JSON Lines row, None when it is not valid JSON so it is reported as a row error."""
+    try:
+        return json.loads(line)
+    except ValueError:
+        return None
+
+
+class PropertyImport(models.Model):
+    """
+    Bulk import of properties from a CSV, JSON Lines or JSON file, with an optional zip of
+    cover images referenced by the ``image`` column.
+
+    Rows are read as a stream and validated one by one by the import cron, valid ones are
+    created IMPORT_BATCH_SIZE at a time without chatter tracking. Geocoding, AI content and
+    image resizing are left to their background queues. Progress is committed with each
+    batch, along with the position in the file after its last row, so an interrupted import
+    or the next cron run resumes reading there instead of parsing the rows already imported.
+    """
+    _name = 'property.import'
+    _description = 'Property Import'
+    _order = 'id desc'
+
+    name = fields.Char(string='Description', required=True, default=lambda self: _('Property Import'))
+    file = fields.Binary(string='File', attachment=True, required=True)
+    file_name = fields.Char(string='File Name')
+    images_zip = fields.Binary(string='Images (zip)', attachment=True)
+    images_zip_name = fields.Char(string='Images File Name')
+    state = fields.Selection([
+        ('draft', 'Draft'),
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ], string='Status', default='draft', required=True, readonly=True)
+    total_rows = fields.Integer(string='Rows', readonly=True)
+    processed_rows = fields.Integer(string='Processed Rows', readonly=True)
+    # Byte offset in the file after the last processed row, its index for plain JSON arrays
+    file_position = fields.Integer(string='File Position', readonly=True)
+    created_count = fields.Integer(string='Created Properties', readonly=True)
+    error_count = fields.Integer(string='Errors', readonly=True)
+    progress = fields.Float(string='Progress', compute='_compute_progress')
+    failure_reason = fields.Text(string='Failure Reason', readonly=True)
+    error_ids = fields.One2many('property.import.error', 'import_id', string='Row Errors', readonly=True)
+
+    @api.depends('processed_rows', 'total_rows')
+    def _compute_progress(self):
+        for rec in self:
+            rec.progress = 100.0 * rec.processed_rows / rec.total_rows if rec.total_rows else 0.0
+
+    def action_start(self):
+        for rec in self:
+            if rec.state not in ('draft', 'failed'):
+                raise UserError(_("Import %s is already queued.", rec.name))
+        self.write({'state': 'queued', 'failure_reason': False})
+        self.env.ref('real_estate_management.ir_cron_run_property_imports')._trigger()
+
+    # -------------------- READING --------------------
+    def _open(self, field_name):
+        """Binary file object of the content of ``field_name``, from the filestore when possible."""
+        attachment = self.env['ir.attachment'].sudo().search([
+            ('res_model', '=', self._name), ('res_id', '=', self.id), ('res_field', '=', field_name),
+        ], limit=1)
+        if not attachment:
+            return None
+        if attachment.store_fname:
+            return open(attachment._full_path(attachment.store_fname), 'rb')
+        return io.BytesIO(attachment.raw)
+
+    def _iter_rows(self, binary, position=0):
+        """
+        ``(row, position)`` of the rows of the import file from ``position`` on, ``row`` being a
+        dict and ``position`` where the next row starts (see ``file_position``). Read as a stream
+        except for plain JSON arrays, which are loaded whole.
+        """
+        file_name = (self.file_name or '').lower()
+        if file_name.endswith(('.jsonl', '.ndjson')):
+            binary.seek(position)
+            for line in iter(binary.readline, b''):
+                if line.strip():
+                    yield _parse_json_line(line), binary.tell()
+            return
+        if file_name.endswith('.json'):
+            rows = json.load(binary)
+            if not isinstance(rows, list):
+                raise UserError(_("A JSON import file must contain a list of objects."))
+            for index in range(position, len(rows)):
+                yield rows[index], index + 1
+            return
+        # The reader is fed lines of the binary file, which is then right after the row it returned
+        lines = (line.decode('utf-8-sig') for line in iter(binary.readline, b''))
+        header = next(csv.reader(lines), None)
+        if not header:
+            return
+        if position:
+            binary.seek(position)
+        for row in csv.DictReader(lines, fieldnames=header):
+            yield row, binary.tell()
+
+    # -------------------- VALIDATION --------------------
+    @api.model
+    def _lookup_maps(self):
+        """Name -> id maps of the categories and states, loaded once per run."""
+        categories = {}
+        for category in self.env['property.category'].search_fetch([], ['name'], order='id'):
+            categories.setdefault(category.name.strip().lower(), category.id)
+        states = {}
+        for state in self.env['res.country.state'].search_fetch([], ['name'], order='id'):
+            states.setdefault(state.name.strip().lower(), state.id)
+        return categories, states
+
+    def _convert_row(self, row, maps, image_names):
+        """``property.property`` create values of ``row``, raises a ValueError describing the first invalid value."""
+        if not isinstance(row, dict):
+            raise ValueError(_("The row is not an object."))
+        Property = self.env['property.property']
+        categories, states = maps
+        vals = {}
+        for column in IMPORT_COLUMNS:
+            if column not in row:
+                continue
+            value = str(row[column]).strip() if row[column] is not None else ''
+            field = Property._fields[column]
+            try:
+                if field.type in ('float', 'monetary'):
+                    vals[column] = float(value) if value else 0.0
+                elif field.type == 'boolean':
+                    if value.lower() not in IMPORT_TRUE + IMPORT_FALSE:
+                        raise ValueError
+                    vals[column] = value.lower() in IMPORT_TRUE
+                elif field.type == 'selection':
+                    keys = dict(field._description_selection(self.env))
+                    if value and value not in keys:
+                        raise ValueError
+                    vals[column] = value or False
+                else:
+                    vals[column] = value or False
+            except ValueError:
+                raise ValueError(_("Invalid value %(value)r for column %(column)s.", value=value, column=column))
+
+        for column in ('name', 'city'):
+            if not vals.get(column):
+                raise ValueError(_("Column %s is required.", column))
+        if row.get('category'):
+            vals['category_id'] = categories.get(str(row['category']).strip().lower())
+            if not vals['category_id']:
+                raise ValueError(_("Unknown category %s.", row['category']))
+        if row.get('state'):
+            vals['state_id'] = states.get(str(row['state']).strip().lower())
+            if not vals['state_id']:
+                raise ValueError(_("Unknown state %s.", row['state']))
+        if vals.get('latitude') and vals.get('longitude'):
+            # Already located, nothing to queue for the geocoder
+            vals['geocode_state'] = 'done'
+        image = str(row.get('image') or '').strip()
+        if image and image not in image_names:
+            raise ValueError(_("Image %s is not in the zip file.", image))
+        return vals, image
+
+    # -------------------- PROCESSING --------------------
+    def _run(self, max_rows):
+        """Import up to ``max_rows`` more rows, committing after each batch, returns whether rows remain."""
+        self.ensure_one()
+        commit = not getattr(threading.current_thread(), 'testing', False)
+        if not self.total_rows:
+            with self._open('file') as counting:
+                self.total_rows = sum(1 for _row in self._iter_rows(counting))
+        binary = self._open('file')
+        images = self._open('images_zip')
+        try:
+            zip_file = zipfile.ZipFile(images) if images else None
+            image_names = set(zip_file.namelist()) if zip_file else set()
+            maps = self._lookup_maps()
+
+            rows = enumerate(self._iter_rows(binary, self.file_position), start=self.processed_rows + 1)
+            handled = 0
+            while handled < max_rows:
+                batch = list(itertools.islice(rows, min(IMPORT_BATCH_SIZE, max_rows - handled)))
+                if not batch:
+                    return False
+                self._import_batch([(row_number, row) for row_number, (row, _position) in batch],
+                                   maps, image_names, zip_file, batch[-1][1][1])
+                handled += len(batch)
+                if commit:
+                    self.env.cr.commit()
+            return self.processed_rows < self.total_rows
+        finally:
+            binary.close()
+            if images:
+                images.close()
+
+    def _import_batch(self, batch, maps, image_names, zip_file, position):
+        """
+        Validate and create ``[(row number, row)]``, recording the errors of the rejected rows,
+        ``position`` being the file position after the last row of the batch.
+        """
+        Property = self.env['property.property'].with_context(
+            tracking_disable=True, mail_create_nolog=True, mail_notrack=True)
+        errors = []
+        valid = []
+        for row_number, row in batch:
+            try:
+                valid.append((row_number,) + self._convert_row(row, maps, image_names))
+            except ValueError as e:
+                errors.append((row_number, str(e)))
+
+        created = []
+        try:
+            with self.env.cr.savepoint():
+                properties = Property.create([vals for _row_number, vals, _image in valid])
+            created = list(zip(valid, properties))
+        except Exception:
+            # Create them one by one to find out which rows fail
+            for item in valid:
+                try:
+                    with self.env.cr.savepoint():
+                        created.append((item, Property.create(item[1])))
+                except Exception as e:
+                    errors.append((item[0], str(e)))
+
+        Upload = self.env['real.estate.upload']
+        for (row_number, _vals, image), prop in created:
+            if not image:
+                continue
+            try:
+                with self.env.cr.savepoint():
+                    Upload._queue(Upload._spool([FileStorage(zip_file.open(image), filename=image)]), prop, 'image')
+            except UserError as e:
+                errors.append((row_number, _("Property created without its image: %s", e)))
+
+        self.env['property.import.error'].create([
+            {'import_id': self.id, 'row': row_number, 'message': message} for row_number, message in errors
+        ])
+        self.write({
+            'processed_rows': self.processed_rows + len(batch),
+            'file_position': position,
+            'created_count': self.created_count + len(created),
+            'error_count': self.error_count + len(errors),
+        })
+
+    @api.model
+    def _cron_run_imports(self):
+        """Advance the oldest queued or interrupted import by IMPORT_ROWS_PER_RUN rows."""
+        job = self.search([('state', 'in', ('queued', 'running'))], order='id', limit=1)
+        if not job:
+            return
+        job.state = 'running'
+        try:
+            remaining = job._run(IMPORT_ROWS_PER_RUN)
+        except Exception as e:
+            if not getattr(threading.current_thread(), 'testing', False):
+                self.env.cr.rollback()
+            _logger.warning(f"Property import {job.id} failed: {e}")
+            job.write({'state': 'failed', 'failure_reason': str(e)})
+            return
+        if not remaining:
+            job.state = 'done'
+        self.env.ref('real_estate_management.ir_cron_run_property_imports')._trigger()
+
+
+class PropertyImportError(models.Model):
+    _name = 'property.import.error'
+    _description = 'Property Import Row Error'
+    _order = 'import_id, row'
+    _log_access = False
+
+    import_id = fields.Many2one('property.import', string='Import', required=True, ondelete='cascade', index=True)
+    row = fields.Integer(string='Row')
+    message = fields.Char(string='Error')
@@ -0,0 +1,259 @@
+from odoo import models, fields, api
+from odoo.tools import SQL, escape_psql
+from odoo.tools.sql import create_index
+from markupsafe import Markup
+from dateutil.relativedelta import relativedelta
+
+# Upper bounds (₹/Sq.Ft) of the price per square foot histogram buckets, the last bucket is open
+MARKET_PPSF_BUCKETS = (1000, 2000, 3000, 4000, 5000, 7500, 10000, 15000, 20000, 30000)
+# Grouping sets of the statistics, by dimension
+MARKET_DIMENSIONS = {
+    'all': (),
+    'city': ('city',),
+    'category': ('category_id',),
+    'title_status': ('title_status',),
+    'city_category': ('city', 'category_id'),
+}
+# Columns the grouping sets are built from, in the order of their GROUPING() bits
+MARKET_GROUP_COLUMNS = ('city', 'category_id', 'title_status')
+
+
+class PropertyMarketStat(models.Model):
+    """
+    Price, area and price per square foot distribution of the published properties, by
+    month of listing and by city, category and title status, plus one snapshot of the
+    current market without month.
+
+    Rows are produced by one set-based statement per refresh (ordered-set aggregates over
+    grouping sets), so neither the dashboard nor the website ever aggregates properties.
+    Properties flag themselves ``market_stale`` when a figure changes and the refresh cron
+    only recomputes the months of the flagged ones.
+    """
+    _name = 'property.market.stat'
+    _description = 'Property Market Statistics'
+    _order = 'month desc, dimension, city, category_id, title_status'
+    _log_access = False
+
+    month = fields.Date(string='Listed In', help="First day of the month of listing, empty for the current market.")
+    dimension = fields.Selection([
+        ('all', 'All Properties'),
+        ('city', 'City'),
+        ('category', 'Category'),
+        ('title_status', 'Title Status'),
+        ('city_category', 'City and Category'),
+    ], string='Breakdown', required=True)
+    city = fields.Char(string='City')
+    category_id = fields.Many2one('property.category', string='Category', ondelete='cascade')
+    title_status = fields.Selection(selection=lambda self: self.env['property.property']._fields['title_status'].selection,
+                                    string='Title Status')
+    listing_count = fields.Integer(string='Listings')
+    # Statistics of one group each, grouping them in the dashboard averages rather than adds them up
+    price_avg = fields.Float(string='Average Price', aggregator='avg')
+    price_p25 = fields.Float(string='Price P25', aggregator='avg')
+    price_median = fields.Float(string='Median Price', aggregator='avg')
+    price_p75 = fields.Float(string='Price P75', aggregator='avg')
+    price_p90 = fields.Float(string='Price P90', aggregator='avg')
+    area_median = fields.Float(string='Median Area (Sq.Ft)', aggregator='avg')
+    ppsf_p25 = fields.Float(string='Price/Sq.Ft P25', aggregator='avg')
+    ppsf_median = fields.Float(string='Median Price/Sq.Ft', aggregator='avg')
+    ppsf_p75 = fields.Float(string='Price/Sq.Ft P75', aggregator='avg')
+    ppsf_p90 = fields.Float(string='Price/Sq.Ft P90', aggregator='avg')
+    registration_amount_median = fields.Float(string='Median Registration Amount', aggregator='avg')
+    # Listings per MARKET_PPSF_BUCKETS bucket
+    ppsf_histogram = fields.Json(string='Price/Sq.Ft Histogram')
+    ppsf_histogram_html = fields.Html(string='Price/Sq.Ft Distribution', compute='_compute_ppsf_histogram_html',
+                                      sanitize=False)
+    ppsf_mom_change = fields.Float(string='Price/Sq.Ft MoM (%)', aggregator='avg',
+                                   help="Change of the median price per square foot since the previous month.")
+    # Set when properties of the month were deleted, see property.property unlink()
+    stale = fields.Boolean(string='Outdated', readonly=True)
+
+    def init(self):
+        super().init()
+        create_index(self.env.cr, 'property_market_stat_dimension_month_index', self._table, ['dimension', 'month'])
+        # Statistics are built from scratch by the next cron run, e.g. on install
+        self.env.cr.execute(SQL("""
+            UPDATE property_property
+               SET market_stale = true
+             WHERE NOT EXISTS (SELECT 1 FROM property_market_stat)
+        """))
+
+    @api.depends('ppsf_histogram')
+    def _compute_ppsf_histogram_html(self):
+        labels = _bucket_labels()
+        for stat in self:
+            counts = stat.ppsf_histogram or []
+            peak = max(counts, default=0) or 1
+            stat.ppsf_histogram_html = Markup('').join(
+                Markup('<div class="d-flex align-items-center small"><span style="width:9em;">%s</span>'
+                       '<span class="bg-primary me-2" style="height:0.8em;width:%s%%;"></span>%s</div>') % (
+                    label, round(70 * count / peak), count)
+                for label, count in zip(labels, counts)
+            )
+
+    # -------------------- REFRESH --------------------
+    @api.model
+    def _mark_months_stale(self, properties):
+        """Flag the statistics ``properties`` were counted in, before they are deleted."""
+        if not properties:
+            return
+        properties.flush_model(['create_date'])
+        self.env.cr.execute(SQL("""
+            UPDATE property_market_stat
+               SET stale = true
+             WHERE month IS NULL
+                OR month IN (SELECT date_trunc('month', create_date)::date FROM property_property WHERE id IN %s)
+        """, tuple(properties.ids)))
+        self.invalidate_model(['stale'])
+
+    @api.model
+    def _cron_refresh_market_stats(self):
+        """Recompute the months of the properties flagged ``market_stale`` and the current market."""
+        self.env['property.property'].flush_model(['market_stale'])
+        self.env.cr.execute(SQL("""
+            SELECT id, date_trunc('month', create_date)::date
+              FROM property_property
+             WHERE market_stale
+               FOR UPDATE SKIP LOCKED
+        """))
+        rows = self.env.cr.fetchall()
+        self.env.cr.execute(SQL("SELECT DISTINCT month FROM property_market_stat WHERE stale AND month IS NOT NULL"))
+        months = {month for _id, month in rows} | {row[0] for row in self.env.cr.fetchall()}
+        if not rows and not months and not self.search_count([('stale', '=', True)], limit=1):
+            return
+        self._refresh(months)
+        if rows:
+            self.env.cr.execute(SQL("UPDATE property_property SET market_stale = false WHERE id IN %s",
+                                    tuple(id_ for id_, _month in rows)))
+            self.env['property.property'].invalidate_model(['market_stale'])
+
+    @api.model
+    def _cron_rebuild_market_stats(self):
+        """Recompute every month, e.g. after properties were changed outside the ORM."""
+        self.env.cr.execute(SQL("SELECT DISTINCT date_trunc('month', create_date)::date FROM property_property"))
+        months = {row[0] for row in self.env.cr.fetchall()}
+        self.env.cr.execute(SQL("SELECT DISTINCT month FROM property_market_stat WHERE month IS NOT NULL"))
+        self._refresh(months | {row[0] for row in self.env.cr.fetchall()})
+
+    def action_refresh(self):
+        self._cron_refresh_market_stats()
+        return {'type': 'ir.actions.client', 'tag': 'reload'}
+
+    @api.model
+    def _refresh(self, months):
+        """Replace the statistics of ``months`` and of the current market, then their trends."""
+        self.env['property.property'].flush_model()
+        self.flush_model()
+        month_sql = SQL("date_trunc('month', create_date)::date")
+        if months:
+            self.env.cr.execute(SQL("DELETE FROM property_market_stat WHERE month IN %s", tuple(months)))
+            self.env.cr.execute(self._aggregate_sql(month_sql, SQL("%s IN %s", month_sql, tuple(months))))
+        self.env.cr.execute(SQL("DELETE FROM property_market_stat WHERE month IS NULL"))
+        self.env.cr.execute(self._aggregate_sql(SQL("NULL::date"), SQL("TRUE")))
+
+        # A month's trend also moves when the previous month is recomputed
+        trend_months = tuple(months | {month + relativedelta(months=1) for month in months})
+        if trend_months:
+            self.env.cr.execute(SQL(
+                "UPDATE property_market_stat SET ppsf_mom_change = NULL WHERE month IN %s", trend_months,
+            ))
+            self.env.cr.execute(SQL("""
+                UPDATE property_market_stat cur
+                   SET ppsf_mom_change = round((100 * (cur.ppsf_median / prev.ppsf_median - 1))::numeric, 2)
+                  FROM property_market_stat prev
+                 WHERE cur.month IN %s
+                   AND prev.month = (cur.month - interval '1 month')::date
+                   AND prev.dimension = cur.dimension
+                   AND prev.city IS NOT DISTINCT FROM cur.city
+                   AND prev.category_id IS NOT DISTINCT FROM cur.category_id
+                   AND prev.title_status IS NOT DISTINCT FROM cur.title_status
+                   AND prev.ppsf_median > 0
+            """, trend_months))
+        self.invalidate_model()
+        self.env['real.estate.cache.tag']._bump(['market_stats'])
+
+    @api.model
+    def _aggregate_sql(self, month, where):
+        """INSERT of the statistics of the published properties matching ``where``, by ``month``."""
+        bounds = (None,) + MARKET_PPSF_BUCKETS + (None,)
+        histogram = SQL(", ").join(
+            SQL("count(*) FILTER (WHERE ppsf >= %s AND ppsf < %s)", low or 0, high) if high else
+            SQL("count(*) FILTER (WHERE ppsf >= %s)", low)
+            for low, high in zip(bounds, bounds[1:])
+        )
+        grouping_sets = SQL(", ").join(
+            SQL("(%s)", SQL(", ").join(SQL.identifier(column) for column in ('month',) + columns))
+            for columns in MARKET_DIMENSIONS.values()
+        )
+        # GROUPING() has a bit set for each column a row is aggregated over
+        dimension = SQL("CASE grouped %s END", SQL(" ").join(
+            SQL("WHEN %s THEN %s", sum(1 << (len(MARKET_GROUP_COLUMNS) - 1 - MARKET_GROUP_COLUMNS.index(column))
+                                       for column in MARKET_GROUP_COLUMNS if column not in columns), name)
+            for name, columns in MARKET_DIMENSIONS.items()
+        ))
+        return SQL("""
+            WITH base AS (
+                SELECT %(month)s AS month, btrim(city) AS city, category_id, title_status,
+                       price::float8 AS price, NULLIF(plot_area, 0)::float8 AS area,
+                       NULLIF(price_per_sqft, 0)::float8 AS ppsf,
+                       NULLIF(registration_amount, 0)::float8 AS registration_amount
+                  FROM property_property
+                 WHERE is_published AND price > 0 AND %(where)s
+            ), stats AS (
+                SELECT month, city, category_id, title_status,
+                       GROUPING(city, category_id, title_status) AS grouped,
+                       count(*) AS listing_count,
+                       avg(price) AS price_avg,
+                       percentile_cont(ARRAY[0.25, 0.5, 0.75, 0.9]) WITHIN GROUP (ORDER BY price) AS price_q,
+                       percentile_cont(0.5) WITHIN GROUP (ORDER BY area) AS area_median,
+                       percentile_cont(ARRAY[0.25, 0.5, 0.75, 0.9]) WITHIN GROUP (ORDER BY ppsf) AS ppsf_q,
+                       percentile_cont(0.5) WITHIN GROUP (ORDER BY registration_amount) AS registration_amount_median,
+                       jsonb_build_array(%(histogram)s) AS ppsf_histogram
+                  FROM base
+              GROUP BY GROUPING SETS (%(grouping_sets)s)
+            )
+            INSERT INTO property_market_stat (
+                month, dimension, city, category_id, title_status, listing_count, price_avg,
+                price_p25, price_median, price_p75, price_p90, area_median,
+                ppsf_p25, ppsf_median, ppsf_p75, ppsf_p90, registration_amount_median, ppsf_histogram, stale
+            )
+            SELECT month, %(dimension)s, city, category_id, title_status, listing_count, price_avg,
+                   price_q[1], price_q[2], price_q[3], price_q[4], area_median,
+                   ppsf_q[1], ppsf_q[2], ppsf_q[3], ppsf_q[4], registration_amount_median, ppsf_histogram, false
+              FROM stats
+        """, month=month, where=where, histogram=histogram, grouping_sets=grouping_sets, dimension=dimension)
+
+    # -------------------- QUERIES --------------------
+    @api.model
+    def _market_snapshot(self, city):
+        """Current market figures of ``city`` for the website, with the latest monthly trend, or None."""
+        current = self.search_fetch(
+            [('month', '=', False), ('dimension', '=', 'city'), ('city', '=ilike', escape_psql(city))],
+            ['listing_count', 'price_median', 'ppsf_p25', 'ppsf_median', 'ppsf_p75', 'ppsf_histogram'], limit=1,
+        )
+        if not current:
+            return None
+        latest = self.search_fetch(
+            [('month', '!=', False), ('dimension', '=', 'city'), ('city', '=ilike', escape_psql(city))],
+            ['month', 'ppsf_mom_change'], order='month desc', limit=1,
+        )
+        counts = current.ppsf_histogram or []
+        peak = max(counts, default=0) or 1
+        return {
+            'listing_count': current.listing_count,
+            'price_median': current.price_median,
+            'ppsf_median': current.ppsf_median,
+            'ppsf_p25': current.ppsf_p25,
+            'ppsf_p75': current.ppsf_p75,
+            'ppsf_mom_change': latest.ppsf_mom_change if latest else 0.0,
+            'histogram': [
+                {'label': label, 'count': count, 'height': round(100 * count / peak)}
+                for label, count in zip(_bucket_labels(), counts)
+            ],
+        }
+
+
+def _bucket_labels():
+    """Labels of the MARKET_PPSF_BUCKETS buckets, e.g. '1,000 - 2,000'."""
+    bounds = (0,) + MARKET_PPSF_BUCKETS
+    return [f'{low:,} - {high:,}' for low, high in zip(bounds, bounds[1:])] + [f'{MARKET_PPSF_BUCKETS[-1]:,}+']
@@ -0,0 +1,209 @@
+from odoo import models, fields, api
+from odoo.tools import SQL
+
+# Neighbours kept per property, a few more than the detail page shows so that
+# unpublishing one does not leave a gap until the next refresh
+NEIGHBOR_COUNT = 10
+# Weights of the similarity criteria, they sum to 1
+SIMILARITY_WEIGHTS = {
+    'price': 0.3,
+    'area': 0.2,
+    'category': 0.2,
+    'city': 0.15,
+    'distance': 0.15,
+}
+# Distance at which the geo criterion has decayed to 1/e
+SIMILARITY_DISTANCE_KM = 5.0
+# Same category and at most this far apart in price makes a neighbour 'similar'
+SIMILAR_PRICE_RATIO = 0.2
+# Candidates scored per property and per prefilter (closest prices above and below in the
+# category, nearest in the box of NEIGHBOR_RADIUS_KM, latest in the city)
+NEIGHBOR_CANDIDATES = 50
+# Beyond this distance the geo criterion is worth less than 1% of the score
+NEIGHBOR_RADIUS_KM = 3 * SIMILARITY_DISTANCE_KM
+
+
+def _haversine_km_sql(lat1, lng1, lat2, lng2):
+    """SQL great-circle distance in kilometers between two points given as SQL expressions."""
+    return SQL("""
+        (2 * 6371 * asin(sqrt(
+            power(sin(radians(%s - %s) / 2), 2)
+            + cos(radians(%s)) * cos(radians(%s)) * power(sin(radians(%s - %s) / 2), 2)
+        )))
+    """, lat2, lat1, lat1, lat2, lng2, lng1)
+
+
+class PropertyNeighbor(models.Model):
+    _name = 'property.neighbor'
+    _description = 'Similar Property'
+    _order = 'property_id, score desc'
+    _log_access = False
+
+    property_id = fields.Many2one('property.property', string='Property', required=True, ondelete='cascade')
+    neighbor_id = fields.Many2one('property.property', string='Similar Property', required=True,
+                                  ondelete='cascade', index=True)
+    score = fields.Float(string='Similarity', digits=(4, 3))
+    kind = fields.Selection([
+        ('similar', 'Similar Price'),
+        ('category', 'Same Category'),
+        ('nearby', 'Nearby'),
+    ], string='Kind', required=True)
+
+    def init(self):
+        super().init()
+        self.env.cr.execute(SQL("""
+            CREATE INDEX IF NOT EXISTS property_neighbor_property_id_score_index
+                ON property_neighbor (property_id, score DESC)
+        """))
+        # Properties that never got a list, e.g. on install, are picked up by the next cron run
+        self.env.cr.execute(SQL("""
+            UPDATE property_property
+               SET neighbors_stale = true
+             WHERE is_published
+               AND NOT EXISTS (SELECT 1 FROM property_neighbor WHERE property_id = property_property.id)
+        """))
+
+    @api.model
+    def _similarity_sql(self):
+        """SQL score in [0, 1] of candidate ``c`` for property ``p``."""
+        def closeness(column):
+            # 1 for equal values, down to 0 when one is twice the other or more
+            return SQL(
+                "(1 - LEAST(abs(COALESCE(c.%s, 0) - COALESCE(p.%s, 0)) / NULLIF(GREATEST(abs(c.%s), abs(p.%s)), 0), 1))",
+                SQL.identifier(column), SQL.identifier(column), SQL.identifier(column), SQL.identifier(column),
+            )
+
+        weights = SIMILARITY_WEIGHTS
+        distance = _haversine_km_sql(SQL("p.latitude"), SQL("p.longitude"), SQL("c.latitude"), SQL("c.longitude"))
+        return SQL("""
+            %s * COALESCE(%s, 0)
+            + %s * COALESCE(%s, 0)
+            + %s * COALESCE(c.category_id = p.category_id, false)::int
+            + %s * COALESCE(lower(c.city) = lower(p.city), false)::int
+            + %s * CASE WHEN COALESCE(p.latitude, 0) != 0 AND COALESCE(c.latitude, 0) != 0
+                        THEN exp(-%s / %s) ELSE 0 END
+        """, weights['price'], closeness('price'), weights['area'], closeness('plot_area'),
+            weights['category'], weights['city'], weights['distance'], distance, SIMILARITY_DISTANCE_KM)
+
+    @api.model
+    def _kind_sql(self, owner, other):
+        """SQL kind of property ``other`` in the neighbour list of property ``owner``, given as table aliases."""
+        owner, other = SQL.identifier(owner), SQL.identifier(other)
+        return SQL("""
+            CASE WHEN %(other)s.category_id = %(owner)s.category_id
+                      AND abs(COALESCE(%(other)s.price, 0) - COALESCE(%(owner)s.price, 0)) <= %(ratio)s * COALESCE(%(owner)s.price, 0)
+                 THEN 'similar'
+                 WHEN %(other)s.category_id = %(owner)s.category_id THEN 'category'
+                 ELSE 'nearby' END
+        """, owner=owner, other=other, ratio=SIMILAR_PRICE_RATIO)
+
+    @api.model
+    def _candidates_sql(self):
+        """
+        SQL ids of the published properties worth scoring for property ``p``: the closest
+        prices above and below in its category, the nearest in the box of NEIGHBOR_RADIUS_KM
+        and the latest in its city, NEIGHBOR_CANDIDATES of each. Each one is a range scan of
+        a partial index of property_property (see its ``init``), whatever the number of
+        properties. The properties scoring high on none of these criteria cannot make the top.
+        """
+        # 111.32 km per degree of latitude
+        lat_delta = NEIGHBOR_RADIUS_KM / 111.32
+        lng_delta = SQL("%s / GREATEST(cos(radians(p.latitude)), 0.01)", lat_delta)
+        distance = _haversine_km_sql(SQL("p.latitude"), SQL("p.longitude"), SQL("latitude"), SQL("longitude"))
+        return SQL("""
+            (SELECT id FROM property_property
+              WHERE is_published AND category_id = p.category_id AND price >= p.price
+           ORDER BY price, id
+              LIMIT %(limit)s)
+            UNION
+            (SELECT id FROM property_property
+              WHERE is_published AND category_id = p.category_id AND price < p.price
+           ORDER BY price DESC, id DESC
+              LIMIT %(limit)s)
+            UNION
+            (SELECT id FROM property_property
+              WHERE is_published AND COALESCE(p.latitude, 0) != 0
+                AND latitude BETWEEN p.latitude - %(lat_delta)s AND p.latitude + %(lat_delta)s
+                AND longitude BETWEEN p.longitude - %(lng_delta)s AND p.longitude + %(lng_delta)s
+           ORDER BY %(distance)s
+              LIMIT %(limit)s)
+            UNION
+            (SELECT id FROM property_property
+              WHERE is_published AND lower(city) = lower(p.city)
+           ORDER BY id DESC
+              LIMIT %(limit)s)
+        """, limit=NEIGHBOR_CANDIDATES, lat_delta=lat_delta, lng_delta=lng_delta, distance=distance)
+
+    @api.model
+    def _refresh(self, property_ids):
+        """
+        Replace the neighbour lists of ``property_ids`` by their top NEIGHBOR_COUNT published
+        properties by similarity among their candidates (see ``_candidates_sql``).
+
+        Similarity being symmetric, each refreshed property also enters the lists of its
+        candidates where it now makes the top NEIGHBOR_COUNT, and those lists are trimmed: the
+        other lists are kept up to date without being recomputed. Three statements whatever
+        the number of properties.
+        """
+        if not property_ids:
+            return
+        ids = tuple(property_ids)
+        self.env.cr.execute(SQL("DELETE FROM property_neighbor WHERE property_id IN %s", ids))
+        self.env.cr.execute(SQL("""
+            WITH scored AS MATERIALIZED (
+                SELECT p.id AS property_id, c.id AS neighbor_id, %(score)s AS score,
+                       %(kind)s AS kind, %(reverse_kind)s AS reverse_kind
+                  FROM property_property p
+            CROSS JOIN LATERAL (%(candidates)s) candidate
+                  JOIN property_property c ON c.id = candidate.id AND c.id != p.id
+                 WHERE p.id IN %(ids)s AND p.is_published
+            ), own AS (
+                INSERT INTO property_neighbor (property_id, neighbor_id, score, kind)
+                     SELECT property_id, neighbor_id, score, kind
+                       FROM (SELECT *, row_number() OVER (PARTITION BY property_id ORDER BY score DESC, neighbor_id) AS rank
+                               FROM scored) ranked
+                      WHERE rank <= %(count)s
+            )
+            INSERT INTO property_neighbor (property_id, neighbor_id, score, kind)
+                 SELECT s.neighbor_id, s.property_id, s.score, s.reverse_kind
+                   FROM scored s
+                  WHERE s.neighbor_id NOT IN %(ids)s
+                    AND NOT EXISTS (SELECT 1 FROM property_neighbor
+                                     WHERE property_id = s.neighbor_id AND neighbor_id = s.property_id)
+                    AND s.score > COALESCE((SELECT score FROM property_neighbor
+                                             WHERE property_id = s.neighbor_id
+                                          ORDER BY score DESC
+                                             LIMIT 1 OFFSET %(last)s), -1)
+              RETURNING property_id
+        """, score=self._similarity_sql(), kind=self._kind_sql('p', 'c'), reverse_kind=self._kind_sql('c', 'p'),
+            candidates=self._candidates_sql(), ids=ids, count=NEIGHBOR_COUNT, last=NEIGHBOR_COUNT - 1))
+        entered = tuple({row[0] for row in self.env.cr.fetchall()})
+        if entered:
+            self.env.cr.execute(SQL("""
+                DELETE FROM property_neighbor
+                 WHERE id IN (SELECT id
+                                FROM (SELECT id, row_number() OVER (PARTITION BY property_id ORDER BY score DESC, neighbor_id) AS rank
+                                        FROM property_neighbor
+                                       WHERE property_id IN %s) ranked
+                               WHERE rank > %s)
+            """, entered, NEIGHBOR_COUNT))
+        self.invalidate_model()
+        self.env['real.estate.cache.tag']._bump([f'property:{pid}' for pid in set(ids).union(entered)])
+
+    @api.model
+    def _cron_refresh_neighbors(self, batch_size=200):
+        """Refresh the neighbour lists of the properties flagged stale."""
+        self.env.cr.execute(SQL("""
+            SELECT id FROM property_property
+             WHERE neighbors_stale
+             LIMIT %s
+               FOR UPDATE SKIP LOCKED
+        """, batch_size))
+        ids = [row[0] for row in self.env.cr.fetchall()]
+        if not ids:
+            return
+        self._refresh(ids)
+        self.env.cr.execute(SQL("UPDATE property_property SET neighbors_stale = false WHERE id IN %s", tuple(ids)))
+        self.env['property.property'].invalidate_model(['neighbors_stale'])
+        if len(ids) == batch_size:
+            self.env.ref('real_estate_management.ir_cron_refresh_property_neighbors')._trigger()
@@ -1,7 +1,11 @@
 # -*- coding: utf-8 -*-
-from odoo import models, fields, api
+from odoo import models, fields, api, _
 from odoo.exceptions import UserError
 
+# Registrations approved per property create, bounds the images held in memory at once
+APPROVAL_BATCH_SIZE = 50
+
+
 class PropertyRegistration(models.Model):
     _name = 'property.registration'
     _description = 'Property Registration'
@@ -40,51 +44,180 @@ class PropertyRegistration(models.Model):
 
 
     email = fields.Char(string="Customer Email")  # Required for rejection email
+    property_id = fields.Many2one('property.property', string='Property', readonly=True, copy=False)
 
     def action_approve(self):
-        for rec in self:
-            if rec.status == 'approved':
-                raise UserError("Already approved.")
-            # Build property.property values dict mapping ONLY to existing fields!
+        """
+        Approve the registrations into properties, APPROVAL_BATCH_SIZE at a time.
+
+        A registration that cannot be approved is reported in its chatter and in the returned
+        notification, the others are approved anyway.
+        """
+        errors = {rec: _("Already approved.") for rec in self if rec.status == 'approved'}
+        if len(self) == 1 and errors:
+            raise UserError(errors[self])
+        todo = self.filtered(lambda rec: rec.status != 'approved')
+        for start in range(0, len(todo), APPROVAL_BATCH_SIZE):
+            errors.update(todo[start:start + APPROVAL_BATCH_SIZE]._approve_batch())
+        if len(self) == 1 and errors:
+            raise UserError(errors[self])
+        todo.filtered(lambda rec: rec not in errors)._queue_notification(
+            'real_estate_management.mail_template_property_approval')
+        for rec, error in errors.items():
+            rec.message_post(body=_("Approval failed: %s", error))
+
+        message = _("%s registration(s) approved.", len(self) - len(errors))
+        if errors:
+            message += " " + _("%s failed, see their chatter.", len(errors))
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'type': 'warning' if errors else 'success',
+                'message': message,
+                'next': {'type': 'ir.actions.client', 'tag': 'soft_reload'},
+            },
+        }
+
+    def _approve_batch(self):
+        """
+        Create the properties of self with one create and link their images, returns
+        ``{registration: error}`` of the registrations that could not be approved.
+        """
+        state_ids = self._name_to_id_map('res.country.state', self.mapped('state'))
+        category_ids = self._name_to_id_map('property.category', self.mapped('category'))
+        vals_list = [{
+            'name': rec.customer_name or 'Property',
+            'city': rec.city,
+            'state_id': state_ids.get(rec.state, False),
+            'country_id': rec.country_id.id,
+            'category_id': category_ids.get(rec.category, False),
+            'price': rec.price or 0.0,
+            'plot_area': rec.sq_yards or 0.0,
+        } for rec in self]
+
+        Property = self.env['property.property']
+        errors = {}
+        try:
+            with self.env.cr.savepoint():
+                approved = list(zip(self, Property.create(vals_list)))
+        except Exception:
+            # Create them one by one to find out which registrations fail
+            approved = []
+            for rec, vals in zip(self, vals_list):
+                try:
+                    with self.env.cr.savepoint():
+                        approved.append((rec, Property.create(vals)))
+                except Exception as e:
+                    errors[rec] = str(e)
+
+        property_ids = {rec.id: prop.id for rec, prop in approved}
+        self._link_gallery(property_ids)
+        self._link_cover(property_ids)
+        for rec, prop in approved:
+            rec.write({'status': 'approved', 'property_id': prop.id})
+        return errors
+
+    @api.model
+    def _name_to_id_map(self, model, names):
+        """``{name: id}`` of the records of ``model`` named ``names``, in one query."""
+        names = {name for name in names if name}
+        if not names:
+            return {}
+        mapping = {}
+        for record in self.env[model].search_fetch([('name', 'in', list(names))], ['name']):
+            mapping.setdefault(record.name, record.id)
+        return mapping
+
+    @api.model
+    def _link_gallery(self, property_ids):
+        """
+        Give the properties of ``property_ids`` (registration id -> property id) the gallery of
+        their registration, with one create. The copies of attachments stored in the filestore
+        are created empty then pointed to the registration's files (see ir.attachment
+        ``_link_files``), so the files are shared instead of copied.
+        """
+        if not property_ids:
+            return
+        Attachment = self.env['ir.attachment']
+        attachments = Attachment.search_fetch(
+            [('res_model', '=', self._name), ('res_id', 'in', list(property_ids))],
+            ['name', 'type', 'url', 'mimetype', 'store_fname', 'checksum', 'file_size', 'res_id'],
+        )
+        vals_list = []
+        for attachment in attachments:
             vals = {
-                'name': rec.customer_name or 'Property',
-                'city': rec.city,
-                'state_id': rec.state and self.env['res.country.state'].search([('name', '=', rec.state)], limit=1).id or False,
-                'country_id': rec.country_id.id if rec.country_id else False,
-                'category_id': rec.category and self.env['property.category'].search([('name', '=', rec.category)], limit=1).id or False,
-                'image': rec.image,
-                'price': rec.price or 0.0,
-                'plot_area': rec.sq_yards or 0.0
+                'name': attachment.name,
+                'type': attachment.type,
+                'url': attachment.url,
+                'mimetype': attachment.mimetype,
+                'res_model': 'property.property',
+                'res_id': property_ids[attachment.res_id],
             }
-            # Ensure all mandatory fields exist or fill with default/False
-            property_obj = self.env['property.property'].create(vals)
-            # Copy attachments to new property
-            attachments = self.env['ir.attachment'].search([
-                ('res_model', '=', 'property.registration'), ('res_id', '=', rec.id)
-            ])
-            for attach in attachments:
-                attach.copy({'res_model': 'property.property', 'res_id': property_obj.id})
-            rec.status = 'approved'
+            if attachment.type == 'binary' and not attachment.store_fname:
+                vals['raw'] = attachment.raw
+            vals_list.append(vals)
+        copies = Attachment.create(vals_list)
+        shared = [(copy, attachment) for copy, attachment in zip(copies, attachments) if attachment.store_fname]
+        Attachment.concat(*(copy for copy, _attachment in shared))._link_files([
+            (attachment.store_fname, attachment.checksum, attachment.file_size) for _copy, attachment in shared
+        ])
+
+    def _link_cover(self, property_ids):
+        """
+        Give the properties of ``property_ids`` (registration id -> property id) the main image
+        of their registration as cover image. Being at most 1024px it is stored as is in the
+        cover image and its 1024px variant, so both share the registration's file and only the
+        smaller variants are generated.
+        """
+        if not property_ids:
+            return
+        Property = self.env['property.property']
+        covers = self.env['ir.attachment'].search_fetch(
+            [('res_model', '=', self._name), ('res_field', '=', 'image'), ('res_id', 'in', list(property_ids))],
+            ['mimetype', 'store_fname', 'checksum', 'file_size', 'res_id'],
+        )
+        shared = covers.filtered('store_fname')
+        fields_to_share = ('image', 'image_1024')
+        # Created empty then pointed to the registration's file, create drops store_fname
+        self.env['ir.attachment'].create([{
+            'name': field_name,
+            'type': 'binary',
+            'mimetype': cover.mimetype,
+            'res_model': Property._name,
+            'res_field': field_name,
+            'res_id': property_ids[cover.res_id],
+        } for cover in shared for field_name in fields_to_share])._link_files([
+            (cover.store_fname, cover.checksum, cover.file_size) for cover in shared for _field_name in fields_to_share
+        ])
+        properties = Property.browse(property_ids[cover.res_id] for cover in shared)
+        properties.invalidate_recordset(['image', 'image_1024'])
+        properties.modified(['image'])
+        self.env.remove_to_compute(Property._fields['image_1024'], properties)
+        properties.flush_recordset(['image_512', 'image_256'])
+        # Database storage: the image is copied
+        for cover in covers - shared:
+            registration = self.browse(cover.res_id)
+            Property.browse(property_ids[cover.res_id]).image = registration.image
 
     def action_reject(self):
-        for rec in self:
-            if rec.status == 'rejected':
-                raise UserError("Already rejected.")
-            rec.status = 'rejected'
-            if rec.email:
-                template = self.env.ref('real_estate_management.mail_template_property_rejection')
-                template.send_mail(rec.id, force_send=True)
-
-                # template = self.env.ref('your_module.property_rejection_email_template', raise_if_not_found=False)
-                # if template:
-                #     try:
-                #         template.send_mail(rec.id, force_send=True)
-                #     except Exception as e:
-                #         raise UserError(_("Failed to send rejection email: %s") % str(e))
-                # else:
-                #     # No mail template found, just show warning
-                #     raise UserError(_("Rejection mail template not found. Please create it."))
-                #
+        if len(self) == 1 and self.status == 'rejected':
+            raise UserError("Already rejected.")
+        todo = self.filtered(lambda rec: rec.status != 'rejected')
+        todo.write({'status': 'rejected'})
+        todo._queue_notification('real_estate_management.mail_template_property_rejection')
+
+    def _queue_notification(self, template_xmlid):
+        """
+        Render ``template_xmlid`` for the registrations of self having an email, in one batch,
+        and queue the mails. They are sent by the mail queue cron over one SMTP connection
+        per batch, failed sends are retried by ``mail.mail._cron_retry_registration_mails``.
+        """
+        recipients = self.filtered('email')
+        if not recipients:
+            return
+        self.env.ref(template_xmlid).send_mail_batch(recipients.ids)
+        self.env.ref('mail.ir_cron_mail_scheduler_action')._trigger()
 
     # def action_reject(self):
     #     """When rejected, send a rejection email to the user"""
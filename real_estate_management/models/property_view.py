@@ -0,0 +1,89 @@
+from odoo import models, fields, api
+from odoo.tools import SQL
+from datetime import timedelta
+
+
+class PropertyViewEvent(models.Model):
+    _name = 'property.view.event'
+    _description = 'Property View Event'
+    _log_access = False
+
+    property_id = fields.Many2one('property.property', string='Property', required=True, ondelete='cascade')
+    viewed_on = fields.Datetime(string='Viewed On', required=True)
+
+    @api.model
+    def _log_view(self, property_id):
+        """
+        Append one view of ``property_id`` to the buffer.
+
+        A plain INSERT in an append-only table: concurrent hits never wait on the
+        property row lock and no view is lost, counters are updated by the flush cron.
+        """
+        self.env.cr.execute(SQL(
+            "INSERT INTO property_view_event (property_id, viewed_on) VALUES (%s, now() at time zone 'UTC')",
+            property_id,
+        ))
+
+    @api.model
+    def _cron_flush_view_events(self):
+        """Move buffered views into the daily buckets and the counters of the properties, in one statement."""
+        # Every CTE sees the same snapshot: events inserted while this runs stay for the next flush
+        self.env.cr.execute(SQL("""
+            WITH moved AS (
+                DELETE FROM property_view_event
+                  RETURNING property_id, viewed_on
+            ), buckets AS (
+                INSERT INTO property_view_stat (property_id, date, view_count)
+                     SELECT property_id, viewed_on::date, count(*)
+                       FROM moved
+                   GROUP BY property_id, viewed_on::date
+                ON CONFLICT (property_id, date)
+                  DO UPDATE SET view_count = property_view_stat.view_count + EXCLUDED.view_count
+            )
+            UPDATE property_property p
+               SET views = COALESCE(p.views, 0) + m.view_count,
+                   last_viewed = GREATEST(p.last_viewed, m.last_viewed)
+              FROM (SELECT property_id, count(*) AS view_count, max(viewed_on) AS last_viewed
+                      FROM moved
+                  GROUP BY property_id) m
+             WHERE p.id = m.property_id
+        """))
+        self.env['property.property'].invalidate_model(['views', 'last_viewed'])
+
+
+class PropertyViewStat(models.Model):
+    _name = 'property.view.stat'
+    _description = 'Property Daily Views'
+    _order = 'date desc'
+    _log_access = False
+
+    property_id = fields.Many2one('property.property', string='Property', required=True, ondelete='cascade', index=True)
+    date = fields.Date(string='Date', required=True, index=True)
+    view_count = fields.Integer(string='Views')
+
+    _sql_constraints = [
+        ('property_date_uniq', 'unique(property_id, date)', 'Views are bucketed once per property and day.'),
+    ]
+
+    @api.model
+    def _get_popular(self, days=30, limit=10, domain=None):
+        """
+        Return the published properties most viewed over the last ``days`` days, most viewed first.
+
+        ``domain`` further filters the properties, e.g. ``[('city', '=', city)]``.
+        """
+        since = fields.Date.today() - timedelta(days=days)
+        property_domain = [('is_published', '=', True)] + (domain or [])
+        groups = self._read_group(
+            [('date', '>=', since), ('property_id', 'any', property_domain)],
+            ['property_id'], ['view_count:sum'],
+            order='view_count:sum desc', limit=limit,
+        )
+        return self.env['property.property'].union(*(prop for prop, _count in groups))
+
+    @api.autovacuum
+    def _gc_old_buckets(self):
+        retention_days = int(self.env['ir.config_parameter'].sudo().get_param(
+            'real_estate_management.view_stat_retention_days', 365))
+        if retention_days:
+            self.search([('date', '<', fields.Date.today() - timedelta(days=retention_days))]).unlink()
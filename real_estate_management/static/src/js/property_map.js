@@ -6,11 +6,13 @@ document.addEventListener('DOMContentLoaded', () => {
     const legendEl = document.getElementById('category-legend');
     if (!dataEl || !legendEl) return;
 
-    let properties = [];
+    // Markers are fetched per viewport; the page only tells us where to start
+    const dataUrl = dataEl.dataset.url;
+    let initialBounds = null;
     try {
-        properties = JSON.parse(dataEl.dataset.properties);
+        initialBounds = dataEl.dataset.bounds ? JSON.parse(dataEl.dataset.bounds) : null;
     } catch (e) {
-        return console.error('Invalid property JSON', e);
+        console.error('Invalid map bounds', e);
     }
 
     // Parse category colors from template
@@ -21,7 +23,7 @@ document.addEventListener('DOMContentLoaded', () => {
             return setTimeout(initMap, 200);
         }
         const el = document.getElementById('propertyMap');
-        if (!el || !properties.length) return;
+        if (!el) return;
 
         const map = L.map(el);
         L.tileLayer('https://{s}.tile.openstreetmap.org/{z}/{x}/{y}.png', {
@@ -29,8 +31,10 @@ document.addEventListener('DOMContentLoaded', () => {
             maxZoom: 19,
         }).addTo(map);
 
+        const markerLayer = L.layerGroup().addTo(map);
         let openPopupMarker = null;
         let pointerInsidePopup = false;
+        let pendingRequest = null;
 
         function createIcon(color) {
             return L.divIcon({
@@ -72,15 +76,15 @@ document.addEventListener('DOMContentLoaded', () => {
                 </div>`;
         }
 
-        // Add markers
-        properties.forEach(p => {
-            if (!p.latitude || !p.longitude) return;
+        function addMarker(p) {
             const color = categoryColors[p.property_type] || '#4f46e5';
-            const marker = L.marker([p.latitude, p.longitude], { icon: createIcon(color) }).addTo(map);
+            const marker = L.marker([p.latitude, p.longitude], { icon: createIcon(color) }).addTo(markerLayer);
 
             marker.bindPopup(popupHtml(p), {
                 closeButton: false, autoClose: false, closeOnClick: false,
-                className: 'custom-popup', minWidth: 280, maxWidth: 320
+                className: 'custom-popup', minWidth: 280, maxWidth: 320,
+                // Panning would reload the viewport and drop the hovered marker
+                autoPan: false
             });
 
             // Hover open/close logic
@@ -112,7 +116,53 @@ document.addEventListener('DOMContentLoaded', () => {
                     }, 100);
                 });
             });
-        });
+        }
+
+        function addCluster(c) {
+            const size = c.count < 10 ? 36 : c.count < 100 ? 44 : 54;
+            const icon = L.divIcon({
+                className: 'custom-marker',
+                html: `<div style="
+                    width:${size}px;height:${size}px;border-radius:50%;
+                    background:#4f46e5;border:3px solid white;
+                    box-shadow:0 3px 12px rgba(0,0,0,0.3);
+                    display:flex;align-items:center;justify-content:center;
+                    font-size:14px;font-weight:700;color:white;cursor:pointer;
+                ">${c.count}</div>`,
+                iconSize: [size, size],
+                iconAnchor: [size / 2, size / 2],
+            });
+            const marker = L.marker([c.latitude, c.longitude], { icon }).addTo(markerLayer);
+            // Zoom into the cluster to split it up
+            marker.on('click', () => map.fitBounds(
+                [[c.bounds[0], c.bounds[1]], [c.bounds[2], c.bounds[3]]],
+                { padding: [40, 40], maxZoom: 18 }
+            ));
+        }
+
+        function loadViewport() {
+            const b = map.getBounds();
+            // Forward the page filters (city, category_id, min_price, max_price)
+            const params = new URLSearchParams(window.location.search);
+            params.set('bbox', [b.getSouth(), b.getWest(), b.getNorth(), b.getEast()].map(v => v.toFixed(5)).join(','));
+            params.set('zoom', map.getZoom());
+
+            if (pendingRequest) {
+                pendingRequest.abort();
+            }
+            pendingRequest = new AbortController();
+            fetch(`${dataUrl}?${params}`, { signal: pendingRequest.signal })
+                .then(res => res.json())
+                .then(data => {
+                    openPopupMarker = null;
+                    markerLayer.clearLayers();
+                    data.clusters.forEach(addCluster);
+                    data.markers.forEach(addMarker);
+                })
+                .catch(e => {
+                    if (e.name !== 'AbortError') console.error('Failed to load properties', e);
+                });
+        }
 
         map.on('click', () => {
             if (openPopupMarker) {
@@ -130,13 +180,12 @@ document.addEventListener('DOMContentLoaded', () => {
               </div>`
         ).join('');
 
-        // Fit map to markers
-        const group = L.featureGroup(properties
-            .filter(p => p.latitude && p.longitude)
-            .map(p => L.marker([p.latitude, p.longitude]))
-        );
-        if (group.getLayers().length) {
-            map.fitBounds(group.getBounds().pad(0.1));
+        // Fit map to the matching properties, then load markers for each viewport
+        map.on('moveend', loadViewport);
+        if (initialBounds) {
+            map.fitBounds([[initialBounds[0], initialBounds[1]], [initialBounds[2], initialBounds[3]]], { padding: [30, 30], maxZoom: 16 });
+        } else {
+            map.setView([17.6868, 83.2185], 11);
         }
     }
 
@@ -0,0 +1,11 @@
+from . import test_attachment
+from . import test_city_insight
+from . import test_facet
+from . import test_geocode
+from . import test_import
+from . import test_listing_page
+from . import test_market_stat
+from . import test_metrics
+from . import test_neighbor
+from . import test_registration
+from . import test_search
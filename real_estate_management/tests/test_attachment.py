@@ -0,0 +1,64 @@
+import os
+
+from odoo.tests import TransactionCase, tagged
+from odoo.tools import SQL
+
+
+@tagged('post_install', '-at_install')
+class TestAttachmentDedup(TransactionCase):
+
+    def setUp(self):
+        super().setUp()
+        self.Attachment = self.env['ir.attachment']
+        if self.Attachment._storage() != 'file':
+            self.skipTest("Attachments are stored in the database")
+        self.data = f'dedup {self._testMethodName}'.encode()
+        self.original, self.duplicate = self.Attachment.create([
+            {'name': 'original.txt', 'raw': self.data},
+            {'name': 'duplicate.txt', 'raw': self.data},
+        ])
+
+    def _collapse(self):
+        ICP = self.env['ir.config_parameter'].sudo()
+        for _run in range(100):
+            self.Attachment._cron_collapse_duplicates(batch_size=10)
+            if not ICP.get_param('real_estate_management.dedup_checksum_cursor'):
+                break
+        self.Attachment.invalidate_model()
+
+    def _write_file(self, fname, data):
+        full_path = self.Attachment._full_path(fname)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        with open(full_path, 'wb') as f:
+            f.write(data)
+        self.addCleanup(os.unlink, full_path)
+
+    def test_collapse_database_copy(self):
+        self.env.cr.execute(SQL(
+            "UPDATE ir_attachment SET store_fname = NULL, db_datas = %s WHERE id = %s", self.data, self.duplicate.id,
+        ))
+        self._collapse()
+        self.assertEqual(self.duplicate.store_fname, self.original.store_fname)
+        self.assertEqual(self.duplicate.raw, self.data)
+
+    def test_collapse_renamed_copy(self):
+        fname = f'zz/copy-{self.duplicate.checksum}'
+        self._write_file(fname, self.data)
+        self.env.cr.execute(SQL("UPDATE ir_attachment SET store_fname = %s WHERE id = %s", fname, self.duplicate.id))
+        self._collapse()
+        self.assertEqual(self.duplicate.store_fname, self.Attachment._checksum_fname(self.duplicate.checksum))
+        self.assertEqual(self.duplicate.raw, self.data)
+
+    def test_missing_files_do_not_hold_back_others(self):
+        # Sorts first and no file holds its content
+        broken = self.Attachment.create([{'name': f'broken_{index}.txt', 'raw': b'broken'} for index in range(2)])
+        for attachment, fname in zip(broken, ('zz/missing-1', 'zz/missing-2')):
+            self.env.cr.execute(SQL(
+                "UPDATE ir_attachment SET checksum = %s, store_fname = %s WHERE id = %s", '0' * 40, fname, attachment.id,
+            ))
+        self.env.cr.execute(SQL(
+            "UPDATE ir_attachment SET store_fname = NULL, db_datas = %s WHERE id = %s", self.data, self.duplicate.id,
+        ))
+        self._collapse()
+        self.assertEqual(self.duplicate.store_fname, self.original.store_fname)
+        self.assertEqual(sorted(broken.mapped('store_fname')), ['zz/missing-1', 'zz/missing-2'])
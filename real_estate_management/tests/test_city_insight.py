@@ -0,0 +1,25 @@
+from odoo.tests import TransactionCase, tagged
+
+
+@tagged('post_install', '-at_install')
+class TestCityInsight(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.Insight = cls.env['property.city.insight']
+        cls.env['property.property'].create({'name': 'Temple View Flat', 'city': 'Tirupati', 'is_published': True})
+        cls.env['property.property'].create({'name': 'Draft Flat', 'city': 'Nellore'})
+
+    def test_listed_city_is_queued_once(self):
+        info = self.Insight._get_insight('tirupati ')
+        self.assertFalse(info['ai_content_generated'])
+        insight = self.Insight.search([('city_key', '=', 'tirupati')])
+        self.assertEqual(insight.state, 'pending')
+        self.Insight._get_or_queue('Tirupati', 'tirupati')
+        self.assertEqual(self.Insight.search_count([('city_key', '=', 'tirupati')]), 1)
+
+    def test_unlisted_city_is_not_queued(self):
+        for city in ('Nellore', 'zz%_random', 'Atlantis'):
+            self.assertIsNone(self.Insight._get_insight(city))
+        self.assertFalse(self.Insight.search([('city_key', 'in', ('nellore', 'zz%_random', 'atlantis'))]))
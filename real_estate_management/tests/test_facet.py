@@ -0,0 +1,45 @@
+from odoo.tests import TransactionCase, tagged
+from odoo.tools import SQL
+
+
+@tagged('post_install', '-at_install')
+class TestFacet(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.Facet = cls.env['property.facet']
+        cls.category = cls.env['property.category'].create({'name': 'Farm House'})
+        cls.properties = cls.env['property.property'].create([{
+            'name': f'Farm House {index}',
+            'city': 'Rajahmundry',
+            'category_id': cls.category.id,
+            'price': 3000000,
+            'plot_area': 2500,
+            'is_published': True,
+        } for index in range(2)])
+
+    def _count(self, facet, value):
+        return self.Facet.search([('facet', '=', facet), ('value', '=', str(value))]).count
+
+    def test_counts_follow_writes(self):
+        self.assertEqual(self._count('city', 'Rajahmundry'), 2)
+        self.assertEqual(self._count('category', self.category.id), 2)
+        price_band = self.Facet._band_key('price_band', 3000000)
+        before = self._count('price_band', price_band)
+        self.properties[0].is_published = False
+        self.assertEqual(self._count('city', 'Rajahmundry'), 1)
+        self.assertEqual(self._count('price_band', price_band), before - 1)
+        self.properties[1].price = 60000000
+        self.assertEqual(self._count('price_band', self.Facet._band_key('price_band', 60000000)), 1)
+
+    def test_rebuild(self):
+        # Changed outside the ORM, the counts are not told
+        self.env.cr.execute(SQL("UPDATE property_property SET city = 'Eluru' WHERE id = %s", self.properties[0].id))
+        self.properties.invalidate_recordset(['city'])
+        self.assertEqual(self._count('city', 'Rajahmundry'), 2)
+        self.Facet._rebuild()
+        self.assertEqual(self._count('city', 'Rajahmundry'), 1)
+        self.assertEqual(self._count('city', 'Eluru'), 1)
+        self.assertEqual(self._count('category', self.category.id), 2)
+        self.assertIn({'value': 'Eluru', 'label': 'Eluru', 'count': 1}, self.Facet._get_facets()['city'])
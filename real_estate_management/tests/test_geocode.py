@@ -0,0 +1,51 @@
+from odoo.exceptions import UserError
+from odoo.tests import TransactionCase, tagged
+
+
+@tagged('post_install', '-at_install')
+class TestGeocode(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.env['ir.config_parameter'].sudo().set_param('real_estate_management.geocoder', 'local')
+        cls.Cache = cls.env['property.geocode.cache']
+        cls.Property = cls.env['property.property']
+        cls.address = {'street': 'Beach Road 12', 'zip': '530017', 'city': 'Visakhapatnam',
+                       'state': 'Andhra Pradesh', 'country': 'India'}
+
+    def test_cache_is_per_provider(self):
+        self.Cache._store(self.address, (17.7, 83.3), 'local')
+        self.assertEqual(self.Cache._lookup(self.address, 'local'), (17.7, 83.3))
+        self.assertIsNone(self.Cache._lookup(self.address, 'base'))
+        self.Cache._store(self.address, (17.71, 83.31), 'base')
+        self.assertEqual(self.Cache._lookup(self.address, 'base'), (17.71, 83.31))
+        self.assertEqual(self.Cache._lookup(self.address, 'local'), (17.7, 83.3))
+
+    def test_normalized_addresses_share_an_entry(self):
+        self.Cache._store(self.address, (17.7, 83.3), 'local')
+        variant = dict(self.address, street='  beach road, 12 ', city='VISAKHAPATNAM')
+        self.assertEqual(self.Cache._lookup(variant, 'local'), (17.7, 83.3))
+
+    def test_queue_geocodes_once_per_address(self):
+        properties = self.Property.create([{
+            'name': f'Flat {index}',
+            'street': 'Beach Road 12',
+            'zip_code': '530017',
+            'city': 'Visakhapatnam',
+        } for index in range(3)])
+        self.assertEqual(set(properties.mapped('geocode_state')), {'pending'})
+        self.Property._cron_geocode_pending()
+        self.assertEqual(set(properties.mapped('geocode_state')), {'done'})
+        self.assertEqual(len(set(properties.mapped('latitude'))), 1)
+        address = properties[0]._get_geocode_address()
+        self.assertEqual(self.Cache.search_count([('fingerprint', '=', self.Cache._fingerprint(address))]), 1)
+        self.assertAlmostEqual(self.Cache._lookup(address, 'local')[0], properties[0].latitude, places=4)
+
+    def test_unknown_provider_fails_the_run(self):
+        prop = self.Property.create({'name': 'Flat', 'street': 'Beach Road 12', 'city': 'Visakhapatnam'})
+        self.env['ir.config_parameter'].sudo().set_param('real_estate_management.geocoder', 'nominatm')
+        with self.assertRaises(UserError):
+            self.Property._cron_geocode_pending()
+        self.assertEqual(prop.geocode_state, 'pending')
+        self.assertEqual(prop.geocode_attempts, 0)
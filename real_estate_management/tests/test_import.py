@@ -0,0 +1,37 @@
+import base64
+import json
+
+from odoo.tests import TransactionCase, tagged
+
+
+@tagged('post_install', '-at_install')
+class TestImport(TransactionCase):
+
+    def _import(self, file_name, content):
+        return self.env['property.import'].create({
+            'file': base64.b64encode(content),
+            'file_name': file_name,
+        })
+
+    def _names(self, prefix):
+        return sorted(self.env['property.property'].search([('name', '=like', f'{prefix}%')]).mapped('name'))
+
+    def test_csv_resumes_from_file_position(self):
+        content = b'name,city\r\n' + b''.join(f'Csv Plot {index},Nashik\r\n'.encode() for index in range(5))
+        job = self._import('plots.csv', content)
+        self.assertTrue(job._run(2))
+        self.assertEqual((job.total_rows, job.processed_rows), (5, 2))
+        self.assertEqual(job.file_position, content.index(b'Csv Plot 2'))
+        self.assertFalse(job._run(10))
+        self.assertEqual((job.processed_rows, job.created_count, job.error_count), (5, 5, 0))
+        self.assertEqual(self._names('Csv Plot'), [f'Csv Plot {index}' for index in range(5)])
+
+    def test_json_lines_resume_and_errors(self):
+        lines = [json.dumps({'name': f'Jsonl Plot {index}', 'city': 'Nashik'}) for index in range(3)]
+        content = '\n'.join(lines[:2] + ['not json'] + lines[2:]).encode() + b'\n'
+        job = self._import('plots.jsonl', content)
+        self.assertTrue(job._run(1))
+        self.assertFalse(job._run(10))
+        self.assertEqual((job.processed_rows, job.created_count), (4, 3))
+        self.assertEqual(job.error_ids.mapped('row'), [3])
+        self.assertEqual(self._names('Jsonl Plot'), [f'Jsonl Plot {index}' for index in range(3)])
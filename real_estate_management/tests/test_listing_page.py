@@ -0,0 +1,33 @@
+from odoo.tests import TransactionCase, tagged
+
+
+@tagged('post_install', '-at_install')
+class TestListingPage(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.Property = cls.env['property.property']
+        cls.properties = cls.Property.create([
+            {'name': f'Lakeside Plot {price}', 'city': 'Bhimtal', 'price': price, 'is_published': True}
+            for price in (300000, False, 100000, False, 200000, False)
+        ])
+        cls.domain = [('id', 'in', cls.properties.ids)]
+
+    def _walk(self, sort):
+        records, cursor, pages = self.Property.browse(), None, 0
+        while True:
+            page, cursor = self.Property._listing_page(self.domain, sort=sort, cursor=cursor, limit=2)
+            records |= page
+            pages += 1
+            if not cursor:
+                return records, pages
+
+    def test_pages_across_null_prices(self):
+        for sort in ('price_asc', 'price_desc'):
+            with self.subTest(sort=sort):
+                records, pages = self._walk(sort)
+                self.assertEqual(records, self.properties)
+                self.assertEqual(pages, 3)
+                prices = records.mapped('price')
+                self.assertEqual(prices, sorted(prices, reverse=sort == 'price_desc'))
@@ -0,0 +1,50 @@
+from odoo.tests import TransactionCase, tagged
+
+
+@tagged('post_install', '-at_install')
+class TestMarketStat(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.Stat = cls.env['property.market.stat']
+        cls.category = cls.env['property.category'].create({'name': 'Plot'})
+        cls.properties = cls.env['property.property'].create([{
+            'name': f'Plot {price}',
+            'city': 'Kakinada',
+            'category_id': cls.category.id,
+            'price': price,
+            'plot_area': 1000,
+            'is_published': True,
+        } for price in (1000000, 2000000, 3000000)])
+
+    def _stat(self, dimension, current=True):
+        domain = [('dimension', '=', dimension), ('month', '=' if current else '!=', False)]
+        if dimension in ('city', 'city_category'):
+            domain.append(('city', '=', 'Kakinada'))
+        if dimension in ('category', 'city_category'):
+            domain.append(('category_id', '=', self.category.id))
+        return self.Stat.search(domain)
+
+    def test_refresh(self):
+        self.Stat._cron_refresh_market_stats()
+        self.assertFalse(self.properties.filtered('market_stale'))
+        current = self._stat('city')
+        self.assertEqual(len(current), 1)
+        self.assertEqual(current.listing_count, 3)
+        self.assertEqual(current.price_median, 2000000)
+        self.assertEqual(current.ppsf_median, 2000)
+        self.assertEqual(sum(current.ppsf_histogram), 3)
+        monthly = self._stat('city', current=False)
+        self.assertEqual(monthly.listing_count, 3)
+        self.assertEqual(self._stat('city_category').listing_count, 3)
+        self.assertEqual(self._stat('category').listing_count, 3)
+        self.assertTrue(self._stat('all'))
+
+    def test_refresh_after_change(self):
+        self.Stat._cron_refresh_market_stats()
+        self.properties[2].is_published = False
+        self.Stat._cron_refresh_market_stats()
+        current = self._stat('city')
+        self.assertEqual(current.listing_count, 2)
+        self.assertEqual(current.price_median, 1500000)
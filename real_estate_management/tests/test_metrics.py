@@ -0,0 +1,24 @@
+from odoo.tests import HttpCase, tagged
+
+from ..models.ir_http import METRICS_ROUTE
+
+
+@tagged('post_install', '-at_install')
+class TestMetrics(HttpCase):
+
+    def _status(self, headers=None):
+        return self.url_open(METRICS_ROUTE, headers=headers).status_code
+
+    def test_metrics_need_a_configured_scraper(self):
+        ICP = self.env['ir.config_parameter'].sudo()
+        ICP.set_param('real_estate_management.metrics_allowed_ips', False)
+        ICP.set_param('real_estate_management.metrics_token', False)
+        # Loopback is not trusted by default
+        self.assertEqual(self._status(), 404)
+
+        ICP.set_param('real_estate_management.metrics_token', 'scrape-secret')
+        self.assertEqual(self._status({'Authorization': 'Bearer wrong-secret'}), 404)
+        self.assertEqual(self._status({'Authorization': 'Bearer scrape-secret'}), 200)
+
+        ICP.set_param('real_estate_management.metrics_allowed_ips', '10.0.0.0/8, 127.0.0.0/8')
+        self.assertEqual(self._status(), 200)
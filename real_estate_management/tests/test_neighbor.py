@@ -0,0 +1,54 @@
+from odoo.tests import TransactionCase, tagged
+
+
+@tagged('post_install', '-at_install')
+class TestNeighbors(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.Property = cls.env['property.property']
+        cls.Neighbor = cls.env['property.neighbor']
+        cls.category = cls.env['property.category'].create({'name': 'Villa'})
+        cls.villa, cls.cottage = cls.Property.create([{
+            'name': name,
+            'city': 'Alappuzha',
+            'category_id': cls.category.id,
+            'price': price,
+            'plot_area': 2000,
+            'is_published': True,
+        } for name, price in (('Backwater Villa', 5000000), ('Lakeside Cottage', 5200000))])
+        cls.Neighbor._cron_refresh_neighbors()
+
+    def _neighbors(self, prop):
+        return self.Neighbor.search([('property_id', '=', prop.id)]).neighbor_id
+
+    def test_refresh(self):
+        self.assertEqual(self._neighbors(self.villa), self.cottage)
+        self.assertEqual(self._neighbors(self.cottage), self.villa)
+        self.assertFalse((self.villa | self.cottage).filtered('neighbors_stale'))
+        neighbor = self.Neighbor.search([('property_id', '=', self.villa.id)])
+        self.assertEqual(neighbor.kind, 'similar')
+
+    def test_new_property_enters_existing_lists(self):
+        bungalow = self.Property.create({
+            'name': 'Canal Bungalow',
+            'city': 'Alappuzha',
+            'category_id': self.category.id,
+            'price': 4900000,
+            'plot_area': 2100,
+            'is_published': True,
+        })
+        # Only the new property is recomputed, the others receive it from its refresh
+        self.assertFalse((self.villa | self.cottage).filtered('neighbors_stale'))
+        self.Neighbor._cron_refresh_neighbors()
+        self.assertEqual(self._neighbors(bungalow), self.villa | self.cottage)
+        self.assertIn(bungalow, self._neighbors(self.villa))
+        self.assertIn(bungalow, self._neighbors(self.cottage))
+
+    def test_unpublished_property_leaves_lists(self):
+        self.cottage.is_published = False
+        self.assertTrue(self.villa.neighbors_stale)
+        self.Neighbor._cron_refresh_neighbors()
+        self.assertFalse(self._neighbors(self.villa))
+        self.assertFalse(self._neighbors(self.cottage))
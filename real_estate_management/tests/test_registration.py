@@ -0,0 +1,78 @@
+import base64
+import io
+
+from PIL import Image
+
+from odoo.tests import TransactionCase, tagged
+
+
+def _png(size=(64, 32), color='red'):
+    buffer = io.BytesIO()
+    Image.new('RGB', size, color).save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+@tagged('post_install', '-at_install')
+class TestRegistrationApproval(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.registration = cls.env['property.registration'].create({
+            'customer_name': 'Sea View Villa',
+            'phone_number': '+91 98765 43210',
+            'city': 'Kochi',
+            'category': 'residential',
+            'price': 2500000,
+            'sq_yards': 240,
+            'status': 'submitted',
+            'image': base64.b64encode(_png(size=(800, 400))),
+        })
+        cls.gallery = [_png(color='green'), _png(color='blue')]
+        cls.env['ir.attachment'].create([{
+            'name': f'room_{index}.png',
+            'raw': data,
+            'res_model': cls.registration._name,
+            'res_id': cls.registration.id,
+        } for index, data in enumerate(cls.gallery)])
+
+    def _property_gallery(self, prop):
+        return self.env['ir.attachment'].search(
+            [('res_model', '=', prop._name), ('res_id', '=', prop.id)], order='name')
+
+    def test_approve_copies_gallery(self):
+        self.registration.action_approve()
+        self.assertEqual(self.registration.status, 'approved')
+        gallery = self._property_gallery(self.registration.property_id)
+        self.assertEqual(gallery.mapped('raw'), self.gallery)
+        self.assertEqual(gallery.mapped('name'), ['room_0.png', 'room_1.png'])
+
+    def test_approve_shares_gallery_files(self):
+        if self.env['ir.attachment']._storage() != 'file':
+            self.skipTest("Attachments are stored in the database")
+        self.registration.action_approve()
+        originals = self.registration.attachment_ids.sorted('name')
+        copies = self._property_gallery(self.registration.property_id)
+        self.assertEqual(copies.mapped('store_fname'), originals.mapped('store_fname'))
+        self.assertEqual(copies.mapped('file_size'), originals.mapped('file_size'))
+
+    def test_approve_links_cover(self):
+        self.registration.action_approve()
+        prop = self.registration.property_id
+        self.assertEqual(prop.image, self.registration.image)
+        self.assertEqual(prop.image_1024, self.registration.image)
+        image = Image.open(io.BytesIO(base64.b64decode(prop.image_256)))
+        self.assertEqual(image.size, (256, 128))
+        if self.env['ir.attachment']._storage() == 'file':
+            original, cover = (self.env['ir.attachment'].search([
+                ('res_model', '=', record._name), ('res_field', '=', 'image'), ('res_id', '=', record.id),
+            ]) for record in (self.registration, prop))
+            self.assertEqual(cover.store_fname, original.store_fname)
+
+    def test_approve_batch(self):
+        registrations = self.registration | self.registration.copy({'customer_name': 'Lake House'})
+        registrations.action_approve()
+        self.assertEqual(registrations.mapped('status'), ['approved', 'approved'])
+        self.assertEqual(len(registrations.property_id), 2)
+        self.assertEqual(self._property_gallery(registrations[0].property_id).mapped('raw'), self.gallery)
+        self.assertFalse(self._property_gallery(registrations[1].property_id))
@@ -0,0 +1,32 @@
+from odoo.tests import TransactionCase, tagged
+
+
+@tagged('post_install', '-at_install')
+class TestSearch(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.Property = cls.env['property.property']
+        cls.villa, cls.apartment = cls.Property.create([
+            {'name': 'Backwater Villa', 'city': 'Kumarakom', 'is_published': True},
+            {'name': 'Harbour Apartment', 'city': 'Kumarakom', 'is_published': True},
+        ])
+        cls.domain = [('id', 'in', (cls.villa | cls.apartment).ids)]
+
+    def _search(self, text):
+        return self.Property._search_ranked(text, self.domain)
+
+    def test_prefix_search_without_trigram(self):
+        self.patch(self.registry, 'has_trigram', False)
+        self.assertEqual(self._search('backw vil'), self.villa)
+        self.assertEqual(self._search('kumarakom'), self.villa | self.apartment)
+        self.assertFalse(self._search('backwatr'))
+        self.assertEqual(self._search(''), self.Property.search(self.domain))
+
+    def test_typo_search_with_trigram(self):
+        if not self.registry.has_trigram:
+            self.skipTest("pg_trgm is not installed")
+        self.assertEqual(self._search('backw vil'), self.villa)
+        self.assertEqual(self._search('backwatr villa'), self.villa)
+        self.assertEqual(self._search('harbour kumarakom')[:1], self.apartment)
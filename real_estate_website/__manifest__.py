@@ -7,7 +7,7 @@
     'summary': 'Manage real estate properties and website',
     'description': 'Custom real estate module with property listings and search on website',
     'author': 'Udaykiran',
-    'depends': ['website'],
+    'depends': ['website', 'real_estate_listing'],
     'data': [
         'security/ir.model.access.csv',
         'views/property_views.xml',
@@ -5,25 +5,44 @@ from odoo.http import request
 class RealEstateController(http.Controller):
 
     @http.route(['/properties'], type='http', auth="public", website=True)
-    def property_list(self):
-        properties = request.env['property'].search([('status', '=', 'available')])
-        return request.render('real_estate_website.real_estate_property_list', {'properties': properties})
+    def property_list(self, sort=None, cursor=None, limit=None, **kwargs):
+        return self._render_listing({}, sort, cursor, limit, kwargs)
 
     @http.route(['/property/<int:property_id>'], type='http', auth="public", website=True)
     def property_detail(self, property_id):
-        property = request.env['property'].browse(property_id)
+        property = request.env['property'].with_context(bin_size=True).browse(property_id)
         if not property.exists():
             return request.redirect('/properties')
         return request.render('real_estate_website.property_detail', {'property': property})
 
     @http.route(['/properties/search'], type='http', auth="public", website=True)
-    def property_search(self, location=None):
-        domain = [('status', '=', 'available')]
-        if location:
-            domain.append('|')
-            domain.append('|')
-            domain.append(('city', 'ilike', location))
-            domain.append(('zip', 'ilike', location))
-            domain.append(('street', 'ilike', location))
-        properties = request.env['property'].search(domain)
-        return request.render('real_estate_website.real_estate_property_list', {'properties': properties})
+    def property_search(self, location=None, sort=None, cursor=None, limit=None, **kwargs):
+        return self._render_listing({'location': location}, sort, cursor, limit, kwargs)
+
+    def _render_listing(self, filters, sort, cursor, limit, kwargs):
+        """
+        One keyset page of the available properties matching ``filters`` (see
+        real.estate.listing), as the listing page or, with ``format=json``, as JSON
+        """
+        Listing = request.env['real.estate.listing'].sudo()
+        properties, next_cursor = Listing._listing_page(
+            Listing._public_domain(filters, res_model='property'), sort=sort, cursor=cursor,
+            limit=int(limit) if limit and limit.isdigit() else None,
+        )
+        if kwargs.get('format') == 'json':
+            return request.make_json_response({
+                'properties': [{
+                    'id': prop.res_id,
+                    'name': prop.name,
+                    'price': prop.price,
+                    'city': prop.city or '',
+                    'url': prop.url,
+                    'image_url': prop.thumbnail_url or '',
+                } for prop in properties],
+                'next_cursor': next_cursor,
+            })
+        return request.render('real_estate_website.real_estate_property_list', {
+            'properties': properties,
+            'next_cursor': next_cursor,
+            'sort': sort or '',
+        })
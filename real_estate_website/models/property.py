@@ -1,23 +1,52 @@
-from odoo import models, fields
+from odoo import models, fields, api
+
 
 class Property(models.Model):
     _name = 'property'
+    _inherit = ['real.estate.listing.mixin']
     _description = 'Real Estate Property'
+    # Fields read by _listing_values
+    _listing_depends = (
+        'name', 'price', 'area', 'bedrooms', 'street', 'city', 'state_id', 'country_id', 'zip', 'image', 'status',
+    )
 
     name = fields.Char('Title', required=True)
     price = fields.Float('Price')
     description = fields.Text('Description')
-    street = fields.Char('Street Address')
-    city = fields.Char('City')
+    street = fields.Char('Street Address', index='trigram')
+    city = fields.Char('City', index='trigram')
     state_id = fields.Many2one('res.country.state', string='State')
     country_id = fields.Many2one('res.country', string='Country')
-    zip = fields.Char('ZIP/Postal Code')
+    zip = fields.Char('ZIP/Postal Code', index='trigram')
     bedrooms = fields.Integer('Bedrooms')
     bathrooms = fields.Integer('Bathrooms')
     area = fields.Float('Area (sq ft)')
-    image = fields.Binary('Image')
+    price_per_sqft = fields.Float('Price per Sq.Ft', compute='_compute_price_per_sqft', store=True)
+    image = fields.Image('Image', max_width=1920, max_height=1920)
+    image_512 = fields.Image('Image 512', related='image', max_width=512, max_height=512, store=True)
     status = fields.Selection([
         ('available', 'Available'),
         ('sold', 'Sold'),
         ('pending', 'Pending'),
     ], default='available')
+
+    @api.depends('price', 'area')
+    def _compute_price_per_sqft(self):
+        for rec in self:
+            rec.price_per_sqft = round(rec.price / rec.area, 2) if rec.area else 0
+
+    def _listing_values(self):
+        return {rec.id: {
+            'name': rec.name,
+            'listing_type': 'buy',
+            'price': rec.price,
+            'area': rec.area,
+            'bedrooms': rec.bedrooms,
+            'street': rec.street,
+            'city': rec.city,
+            'zip_code': rec.zip,
+            'address': ', '.join(filter(None, [rec.street, rec.city, rec.state_id.name, rec.country_id.name, rec.zip])),
+            'thumbnail_url': rec._listing_image_url('image_512') if rec.image else False,
+            'url': f'/property/{rec.id}',
+            'is_published': rec.status == 'available',
+        } for rec in self}
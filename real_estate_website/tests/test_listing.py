@@ -0,0 +1,52 @@
+from odoo.tests import TransactionCase, tagged
+
+
+@tagged('post_install', '-at_install')
+class TestListing(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.Listing = cls.env['real.estate.listing']
+        cls.house = cls.env['property'].create({
+            'name': 'Hilltop House',
+            'price': 4500000,
+            'area': 1500,
+            'bedrooms': 3,
+            'street': 'Hill Road 4',
+            'city': 'Araku',
+            'zip': '531149',
+        })
+
+    def _listing(self):
+        self.env.cr.precommit.run()
+        return self.Listing.search([('res_model', '=', 'property'), ('res_id', '=', self.house.id)])
+
+    def test_sync(self):
+        listing = self._listing()
+        self.assertEqual(listing.name, 'Hilltop House')
+        self.assertEqual(listing.price_per_sqft, 3000)
+        self.assertTrue(listing.is_published)
+        self.assertEqual(self.Listing.search(self.Listing._public_domain({'city': 'araku', 'bedrooms': '3'})),
+                         listing)
+
+    def test_sold_and_removed(self):
+        self.house.status = 'sold'
+        self.assertFalse(self._listing().is_published)
+        self.house.unlink()
+        self.assertFalse(self._listing())
+
+    def test_pages(self):
+        houses = self.house | self.env['property'].create([
+            {'name': f'Valley House {price}', 'price': price, 'area': 1000, 'city': 'Araku'}
+            for price in (2000000, 3000000)
+        ])
+        self.env.cr.precommit.run()
+        domain = self.Listing._public_domain({'city': 'araku'}) + [('res_id', 'in', houses.ids)]
+        seen, cursor = [], None
+        while True:
+            page, cursor = self.Listing._listing_page(domain, sort='price_desc', cursor=cursor, limit=2)
+            seen += page.mapped('price')
+            if not cursor:
+                break
+        self.assertEqual(seen, [4500000, 3000000, 2000000])
@@ -4,7 +4,7 @@
     "category": "Real Estate",
     'license': 'LGPL-3',
     "summary": "Rental estate listings",
-    "depends": ["product", "website"],
+    "depends": ["product", "website_sale", "real_estate_listing"],
     "data": [
         'security/ir.model.access.csv',
         "views/product_template_views.xml",
@@ -1,12 +1,20 @@
 from odoo import http
 from odoo.http import request
-import base64
+from odoo.exceptions import UserError
+from odoo.tools import SQL
+from odoo.addons.real_estate_listing.controllers.cache import cached_route
+import functools
+
+# Public routes of this module read their Cache-Control overrides from its system parameters
+cached_route = functools.partial(cached_route, namespace='rental_estate')
 
 
 class RealEstateWebsite(http.Controller):
 
     @http.route(['/properties', '/properties/<string:ptype>'], type='http', auth='public', website=True)
-    def list_properties(self, ptype=None, zip_code=None, property_type=None, **kwargs):
+    @cached_route(lambda **kwargs: ['rentals'], 'page')
+    def list_properties(self, ptype=None, zip_code=None, property_type=None, sort=None, cursor=None, limit=None,
+                        move_in=None, months=None, **kwargs):
         valid_types = ['buy', 'rent']
 
         # Validate property type from URL or query param
@@ -17,23 +25,49 @@ class RealEstateWebsite(http.Controller):
         # ptype from URL (for specific pages) overrides property_type query param (for all properties)
         filter_type = ptype or (property_type if property_type in valid_types else None)
 
-        domain = [('is_published', '=', True)]
-        if filter_type:
-            domain.append(('property_type', '=', filter_type))
-
+        Listing = request.env['real.estate.listing'].sudo()
+        domain = Listing._public_domain({'listing_type': filter_type}, res_model='product.template')
         if zip_code:
             domain.append(('zip_code', '=', zip_code))
 
-        properties = request.env['product.template'].sudo().search(domain)
+        # Only the properties free from the move-in date for the whole stay
+        stay = request.env['rental.availability'].sudo()._stay(move_in, months) if move_in else None
+        where = None
+        if stay:
+            where = request.env['rental.availability'].sudo()._free_sql(
+                SQL.identifier(Listing._table, 'res_id'), *stay)
+
+        properties, next_cursor = Listing._listing_page(
+            domain, sort=sort, cursor=cursor, limit=int(limit) if limit and limit.isdigit() else None, where=where,
+        )
+
+        if kwargs.get('format') == 'json':
+            return request.make_json_response({
+                'properties': [{
+                    'id': prop.res_id,
+                    'name': prop.name,
+                    'location': prop.city or '',
+                    'rental_price': prop.price,
+                    'property_type': prop.listing_type,
+                    'url': prop.url,
+                    'image_url': prop.thumbnail_url,
+                } for prop in properties],
+                'next_cursor': next_cursor,
+            })
 
         return request.render('rental_estate.property_listing_page', {
             'properties': properties,
+            'next_cursor': next_cursor,
             'property_type': filter_type or 'all',
             'zip_code': zip_code or '',
+            'move_in': move_in if stay else '',
+            'months': months if stay and months else '',
+            'sort': sort or '',
             'valid_types': valid_types,
         })
 
     @http.route(['/property/<string:ptype>/<int:property_id>'], type='http', auth='public', website=True)
+    @cached_route(lambda property_id, **kwargs: [f'rental:{property_id}'], 'page')
     def property_detail(self, ptype, property_id, **kwargs):
         valid_types = ['buy', 'rent', 'sell']
 
@@ -70,12 +104,6 @@ class RealEstateWebsite(http.Controller):
                     **post,
                 })
 
-        # Read main image if uploaded
-        main_image_file = request.httprequest.files.get('image_1920')
-        main_image_data = False
-        if main_image_file:
-            main_image_data = base64.b64encode(main_image_file.read())
-
         vals = {
             'name': post.get('name'),
             'property_type': 'sell',  # Default property type for sell form
@@ -89,20 +117,31 @@ class RealEstateWebsite(http.Controller):
             'status': 'available',
             'is_published': True,
         }
-        if main_image_data:
-            vals['image_1920'] = main_image_data
-
-        product_obj = request.env['product.template'].sudo().create(vals)
-
-        # Handle multiple room images uploads
-        room_images_files = request.httprequest.files.getlist('room_images')
-        for image_file in room_images_files:
-            if image_file:
-                image_data = base64.b64encode(image_file.read())
-                request.env['property.room.image'].sudo().create({
-                    'product_tmpl_id': product_obj.id,
-                    'name': f"Room image for {product_obj.name}",
-                    'image': image_data,
-                })
+
+        # Images are streamed to the filestore and resized into the property by the upload cron
+        Upload = request.env['real.estate.upload'].sudo()
+        main_image_file = request.httprequest.files.get('image_1920')
+        room_images_files = [image_file for image_file in request.httprequest.files.getlist('room_images') if image_file]
+        try:
+            with request.env.cr.savepoint():
+                # One spool for all the files, the size limit of the request applies to them together
+                attachments = Upload._spool(([main_image_file] if main_image_file else []) + room_images_files,
+                                            request.httprequest.content_length)
+                main_image = attachments[:1] if main_image_file else attachments[:0]
+                room_images = attachments[1:] if main_image_file else attachments
+
+                product_obj = request.env['product.template'].sudo().create(vals)
+                Upload._queue(main_image, product_obj, 'image_1920')
+                for attachment in room_images:
+                    room_image = request.env['property.room.image'].sudo().create({
+                        'product_tmpl_id': product_obj.id,
+                        'name': f"Room image for {product_obj.name}",
+                    })
+                    Upload._queue(attachment, room_image, 'image')
+        except UserError as e:
+            return request.render('rental_estate.sell_property_form', {
+                'error': str(e),
+                **post,
+            })
 
         return request.render('rental_estate.sell_thank_you')
@@ -1,2 +1,3 @@
 from . import product_template
-from . import property_room_image
\ No newline at end of file
+from . import property_room_image
+from . import rental_availability
@@ -1,13 +1,20 @@
-from odoo import models, fields
+from odoo import models, fields, api
 
 
 class ProductTemplate(models.Model):
-    _inherit = "product.template"
+    _name = "product.template"
+    _inherit = ["product.template", "real.estate.listing.mixin"]
+    # Fields read by _listing_values
+    _listing_depends = (
+        'name', 'property_type', 'rental_price', 'square_feet', 'bedrooms', 'location', 'zip_code', 'image_1920',
+        'is_published', 'active',
+    )
 
     bedrooms = fields.Integer(string="Bedrooms")
     bathrooms = fields.Integer(string="Bathrooms")
     square_feet = fields.Float(string="Square Footage")
     rental_price = fields.Float(string="Rental Price")
+    price_per_sqft = fields.Float(string="Price per Sq.Ft", compute='_compute_price_per_sqft', store=True)
     availability_status = fields.Selection([
         ('available', 'Available'),
         ('rented', 'Rented'),
@@ -31,3 +38,47 @@ class ProductTemplate(models.Model):
         ('maintenance', 'Under Maintenance'),
     ], string="Status", default='available')
     room_image_ids = fields.One2many('property.room.image', 'product_tmpl_id', string="Room Images")
+    availability_ids = fields.One2many('rental.availability', 'product_tmpl_id', string="Booking Periods")
+
+    @api.depends('rental_price', 'square_feet')
+    def _compute_price_per_sqft(self):
+        for rec in self:
+            rec.price_per_sqft = round(rec.rental_price / rec.square_feet, 2) if rec.square_feet else 0
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        records._bump_page_cache()
+        return records
+
+    def write(self, vals):
+        published = self.filtered('is_published')
+        res = super().write(vals)
+        (published | self.filtered('is_published'))._bump_page_cache()
+        return res
+
+    def unlink(self):
+        self._bump_page_cache()
+        return super().unlink()
+
+    def _bump_page_cache(self):
+        """Invalidate the cached listings and pages of the published properties of self."""
+        published = self.filtered('is_published')
+        if published:
+            self.env['real.estate.cache.tag']._bump(['rentals'] + [f'rental:{pid}' for pid in published.ids])
+
+    def _listing_values(self):
+        return {rec.id: {
+            'name': rec.name,
+            'listing_type': rec.property_type,
+            'price': rec.rental_price,
+            'area': rec.square_feet,
+            'bedrooms': rec.bedrooms,
+            'street': False,
+            'city': rec.location,
+            'zip_code': rec.zip_code,
+            'address': ', '.join(filter(None, [rec.location, rec.zip_code])),
+            'thumbnail_url': rec._listing_image_url('image_512'),
+            'url': f'/property/{rec.property_type}/{rec.id}',
+            'is_published': rec.is_published and rec.active,
+        } for rec in self}
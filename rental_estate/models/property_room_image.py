@@ -1,4 +1,4 @@
-from odoo import models, fields
+from odoo import models, fields, api
 
 
 class PropertyRoomImage(models.Model):
@@ -7,4 +7,21 @@ class PropertyRoomImage(models.Model):
 
     product_tmpl_id = fields.Many2one('product.template', string="Property", required=True, ondelete='cascade')
     name = fields.Char(string="Room Name")
-    image = fields.Binary(string="Room Image")
+    image = fields.Image(string="Room Image", max_width=1920, max_height=1920)
+    image_512 = fields.Image(string="Room Image 512", related='image', max_width=512, max_height=512, store=True)
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        records.product_tmpl_id._bump_page_cache()
+        return records
+
+    def write(self, vals):
+        self.product_tmpl_id._bump_page_cache()
+        res = super().write(vals)
+        self.product_tmpl_id._bump_page_cache()
+        return res
+
+    def unlink(self):
+        self.product_tmpl_id._bump_page_cache()
+        return super().unlink()
@@ -0,0 +1,176 @@
+from odoo import models, fields, api, _
+from odoo.exceptions import UserError
+from odoo.tools import SQL
+from dateutil.relativedelta import relativedelta
+
+# Stay searched for when the visitor only gives a move-in date, and the longest one, in months
+AVAILABILITY_DEFAULT_MONTHS = 12
+AVAILABILITY_MAX_MONTHS = 60
+
+
+class RentalAvailability(models.Model):
+    """
+    Period during which a rental property cannot be let, booked by a tenant or blocked by
+    the landlord. ``date_to`` is the move-out date and is not part of the period, so that
+    back-to-back periods do not overlap.
+
+    An exclusion constraint keeps the periods of a property from overlapping. Its GiST index
+    on the property and the period as a date range also finds the properties free over a
+    stay by one anti-join on the periods overlapping it, whatever the number of properties
+    and periods. Calendars of many properties are updated at once with ``_bulk_set``.
+    """
+    _name = 'rental.availability'
+    _description = 'Rental Booking Period'
+    _order = 'product_tmpl_id, date_from'
+
+    product_tmpl_id = fields.Many2one('product.template', string='Property', required=True, ondelete='cascade',
+                                      index=True)
+    date_from = fields.Date(string='From', required=True)
+    date_to = fields.Date(string='Until', required=True, help="Move-out date, the property is free again that day.")
+    kind = fields.Selection([
+        ('booked', 'Booked'),
+        ('blocked', 'Blocked'),
+    ], string='Kind', required=True, default='booked')
+    note = fields.Char(string='Note')
+
+    _sql_constraints = [
+        ('date_check', 'CHECK(date_from < date_to)', 'A booking period must end after it starts.'),
+        ('period_overlap_excl',
+         "EXCLUDE USING gist (product_tmpl_id WITH =, daterange(date_from, date_to, '[)') WITH &&)",
+         'The booking periods of a property cannot overlap.'),
+    ]
+
+    def _auto_init(self):
+        # GiST only compares integers such as product_tmpl_id for equality with btree_gist
+        self.env.cr.execute(SQL("CREATE EXTENSION IF NOT EXISTS btree_gist"))
+        return super()._auto_init()
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        records.product_tmpl_id._bump_page_cache()
+        return records
+
+    def write(self, vals):
+        self.product_tmpl_id._bump_page_cache()
+        res = super().write(vals)
+        self.product_tmpl_id._bump_page_cache()
+        return res
+
+    def unlink(self):
+        self.product_tmpl_id._bump_page_cache()
+        return super().unlink()
+
+    # -------------------- QUERIES --------------------
+    @api.model
+    def _stay(self, move_in, months=None):
+        """``(date_from, date_to)`` of a stay from the visitor's ``move_in`` and ``months``, None when invalid."""
+        try:
+            date_from = fields.Date.to_date(move_in)
+            months = int(months) if months else AVAILABILITY_DEFAULT_MONTHS
+            if not date_from:
+                return None
+            # The stay of a move-in near the end of the calendar ends past the last date
+            return date_from, date_from + relativedelta(months=max(1, min(months, AVAILABILITY_MAX_MONTHS)))
+        except (ValueError, OverflowError):
+            return None
+
+    @api.model
+    def _free_sql(self, product_tmpl_id, date_from, date_to):
+        """SQL condition true when the property whose id is the SQL ``product_tmpl_id`` is free over the stay."""
+        return SQL("""
+            NOT EXISTS (
+                SELECT 1
+                  FROM rental_availability period
+                 WHERE period.product_tmpl_id = %s
+                   AND daterange(period.date_from, period.date_to, '[)') && daterange(%s, %s, '[)')
+            )
+        """, product_tmpl_id, date_from, date_to)
+
+    # -------------------- BULK UPDATES --------------------
+    @api.model
+    def _bulk_set(self, products, date_from, date_to, kind=False, note=False):
+        """
+        Set the calendar of ``products`` over ``[date_from, date_to)`` in a fixed number of
+        statements whatever their number: the periods overlapping the range are cut to it,
+        then with a ``kind`` one period of that kind covering the range is added to each
+        property. Without ``kind`` the range is freed.
+        """
+        if date_from >= date_to:
+            raise UserError(_("The period must end after it starts."))
+        if not products:
+            return
+        self.flush_model()
+        ids = tuple(products.ids)
+        now = SQL("now() at time zone 'UTC'")
+        # Periods spanning the whole range are cut to their start and keep their end as a new
+        # period, which is only inserted once the start no longer overlaps it
+        self.env.cr.execute(SQL("""
+            WITH spanning AS (
+                UPDATE rental_availability period
+                   SET date_to = %(date_from)s, write_uid = %(uid)s, write_date = %(now)s
+                  FROM rental_availability old
+                 WHERE period.id = old.id AND period.product_tmpl_id IN %(ids)s
+                   AND period.date_from < %(date_from)s AND period.date_to > %(date_to)s
+             RETURNING period.product_tmpl_id, old.date_to, period.kind, period.note
+            )
+            INSERT INTO rental_availability (product_tmpl_id, date_from, date_to, kind, note,
+                                             create_uid, create_date, write_uid, write_date)
+                 SELECT product_tmpl_id, %(date_to)s, date_to, kind, note, %(uid)s, %(now)s, %(uid)s, %(now)s
+                   FROM spanning
+        """, ids=ids, date_from=date_from, date_to=date_to, uid=self.env.uid, now=now))
+        self.env.cr.execute(SQL("""
+            UPDATE rental_availability
+               SET date_to = %(date_from)s, write_uid = %(uid)s, write_date = %(now)s
+             WHERE product_tmpl_id IN %(ids)s AND date_from < %(date_from)s AND date_to > %(date_from)s
+        """, ids=ids, date_from=date_from, uid=self.env.uid, now=now))
+        self.env.cr.execute(SQL("""
+            UPDATE rental_availability
+               SET date_from = %(date_to)s, write_uid = %(uid)s, write_date = %(now)s
+             WHERE product_tmpl_id IN %(ids)s AND date_from >= %(date_from)s AND date_from < %(date_to)s
+               AND date_to > %(date_to)s
+        """, ids=ids, date_from=date_from, date_to=date_to, uid=self.env.uid, now=now))
+        self.env.cr.execute(SQL("""
+            DELETE FROM rental_availability
+             WHERE product_tmpl_id IN %(ids)s AND date_from >= %(date_from)s AND date_to <= %(date_to)s
+        """, ids=ids, date_from=date_from, date_to=date_to))
+        if kind:
+            self.env.cr.execute(SQL("""
+                INSERT INTO rental_availability (product_tmpl_id, date_from, date_to, kind, note,
+                                                 create_uid, create_date, write_uid, write_date)
+                     SELECT unnest(%(ids)s), %(date_from)s, %(date_to)s, %(kind)s, %(note)s,
+                            %(uid)s, %(now)s, %(uid)s, %(now)s
+            """, ids=list(ids), date_from=date_from, date_to=date_to, kind=kind, note=note or None,
+                uid=self.env.uid, now=now))
+        self.invalidate_model()
+        products.invalidate_recordset(['availability_ids'])
+        products._bump_page_cache()
+
+
+class RentalAvailabilityWizard(models.TransientModel):
+    _name = 'rental.availability.wizard'
+    _description = 'Update Rental Calendars'
+
+    product_tmpl_ids = fields.Many2many('product.template', string='Properties', required=True,
+                                        default=lambda self: self._default_product_tmpl_ids())
+    date_from = fields.Date(string='From', required=True)
+    date_to = fields.Date(string='Until', required=True)
+    action = fields.Selection([
+        ('booked', 'Mark as booked'),
+        ('blocked', 'Block'),
+        ('free', 'Free'),
+    ], string='Action', required=True, default='blocked')
+    note = fields.Char(string='Note')
+
+    def _default_product_tmpl_ids(self):
+        if self.env.context.get('active_model') == 'product.template':
+            return self.env.context.get('active_ids')
+        return False
+
+    def action_apply(self):
+        self.ensure_one()
+        self.env['rental.availability']._bulk_set(
+            self.product_tmpl_ids, self.date_from, self.date_to,
+            kind=self.action if self.action != 'free' else False, note=self.note,
+        )
+        return {'type': 'ir.actions.act_window_close'}
@@ -0,0 +1,62 @@
+from datetime import date
+
+from psycopg2 import IntegrityError
+
+from odoo.tests import TransactionCase, tagged
+from odoo.tools import SQL, mute_logger
+
+
+@tagged('post_install', '-at_install')
+class TestAvailability(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.Availability = cls.env['rental.availability']
+        cls.flat, cls.studio = cls.env['product.template'].create([
+            {'name': 'Harbour Flat', 'rental_price': 25000, 'square_feet': 900},
+            {'name': 'Beach Studio', 'rental_price': 15000, 'square_feet': 450},
+        ])
+
+    def _periods(self, product):
+        return [(period.date_from, period.date_to, period.kind)
+                for period in self.Availability.search([('product_tmpl_id', '=', product.id)])]
+
+    def _is_free(self, product, date_from, date_to):
+        self.env.cr.execute(SQL("SELECT %s", self.Availability._free_sql(product.id, date_from, date_to)))
+        return self.env.cr.fetchone()[0]
+
+    def test_overlap_rejected(self):
+        self.Availability.create({'product_tmpl_id': self.flat.id, 'date_from': date(2026, 1, 1),
+                                  'date_to': date(2026, 3, 1)})
+        # Back-to-back periods do not overlap
+        self.Availability.create({'product_tmpl_id': self.flat.id, 'date_from': date(2026, 3, 1),
+                                  'date_to': date(2026, 4, 1)})
+        with self.assertRaises(IntegrityError), mute_logger('odoo.sql_db'), self.env.cr.savepoint():
+            self.Availability.create({'product_tmpl_id': self.flat.id, 'date_from': date(2026, 2, 1),
+                                      'date_to': date(2026, 5, 1)})
+
+    def test_bulk_set(self):
+        products = self.flat | self.studio
+        self.Availability._bulk_set(products, date(2026, 1, 1), date(2026, 7, 1), kind='booked')
+        self.Availability._bulk_set(self.flat, date(2026, 3, 1), date(2026, 4, 1), kind='blocked')
+        self.assertEqual(self._periods(self.flat), [
+            (date(2026, 1, 1), date(2026, 3, 1), 'booked'),
+            (date(2026, 3, 1), date(2026, 4, 1), 'blocked'),
+            (date(2026, 4, 1), date(2026, 7, 1), 'booked'),
+        ])
+        self.Availability._bulk_set(products, date(2026, 2, 1), date(2026, 5, 1))
+        self.assertEqual(self._periods(self.studio), [
+            (date(2026, 1, 1), date(2026, 2, 1), 'booked'),
+            (date(2026, 5, 1), date(2026, 7, 1), 'booked'),
+        ])
+        self.assertTrue(self._is_free(self.flat, date(2026, 2, 1), date(2026, 5, 1)))
+        self.assertFalse(self._is_free(self.flat, date(2026, 4, 15), date(2026, 8, 1)))
+        self.assertTrue(self._is_free(self.flat, date(2026, 7, 1), date(2026, 9, 1)))
+
+    def test_stay(self):
+        self.assertEqual(self.Availability._stay('2026-01-15', '3'), (date(2026, 1, 15), date(2026, 4, 15)))
+        self.assertEqual(self.Availability._stay('2026-01-15', '600')[1], date(2031, 1, 15))
+        self.assertIsNone(self.Availability._stay('not a date'))
+        # Would end after the last representable date
+        self.assertIsNone(self.Availability._stay('9999-06-01'))